@@ -2,36 +2,94 @@
 from __future__ import annotations
 
 import logging
+import time
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.const import CONF_API_KEY
 
-from .const import DOMAIN
+from .const import DOMAIN, CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION
 from .api import get_api
+from .connector import create_session
+from .dp_schema import async_load_dp_schema_map
 from .coordinator import PulseDeviceCoordinator
+from .services import async_setup_services
+from .backfill import PulseBackfill
+from .events import PulseEvents
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS = ["sensor", "binary_sensor"]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Сервисы регистрируются один раз для всех записей."""
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Pulse Labs integration from a config entry."""
-    session = async_get_clientsession(hass)
-    api = get_api(session, entry.data[CONF_API_KEY])
-
+    # карта учёта datapoints — из кэша и вне event loop
+    await async_load_dp_schema_map(hass)
+
+    if entry.options.get(CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION):
+        # свой пул соединений к облаку Pulse со счётчиками трафика
+        session, stats = create_session()
+        entry.async_on_unload(session.close)
+    else:
+        session, stats = async_get_clientsession(hass), None
+    api = get_api(session, entry.data[CONF_API_KEY], connection_stats=stats)
+
+    started = time.perf_counter()
     coordinator = PulseDeviceCoordinator(hass, api, entry)
     await coordinator.async_load_api_usage_state()
-    await coordinator.async_config_entry_first_refresh()
+    await coordinator.async_load_dli_state()
+    await coordinator.async_load_light_readings()
+    # есть свежий снимок — сущности строятся из него, живой опрос идёт в фоне;
+    # нет — ждём /all-devices, как раньше
+    from_snapshot = await coordinator.async_load_snapshot()
+    if not from_snapshot:
+        await coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    coordinator.startup_ms = round((time.perf_counter() - started) * 1000, 1)
+    _LOGGER.debug(
+        "Entry %s set up in %.1f ms (%s)",
+        entry.entry_id, coordinator.startup_ms, "snapshot" if from_snapshot else "live",
+    )
+    if from_snapshot:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN}_first_refresh_{entry.entry_id}"
+        )
+
+    # пропуски истории догружаются в фоне, после создания сущностей
+    coordinator.backfill = PulseBackfill(hass, entry, coordinator)
+    await coordinator.backfill.async_load()
+    coordinator.backfill.async_start()
+
+    # лента событий Pulse → шина HA, по своему курсору и расписанию
+    coordinator.events = PulseEvents(hass, entry, coordinator)
+    await coordinator.events.async_load()
+    coordinator.events.async_start()
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
     return True
 
 
+async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Опции изменены в options flow — перезагружаем запись."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
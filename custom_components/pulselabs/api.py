@@ -4,9 +4,9 @@ custom_components.pulselabs.api
 REST‑клиент Pulse API с централизованным учётом суточной квоты **datapoints**.
 
 Алгоритм расхода:
-* Загружаем `resources/swagger.json` при импорте.
-* По Swagger‑схемам строим карту:  
-  path‑regex → список «JSON‑пойнтеров» (типа `['deviceViewDtos', '*', 'mostRecentDataPoint']`), 
+* Модуль `dp_schema` по `resources/swagger.json` строит карту
+  (кэшируется по хэшу swagger, загружается лениво в executor):  
+  path → список «JSON‑пойнтеров» (типа `['deviceViewDtos', '*', 'mostRecentDataPoint']`), 
   указывающих, где в ответе находятся объекты из `_COUNTABLE_TYPES`.
 * Каждый успешный `async_get()` вызывает `_register_datapoints()`,
   который берёт подходящий список путей и пересчитывает, сколько
@@ -20,13 +20,12 @@ REST‑клиент Pulse API с централизованным учётом
 from __future__ import annotations
 
 import os
-import re
-import json
+import time
+import hashlib
 
-from dataclasses import dataclass
-from datetime import datetime
-from importlib.resources import files
-from typing import Any, Dict, List, Sequence, Callable
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable
+from urllib.parse import urlencode
 
 import asyncio
 import aiohttp
@@ -34,164 +33,93 @@ import async_timeout
 
 from homeassistant.util import dt as dt_util
 
-from .const import BASE_URL, DOMAIN
+from .budget import BudgetExceededError, BudgetGate, CostEstimator, with_params
+from .connector import ConnectionStats
+from .const import BASE_URL, REQUEST_TIMEOUT, RESPONSE_CACHE_TTL
+from .dp_schema import get_dp_router
+from .fastjson import JsonLoads, json_loads
+from .json_stream import iter_json_array
+from .metrics import EndpointMetrics
+from .resilience import ResilientTransport
 
 import logging
 _LOGGER = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
-# 1) Константы
+# 1‑3) Карта path → pointers и счётчики строятся в `dp_schema` (лениво, с кэшем)
 
-# DTO‑типы, которые *засчитываются* как расход квоты
-_COUNTABLE_TYPES: set[str] = {
-    "DataPointDto",
-    "UniversalDataPointDto",
-    "PublicApiDataPoint",
-    "HubDataPointDto",
-}
+# Потоковое чтение: общий таймаут не ограничиваем (диапазон может быть
+# большим), следим только за подключением и паузами между чанками.
+_STREAM_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=15, sock_read=15)
+_STREAM_CHUNK_SIZE = 64 * 1024
 
-# Где лежит Pulse API swagger.json
-_SWAGGER_PATH = f"custom_components.{DOMAIN}.resources.swagger.json"
+# пути, тело ответа которых сравнивается с прошлым по отпечатку: повтор
+# возвращается тем же объектом, и координатор пропускает нормализацию.
+# Остальные пути (страницы, диапазоны, запросы с датой) почти не повторяются,
+# а их payload держать в памяти незачем
+_FINGERPRINT_PATHS = frozenset({"/all-devices"})
 
-@dataclass
-class _PathPointers:
-    regex: re.Pattern  # compiled ^/devices/[^/]+/recent-data$
-    pointers: List[List[str]]  # [['deviceViewDtos', '*', 'mostRecentDataPoint'], ...]
+# сколько первых байт тела ответа пишется в debug‑лог
+_DEBUG_CAPTURE_BYTES = 2048
 
-# ---------------------------------------------------------------------------
-# 2) Построение карты path → pointers по swagger
-def _build_dp_schema_map() -> List[_PathPointers]:
-    """Строит карту REST‑путь → JSON‑пойнтеры для DTO‑datapoint."""
-
-    # ---------- helpers ----------
-    def _load_swagger() -> Dict[str, Any]:
-        return json.loads(files("custom_components.pulselabs.resources").joinpath("swagger.json").read_text())
-
-    def _schema_name(ref: str) -> str | None:
-        return ref.split("/")[-1] if ref.startswith("#/components/schemas/") else None
-
-    def _merge_composite(schema: Dict[str, Any]) -> Dict[str, Any]:
-        """Разворачивает allOf/oneOf/anyOf в плоский dict."""
-        for key in ("allOf", "oneOf", "anyOf"):
-            if key in schema:
-                merged: Dict[str, Any] = {}
-                for sub in schema[key]:
-                    merged.update(_merge_composite(sub))
-                return merged
-        return schema
-
-    def _traverse_schema(schema: Dict[str, Any], prefix: List[str], stack: List[str]) -> List[List[str]]:
-        """Ищет пути до countable‑DTO.
-        `stack` хранит имена `$ref`, встреченные в текущей цепочке, чтобы
-        избегать локальных циклов, но не блокировать такие же схемы по
-        другим путям.
-        """
-        found: List[List[str]] = []
-        schema = _merge_composite(schema)
-
-        # --- $ref ---
-        if "$ref" in schema:
-            ref_name = _schema_name(schema["$ref"])
-            if not ref_name:
-                return found
-            if ref_name in stack:  # цикл A→B→A
-                return found
-
-            if ref_name in _COUNTABLE_TYPES:
-                found.append(prefix.copy())
-                # продолжаем обход, чтобы захватить дочерние массивы, если есть
-            # рекурсивно раскрываем, передавая обновлённый стек
-            resolved = components.get(ref_name, {})
-            if resolved:
-                found.extend(_traverse_schema(resolved, prefix, stack + [ref_name]))
-            return found
-
-        stype = schema.get("type")
-
-        # объект‑контейнер
-        if stype == "object":
-            for prop, subschema in (schema.get("properties") or {}).items():
-                found.extend(_traverse_schema(subschema, prefix + [prop], stack))
-            return found
-
-        # массив
-        if stype == "array":
-            found.extend(_traverse_schema(schema.get("items", {}), prefix + ["*"], stack))
-        return found
-
-    # ---------- основная логика ----------
-    swagger = _load_swagger()
-    components = swagger.get("components", {}).get("schemas", {})
-    paths_obj = swagger.get("paths", {})
-
-    result: List[_PathPointers] = []
-    for raw_path, methods in paths_obj.items():
-        get_def = methods.get("get")
-        if not get_def:
-            continue
-
-        resp_block = get_def.get("responses", {}).get("200", {})
-        content = resp_block.get("content")
-        if content:
-            resp_schema = next(iter(content.values())).get("schema", {})
-        else:
-            resp_schema = resp_block.get("schema", {})
-        if not resp_schema:
-            continue
-
-        pointers = _traverse_schema(resp_schema, [], stack=[])
-        if not pointers:
-            continue
+# отложенный запрос просыпается чуть позже сброса квоты
+_DEFER_MARGIN = timedelta(seconds=5)
 
-        regex = re.compile("^" + re.sub(r"{[^/]+}", "[^/]+", raw_path) + "$")
-        result.append(_PathPointers(regex=regex, pointers=pointers))
 
-    return result
-
-_DP_SCHEMA_MAP: List[_PathPointers] = _build_dp_schema_map()
-
-_LOGGER.debug(_DP_SCHEMA_MAP)
-
-# ---------------------------------------------------------------------------
-# 3) Счётчик datapoint‑ов по payload & pointers
-def _count_by_pointers(payload: Any, pointers: Sequence[Sequence[str]]) -> int:
-    """Считает datapoints, обходя payload только по интересующим путям."""
-
-    def _count_for_ptr(node: Any, ptr: Sequence[str]) -> int:
-        if not ptr:
-            # оказались на объекте, который swagger пометил как countable
-            if isinstance(node, list):
-                return len(node)
-            return 1 if node is not None else 0
-
-        key, *rest = ptr
-        if key == "*":
-            if not isinstance(node, list):
-                return 0
-            return sum(_count_for_ptr(child, rest) for child in node)
-        if isinstance(node, dict) and key in node:
-            return _count_for_ptr(node[key], rest)
-        return 0
-
-    return sum(_count_for_ptr(payload, ptr) for ptr in pointers)
+def _range_query(start: datetime, end: datetime) -> str:
+    return "?" + urlencode({"start": start.isoformat(), "end": end.isoformat()})
 
 # ---------------------------------------------------------------------------
 # 4) Базовый API‑клиент
 class BaseApi:
     """Общие helper‑методы **и централизованный счётчик datapoints**.
 
-    Наследники обязаны переопределить `async_get()`, но **должны**
-    вызывать `self._register_datapoints(path, payload)` перед возвратом
+    Наследники обязаны переопределить `_async_fetch()`, но **должны**
+    вызывать `self._register_usage(path, payload)` перед возвратом
     ответа, чтобы корректно учитывать расход суточной квоты.
+
+    `async_get()` объединяет одновременные GET одного пути в один запрос
+    (single‑flight): все ожидающие получают один и тот же payload, квота
+    списывается один раз. Опционально ответы держатся в коротком TTL‑кэше,
+    чтобы поглощать всплески вызовов. Payload общий — не мутировать.
+
+    Если задан `BudgetGate` (`set_budget_gate()`), каждый новый запрос
+    сначала оценивается `CostEstimator` и не отправляется, если не
+    помещается в остаток бюджета: бросается `BudgetExceededError` или,
+    при `defer=True`, запрос ждёт сброса квоты. Живой опрос ходит с
+    `priority=True` и может тратить резерв, недоступный разовым вызовам.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, response_ttl: float = 0.0, json_loads: JsonLoads = json_loads) -> None:
         self.datapoints_today = 0
         self._last_call_datetime = dt_util.now()
         self._last_call_success: bool = False
+        self._last_call_cost: int = 0
 
         self._on_usage_update: Callable[[], None] | None = None
 
+        # single‑flight: path → выполняющийся запрос
+        self._inflight: dict[str, asyncio.Future] = {}
+        # TTL‑кэш: path → (monotonic‑время истечения, payload); 0 — выключен
+        self._response_ttl = response_ttl
+        self._response_cache: dict[str, tuple[float, Any]] = {}
+        self.coalesced_calls = 0
+        self.cache_hits = 0
+
+        # отпечатки тел ответов _FINGERPRINT_PATHS: path → (digest, payload, стоимость в datapoints)
+        self._fingerprints: dict[str, tuple[bytes, Any, int]] = {}
+        self.fingerprint_checks = 0
+        self.fingerprint_hits = 0
+        # декодер тела ответа: bytes → payload (orjson, если есть)
+        self._json_loads = json_loads
+
+        # предварительная оценка стоимости и бюджет; без gate — не ограничиваем
+        self.estimator = CostEstimator()
+        self.budget: BudgetGate | None = None
+
+        # p50/p95/p99 по шаблонам эндпоинтов: сеть, байты, разбор, подсчёт
+        self.metrics = EndpointMetrics()
+
     def set_usage_state(self, used: int, last_call_datetime: str):
         self.datapoints_today = used
         self._last_call_datetime = dt_util.parse_datetime(last_call_datetime) or dt_util.now()
@@ -200,6 +128,9 @@ class BaseApi:
     def set_usage_update_callback(self, callback: Callable[[], None]):
         self._on_usage_update = callback
 
+    def set_budget_gate(self, gate: BudgetGate | None) -> None:
+        self.budget = gate
+
     # ---------------- internal helpers
 
     def _reset_usage_if_new_day(self) -> None:
@@ -211,30 +142,154 @@ class BaseApi:
 
     def _increment_usage(self, amount: int) -> None:
         self._reset_usage_if_new_day()
-        self.datapoints_today += max(amount, 1)
+        self._last_call_cost = max(amount, 1)
+        self.datapoints_today += self._last_call_cost
         self._last_call_datetime =  dt_util.now()
         if self._on_usage_update:
             self._on_usage_update()
 
-    def _register_usage(self, path: str, payload: Any) -> None:
+    def _register_usage(self, path: str, payload: Any) -> int:
         """Определяет расход квоты по swagger‑карте. Если подходящего
         пути нет или ничего не найдено, засчитывает 1 datapoint.
         """
-        plain_path = path.split("?")[0]
-        total = 0
-        for entry in _DP_SCHEMA_MAP:
-            if entry.regex.match(plain_path):
-                total = _count_by_pointers(payload, entry.pointers)
-                break
+        started = time.perf_counter()
+        entry = get_dp_router().resolve(path)
+        total = entry.count(payload) if entry else 0
+        self.metrics.observe(path, "count_ms", (time.perf_counter() - started) * 1000)
         if total == 0:
             total = 1  # правило API: вызов без datapoints = 1
         self._increment_usage(total)
+        self.metrics.observe(path, "datapoints", total)
+        self.estimator.observe(path, payload, total)
+        return total
 
-    # ---------------- public helpers (должны вызывать _register_dp)
+    async def _async_reserve_budget(self, path: str, priority: bool, defer: bool) -> int:
+        """Резервирует оценку стоимости запроса в бюджете; 0 — gate не задан.
 
-    async def async_get(self, path: str):
+        При нехватке бюджета бросает `BudgetExceededError`, а с `defer=True`
+        ждёт сброса квоты (если запрос вообще помещается в суточный потолок).
+        """
+        if self.budget is None:
+            return 0
+        estimated = self.estimator.estimate(path)
+        while True:
+            self._reset_usage_if_new_day()  # на границе суток bucket полон
+            try:
+                return self.budget.acquire(path, estimated, self.datapoints_today, priority)
+            except BudgetExceededError:
+                if not defer or not self.budget.fits_ceiling(estimated, priority):
+                    raise
+            delay = (self.next_quota_reset() + _DEFER_MARGIN - dt_util.now()).total_seconds()
+            _LOGGER.info("Pulse API call %s (~%d datapoints) deferred for %.0f s", path, estimated, delay)
+            await asyncio.sleep(max(delay, 0))
+
+    def _release_budget(self, reserved: int) -> None:
+        if self.budget is not None and reserved:
+            self.budget.release(reserved)
+
+    def _decode_body(self, path: str, body: bytes) -> Any:
+        """Разбирает тело ответа (`bytes`, без копии в `str`) и списывает квоту.
+
+        Если тело ответа пути из `_FINGERPRINT_PATHS` байт‑в‑байт совпадает с прошлым,
+        JSON не разбирается: возвращается *тот же объект* payload, а квота
+        списывается по запомненной стоимости. Вызывающий код может
+        сравнить payload по `is`, чтобы пропустить нормализацию.
+        """
+        self.metrics.observe(path, "bytes", len(body))
+        digest = None
+        if path in _FINGERPRINT_PATHS:
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+            self.fingerprint_checks += 1
+            previous = self._fingerprints.get(path)
+            if previous is not None and previous[0] == digest:
+                self.fingerprint_hits += 1
+                _, payload, cost = previous
+                self._increment_usage(cost)
+                self.metrics.observe(path, "datapoints", cost)
+                return payload
+
+        started = time.perf_counter()
+        payload = self._json_loads(body)
+        self.metrics.observe(path, "decode_ms", (time.perf_counter() - started) * 1000)
+        cost = self._register_usage(path, payload)
+        if digest is not None:
+            self._fingerprints[path] = (digest, payload, cost)
+        return payload
+
+    @property
+    def fingerprint_hit_rate(self) -> float | None:
+        """Доля ответов, совпавших с предыдущим (0…1)."""
+        if not self.fingerprint_checks:
+            return None
+        return self.fingerprint_hits / self.fingerprint_checks
+
+    def _cache_get(self, path: str) -> tuple[bool, Any]:
+        cached = self._response_cache.get(path)
+        if cached is None:
+            return False, None
+        expires, payload = cached
+        if expires <= time.monotonic():
+            del self._response_cache[path]
+            return False, None
+        return True, payload
+
+    def _cache_put(self, path: str, payload: Any) -> None:
+        now = time.monotonic()
+        # чистим протухшие записи, чтобы кэш не рос по уникальным путям
+        for stale in [p for p, (expires, _) in self._response_cache.items() if expires <= now]:
+            del self._response_cache[stale]
+        self._response_cache[path] = (now + self._response_ttl, payload)
+
+    async def _async_fetch(self, path: str):
+        """Один реальный запрос; реализуют наследники."""
         raise NotImplementedError
 
+    async def _async_fetch_and_cache(self, path: str, reserved: int = 0):
+        try:
+            payload = await self._async_fetch(path)
+        finally:
+            self._release_budget(reserved)
+        if self._response_ttl > 0:
+            self._cache_put(path, payload)
+        return payload
+
+    # ---------------- public helpers
+
+    async def async_get(self, path: str, *, priority: bool = False, defer: bool = False):
+        """GET с объединением одновременных запросов и опциональным TTL‑кэшем.
+
+        Кэш и присоединение к выполняющемуся запросу квоту не тратят, поэтому
+        бюджет проверяется только перед новым запросом.
+        """
+        if self._response_ttl > 0:
+            hit, payload = self._cache_get(path)
+            if hit:
+                self.cache_hits += 1
+                return payload
+
+        reserved = 0
+        future = self._inflight.get(path)
+        if future is None:
+            reserved = await self._async_reserve_budget(path, priority, defer)
+            # пока ждали сброса квоты, такой же запрос мог уже уйти
+            future = self._inflight.get(path)
+        if future is None:
+            future = asyncio.ensure_future(self._async_fetch_and_cache(path, reserved))
+            self._inflight[path] = future
+            future.add_done_callback(lambda fut: self._on_fetch_done(path, fut))
+        else:
+            self._release_budget(reserved)
+            self.coalesced_calls += 1
+
+        # shield: отмена одного ожидающего не отменяет общий запрос
+        return await asyncio.shield(future)
+
+    def _on_fetch_done(self, path: str, future: asyncio.Future) -> None:
+        if self._inflight.get(path) is future:
+            del self._inflight[path]
+        if not future.cancelled():
+            future.exception()  # помечаем исключение прочитанным, если ждать уже некому
+
     async def async_get_users(self):
         return await self.async_get("/users")
 
@@ -246,33 +301,180 @@ class BaseApi:
         return users[0].get("userName", "PulseLabs") if users else "PulseLabs"
 
     async def async_get_all_devices(self):
-        return await self.async_get("/all-devices")
+        # живой опрос — вправе тратить резерв бюджета
+        return await self.async_get("/all-devices", priority=True)
         #return data.get("deviceViewDtos", []) if isinstance(data, dict) else data
 
+    # ---------------- потоковый режим для истории
+
+    async def async_stream(self, path: str, *, defer: bool = False) -> AsyncIterator[Any]:
+        """Отдаёт элементы JSON‑массива по мере разбора ответа.
+
+        Базовая реализация (mock) читает ответ целиком через `async_get()`;
+        `PulseApi` переопределяет её настоящим потоковым разбором.
+        """
+        payload = await self.async_get(path, defer=defer)
+        if not isinstance(payload, list):
+            raise ValueError(f"Streaming requires a JSON array response: {path}")
+        for item in payload:
+            yield item
+
+    def async_iter_devices_range(self, start: datetime, end: datetime, *, defer: bool = False) -> AsyncIterator[Any]:
+        return self.async_stream(f"/devices/range{_range_query(start, end)}", defer=defer)
+
+    def async_iter_device_data_range(
+        self, device_id, start: datetime, end: datetime, *, defer: bool = False
+    ) -> AsyncIterator[Any]:
+        return self.async_stream(f"/devices/{device_id}/data-range{_range_query(start, end)}", defer=defer)
+
+    def async_iter_sensor_data_range(
+        self, sensor_id, start: datetime, end: datetime, *, defer: bool = False
+    ) -> AsyncIterator[Any]:
+        return self.async_stream(f"/sensors/{sensor_id}/data-range{_range_query(start, end)}", defer=defer)
+
+    async def async_get_timeline(
+        self, start: datetime, *, end: datetime | None = None, count: int, page: int = 0
+    ) -> list[dict]:
+        """Одна страница `/api/timeline` с событиями не раньше `start` (и не позже `end`)."""
+        params = {"startDate": start.isoformat()}
+        if end is not None:
+            params["endDate"] = end.isoformat()
+        query = urlencode({**params, "count": count, "page": page})
+        payload = await self.async_get(f"/api/timeline?{query}")
+        if isinstance(payload, dict):
+            # swagger описывает ответ одним TimelineEventDto
+            return [payload] if payload.get("id") is not None else []
+        return payload or []
+
+    async def async_get_triggered_thresholds(self) -> list[dict]:
+        """`SortedTriggeredThresholdsDto` по всем гроу аккаунта."""
+        return await self.async_get("/api/triggered-thresholds") or []
+
+    async def async_iter_light_reading_pages(self, device_id, *, defer: bool = False) -> AsyncIterator[dict]:
+        """Страницы `LightReadingsResponseDto` прибора Pro, начиная с нулевой.
+
+        Следующая страница запрашивается, только когда вызывающий код дочитал
+        предыдущую: `break` после уже известных замеров экономит запросы.
+        """
+        page = 0
+        while True:
+            payload = await self.async_get(f"/api/light-readings/{device_id}?page={page}", defer=defer)
+            if not isinstance(payload, dict):
+                raise ValueError(f"Unexpected light-readings response for device {device_id}")
+            yield payload
+            page = (payload.get("currentPage") or page) + 1
+            if page >= (payload.get("numPages") or 0) or not payload.get("lightReadings"):
+                return
 
     @property
     def last_call_success(self) -> bool:
         return self._last_call_success
 
+    def transport_diagnostics(self) -> dict[str, Any]:
+        """Состояние транспорта (повторы, circuit breaker) для диагностики."""
+        return {}
+
+    def estimate_cost(self, path: str, params: dict[str, Any] | None = None) -> int:
+        """Сколько datapoints, по оценке, спишет GET `path` — без запроса."""
+        return self.estimator.estimate(with_params(path, params))
+
+    def explain_cost(self, path: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        """То же, что `estimate_cost()`, с разбивкой и остатком бюджета."""
+        full_path = with_params(path, params)
+        details = self.estimator.explain(full_path)
+        self._reset_usage_if_new_day()
+        details["used_today"] = self.datapoints_today
+        if self.budget is not None:
+            details["available_today"] = self.budget.available(self.datapoints_today)
+            details["fits_today"] = details["datapoints"] <= details["available_today"]
+        return details
+
+    def endpoint_stats(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Перцентили по эндпоинтам: `{шаблон: {метрика: {p50, p95, p99, count}}}`."""
+        return self.metrics.stats()
+
+    def budget_diagnostics(self) -> dict[str, Any]:
+        """Состояние бюджета квоты для диагностики."""
+        if self.budget is None:
+            return {}
+        return {
+            "budget_ceiling": self.budget.ceiling,
+            "budget_reserve": self.budget.reserve,
+            "budget_available": self.budget.available(self.datapoints_today),
+            "budget_refused": self.budget.refused,
+        }
+
+    @property
+    def last_call_cost(self) -> int:
+        """Сколько datapoints списал последний вызов."""
+        return self._last_call_cost
+
+    def next_quota_reset(self) -> datetime:
+        """Момент сброса суточного счётчика (локальная полночь, см. `_reset_usage_if_new_day`)."""
+        return dt_util.start_of_local_day() + timedelta(days=1)
+
 # ---------------------------------------------------------------------------
 # 5) Реальный REST‑клиент
 class PulseApi(BaseApi):
     """Реальный REST‑клиент Pulse Labs."""
 
-    def __init__(self, session: aiohttp.ClientSession, api_key: str):
-        super().__init__()
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        api_key: str,
+        response_ttl: float = 0.0,
+        request_timeout: float = REQUEST_TIMEOUT,
+        transport: ResilientTransport | None = None,
+        base_url: str = BASE_URL,
+        json_loads: JsonLoads = json_loads,
+        connection_stats: ConnectionStats | None = None,
+    ):
+        super().__init__(response_ttl=response_ttl, json_loads=json_loads)
         self._session = session
         self._api_key = api_key
+        self._base_url = base_url
+        self._request_timeout = request_timeout
+        # повторы с backoff, 429/Retry-After и circuit breaker
+        self.transport = transport or ResilientTransport()
+        # счётчики соединений выделенной сессии (`connector.create_session`)
+        self.connection_stats = connection_stats
+
+    def transport_diagnostics(self) -> dict[str, Any]:
+        diagnostics = self.transport.as_dict()
+        if self.connection_stats is not None:
+            diagnostics.update(self.connection_stats.as_dict())
+        return diagnostics
+
+    async def _async_read(self, url: str, headers: dict[str, str]) -> bytes:
+        """Одна попытка GET; повторы — в `ResilientTransport`."""
+        async with async_timeout.timeout(self._request_timeout):
+            async with self._session.get(url, headers=headers) as resp:
+                resp.raise_for_status()
+                return await resp.read()
+
+    async def _async_open_stream(self, url: str, headers: dict[str, str]) -> aiohttp.ClientResponse:
+        """Одна попытка открыть потоковый ответ (до первого байта тела)."""
+        resp = await self._session.get(url, headers=headers, timeout=_STREAM_TIMEOUT)
+        try:
+            resp.raise_for_status()
+        except aiohttp.ClientResponseError:
+            resp.release()
+            raise
+        return resp
 
-    async def async_get(self, path: str):
-        url = f"{BASE_URL}{path}"
+    async def _async_fetch(self, path: str):
+        url = f"{self._base_url}{path}"
         headers = {"x-api-key": self._api_key}
         try:
-            async with async_timeout.timeout(15):
-                async with self._session.get(url, headers=headers) as resp:
-                    resp.raise_for_status()
-                    data = await resp.json()
-                    self._last_call_success = True
+            started = time.perf_counter()
+            body = await self.transport.call(lambda: self._async_read(url, headers))
+            self.metrics.observe(path, "network_ms", (time.perf_counter() - started) * 1000)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                # сырые байты как есть — без повторной сериализации payload
+                _LOGGER.debug("Pulse API %s: %d bytes %r", path, len(body), body[:_DEBUG_CAPTURE_BYTES])
+            # разбор + учёт datapoints до возврата вызывающему коду
+            data = self._decode_body(path, body)
+            self._last_call_success = True
         except aiohttp.ClientError as err:
             _LOGGER.warning("Pulse API network error (%s): %s", path, err)
             self._last_call_success = False
@@ -286,15 +488,53 @@ class PulseApi(BaseApi):
             self._last_call_success = False
             raise
 
-        # Учтём расход datapoints до возврата вызывающему коду
-        self._register_usage(path, data)
         return data
 
+    async def async_stream(self, path: str, *, defer: bool = False) -> AsyncIterator[Any]:
+        """Потоковый GET: элементы массива уходят вызывающему коду до конца
+        загрузки, datapoints считаются по тем же элементам «на лету»."""
+        reserved = await self._async_reserve_budget(path, False, defer)
+        url = f"{self._base_url}{path}"
+        headers = {"x-api-key": self._api_key}
+        entry = get_dp_router().resolve(path)
+        item_count = entry.item_count if entry else None
+        counted = 0
+        responded = False
+        try:
+            # повторяется только открытие ответа: отданные элементы не переиграть
+            resp = await self.transport.call(lambda: self._async_open_stream(url, headers))
+            async with resp:
+                responded = True
+                self._last_call_success = True
+                async for item in iter_json_array(resp.content.iter_chunked(_STREAM_CHUNK_SIZE)):
+                    if item_count is not None:
+                        counted += item_count(item)
+                    yield item
+        except aiohttp.ClientError as err:
+            _LOGGER.warning("Pulse API network error (%s): %s", path, err)
+            self._last_call_success = False
+            raise
+        except asyncio.TimeoutError:
+            _LOGGER.warning("Pulse API request timed out: %s", path)
+            self._last_call_success = False
+            raise
+        finally:
+            # ответ получен → квота израсходована, даже если поток прервали
+            self._release_budget(reserved)
+            if responded:
+                self._increment_usage(counted)
+                self.estimator.observe(path, None, max(counted, 1))
+                self.metrics.observe(path, "datapoints", max(counted, 1))
+
 # ---------------------------------------------------------------------------
 # 6) Фабрика — возвращает real / mock
-def get_api(session: aiohttp.ClientSession, api_key: str) -> BaseApi:
+def get_api(
+    session: aiohttp.ClientSession,
+    api_key: str,
+    connection_stats: ConnectionStats | None = None,
+) -> BaseApi:
     from .mock_api import MockPulseApi  # локальный импорт, чтобы не ловить циклы
 
     if os.getenv("PULSE_API_MODE", "").lower() == "mock" or str(api_key).lower() == "mock":
         return MockPulseApi()           # наследник BaseApi
-    return PulseApi(session, api_key)
\ No newline at end of file
+    return PulseApi(session, api_key, response_ttl=RESPONSE_CACHE_TTL, connection_stats=connection_stats)
\ No newline at end of file
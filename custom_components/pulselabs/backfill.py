@@ -0,0 +1,397 @@
+"""
+custom_components.pulselabs.backfill
+------------------------------------
+Догрузка пропусков истории в долгосрочную статистику Home Assistant.
+
+Координатор видит только `mostRecentDataPoint`, поэтому всё, что
+произошло, пока HA был выключен, облако лежало или координатор отдавал
+`_last_successful_data`, из истории пропадает. Движок помнит для каждого
+устройства, до какого момента данные уже пришли «вживую» или были
+догружены (`covered_until`), и закрывает разрыв до последнего полного часа:
+
+* `/devices/{id}/data-range` запрашивается окнами `BACKFILL_WINDOW`
+  через `defer=True` — бюджетный gate не даёт съесть резерв живого
+  опроса, а при нехватке квоты окно ждёт её сброса;
+* точки нормализуются тем же `_wrap_device`, что и живые (VPD, точка
+  росы), сворачиваются в часовые mean/min/max и импортируются как
+  статистика соответствующих сущностей `DEVICE_SENSOR_MAP`;
+* сенсоры хабов (`universalSensorViews`) догружаются через
+  `/sensors/{id}/data-range` параллельно (`hub_history`), не более
+  `BACKFILL_SENSOR_CONCURRENCY` запросов сразу, и нормализуются `_wrap_sensor`;
+* простой самого координатора (опрос падал и отдавал `_last_successful_data`)
+  закрывается сразу после восстановления одним `/devices/range` на всё окно
+  (`async_fill_outage`) — дешевле по задержке и квоте, чем по устройствам;
+* checkpoint сохраняется в `Store` после каждого окна, так что прерванная
+  догрузка продолжается с того же места после перезапуска.
+
+Работает фоновой задачей записи и не блокирует живой опрос.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_import_statistics
+from homeassistant.components.sensor.const import UNIT_CONVERTERS
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .budget import BudgetExceededError
+from .const import (
+    DOMAIN,
+    DEVICE_SENSOR_MAP,
+    BACKFILL_WINDOW,
+    BACKFILL_INITIAL_LOOKBACK,
+    BACKFILL_MAX_LOOKBACK,
+    BACKFILL_CHECK_INTERVAL,
+    BACKFILL_LIVE_GAP,
+    BACKFILL_SENSOR_CONCURRENCY,
+    slugify,
+)
+from .history import HourlyAggregator, floor_hour, missed_points, parse_created_at
+from .hub_history import async_iter_sensor_histories
+
+try:  # HA ≥ 2025.4: has_mean заменён на mean_type
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:  # pragma: no cover
+    StatisticMeanType = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# checkpoint пишется не чаще, чем раз в столько секунд (живые опросы частые)
+_SAVE_DELAY = 60
+
+_HOUR = timedelta(hours=1)
+
+
+class PulseBackfill:
+    """Фоновая догрузка пропусков истории устройств в статистику."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, coordinator) -> None:
+        self.hass = hass
+        self.entry = entry
+        self.coordinator = coordinator
+        self._store = Store(hass, 1, f"{DOMAIN}_backfill_{entry.entry_id}.json")
+
+        # device_id / sensor_<id> → ISO‑момент, до которого история уже есть
+        self._covered: dict[str, str] = {}
+        self._running = False
+
+        self.imported_hours = 0
+        self.outage_fills = 0
+        self.outage_points = 0
+        self.last_run: datetime | None = None
+
+    # ---------------- checkpoint
+
+    async def async_load(self) -> None:
+        saved = await self._store.async_load()
+        if saved:
+            self._covered.update(saved.get("covered_until", {}))
+
+    def _schedule_save(self) -> None:
+        self._store.async_delay_save(lambda: {"covered_until": self._covered}, _SAVE_DELAY)
+
+    def _covered_until(self, device_id: str) -> datetime | None:
+        value = self._covered.get(device_id)
+        return dt_util.parse_datetime(value) if value else None
+
+    def _advance(self, device_id: str, moment: datetime) -> None:
+        current = self._covered_until(device_id)
+        if current is None or moment > current:
+            self._covered[device_id] = moment.isoformat()
+            self._schedule_save()
+
+    @callback
+    def _async_on_live_update(self) -> None:
+        """Свежие данные опроса: история покрыта до их createdAt."""
+        data = self.coordinator.data or {}
+        for device_id, device in data.get("devices", {}).items():
+            self._note_live(device_id, device.get("createdAt"))
+        for sensor in data.get("sensors", {}).values():
+            self._note_live(f"sensor_{sensor['id']}", sensor.get("createdAt"))
+
+    def _note_live(self, cover_key: str, created_at: str | None) -> None:
+        moment = parse_created_at(created_at)
+        if moment is None:
+            return
+        covered = self._covered_until(cover_key)
+        if covered is None:
+            # первая встреча: живые данные есть только с этого момента
+            self._covered[cover_key] = (moment - BACKFILL_INITIAL_LOOKBACK).isoformat()
+            self._schedule_save()
+        elif moment - covered <= BACKFILL_LIVE_GAP:
+            # опросы идут без разрыва; больший разрыв оставляем догрузке
+            self._advance(cover_key, moment)
+
+    # ---------------- запуск
+
+    @callback
+    def async_start(self) -> None:
+        """Подписка на живые данные, первый прогон и периодическая проверка."""
+        self.entry.async_on_unload(self.coordinator.async_add_listener(self._async_on_live_update))
+        self.entry.async_on_unload(
+            async_track_time_interval(self.hass, self._async_schedule, BACKFILL_CHECK_INTERVAL)
+        )
+        self._async_schedule()
+
+    @callback
+    def _async_schedule(self, _now: datetime | None = None) -> None:
+        if self._running or "recorder" not in self.hass.config.components:
+            return
+        self.entry.async_create_background_task(
+            self.hass, self._async_run(), f"{DOMAIN}_backfill_{self.entry.entry_id}"
+        )
+
+    def _gap(self, device_id: str, until: datetime) -> tuple[datetime, datetime] | None:
+        """Полные часы без истории: [начало часа covered_until, начало часа until)."""
+        covered = self._covered_until(device_id)
+        if covered is None:
+            return None
+        start = max(floor_hour(covered), floor_hour(until - BACKFILL_MAX_LOOKBACK))
+        end = floor_hour(until)
+        return (start, end) if start < end else None
+
+    async def _async_run(self) -> None:
+        self._running = True
+        try:
+            now = dt_util.utcnow()
+            data = self.coordinator.data or {}
+            for device_id, device in data.get("devices", {}).items():
+                gap = self._gap(device_id, now)
+                if gap is not None:
+                    await self._async_backfill_device(device_id, device, *gap)
+
+            # сенсоры хабов: группируем по одинаковому разрыву (обычно — общий
+            # простой HA) и грузим каждое окно сразу для всей группы
+            sensors: dict[Any, dict[str, dict]] = {}
+            for key, sensor in data.get("sensors", {}).items():
+                sensors.setdefault(sensor["id"], {})[key] = sensor
+            groups: dict[tuple[datetime, datetime], dict[Any, dict[str, dict]]] = {}
+            for sensor_id, values in sensors.items():
+                gap = self._gap(f"sensor_{sensor_id}", now)
+                if gap is not None:
+                    groups.setdefault(gap, {})[sensor_id] = values
+            for (start, end), group in groups.items():
+                await self._async_backfill_sensors(group, start, end)
+        finally:
+            self._running = False
+            self.last_run = dt_util.utcnow()
+
+    # ---------------- одно устройство
+
+    async def _async_backfill_device(self, device_id: str, device: dict, start: datetime, end: datetime) -> None:
+        _LOGGER.debug("Backfilling device %s from %s to %s", device_id, start, end)
+        window_start = start
+        while window_start < end:
+            window_end = min(window_start + BACKFILL_WINDOW, end)
+            aggregator = HourlyAggregator(DEVICE_SENSOR_MAP)
+            try:
+                async for point in self.coordinator.api.async_iter_device_data_range(
+                    device_id, window_start, window_end, defer=True
+                ):
+                    moment = parse_created_at(point.get("createdAt"))
+                    if moment is not None and window_start <= moment < window_end:
+                        aggregator.add(moment, self.coordinator._wrap_device(device, point))
+            except BudgetExceededError as err:
+                # окно не влезает даже в полный суточный бюджет — не дробим бесконечно
+                _LOGGER.warning("Backfill of device %s stopped: %s", device_id, err)
+                return
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.warning("Backfill of device %s failed, will retry later: %s", device_id, err)
+                return
+
+            self._import_device(device_id, aggregator, window_start, window_end)
+            self._advance(device_id, window_end)
+            window_start = window_end
+
+    def _import_device(self, device_id: str, aggregator: HourlyAggregator, start: datetime, end: datetime) -> None:
+        """Импорт часов, целиком лежащих в [start, end): края окна — неполные часы."""
+        registry = er.async_get(self.hass)
+        for key in aggregator.keys():
+            unique_id = f"{self.entry.entry_id}_device_{device_id}_{key}"
+            entity_id = registry.async_get_entity_id("sensor", DOMAIN, unique_id)
+            if entity_id is None:
+                continue
+            rows = [row for row in aggregator.rows(key) if start <= row["start"] and row["start"] + _HOUR <= end]
+            if rows:
+                description = DEVICE_SENSOR_MAP[key]
+                self._import(entity_id, rows, description.native_unit_of_measurement, description.device_class)
+
+    # ---------------- простой координатора
+
+    @callback
+    def async_fill_outage(self, start: datetime, end: datetime, last_seen: dict[str, datetime | None]) -> None:
+        """Координатор снова получил данные после простоя [start, end)."""
+        self.entry.async_create_background_task(
+            self.hass,
+            self._async_fill_outage(start, end, last_seen),
+            f"{DOMAIN}_outage_fill_{self.entry.entry_id}",
+        )
+
+    async def _async_fill_outage(self, start: datetime, end: datetime, last_seen: dict[str, datetime | None]) -> None:
+        """Один `/devices/range` на весь простой вместо запросов по устройствам.
+
+        Точки, уже виденные вживую до простоя, отбрасываются; остальные
+        досыпаются в кольцевые буферы координатора, а полные часы простоя —
+        в статистику. После этого checkpoint устройства сдвигается на конец
+        простоя, и почасовая догрузка это окно повторно не запрашивает.
+        """
+        start = max(start, end - BACKFILL_MAX_LOOKBACK)
+        _LOGGER.debug("Filling outage from %s to %s", start, end)
+        try:
+            points = [point async for point in self.coordinator.api.async_iter_devices_range(start, end, defer=True)]
+        except Exception as err:  # pylint: disable=broad-except
+            # разрыв останется почасовой догрузке (BACKFILL_LIVE_GAP)
+            _LOGGER.warning("Outage fill from %s to %s failed: %s", start, end, err)
+            return
+
+        devices = (self.coordinator.data or {}).get("devices", {})
+        recorder = "recorder" in self.hass.config.components
+        for device_id, missed in missed_points(points, last_seen).items():
+            device = devices.get(device_id)
+            if device is None:
+                continue
+            aggregator = HourlyAggregator(DEVICE_SENSOR_MAP)
+            series = []
+            for moment, point in missed:
+                wrapped = self.coordinator._wrap_device(device, point)
+                aggregator.add(moment, wrapped)
+                series.append((moment.timestamp(), wrapped))
+            self.outage_points += self.coordinator.series.merge("devices", device_id, series)
+            if recorder:
+                self._import_device(device_id, aggregator, start, end)
+
+            covered = self._covered_until(device_id)
+            if covered is not None and start - covered <= BACKFILL_LIVE_GAP:
+                # только без более раннего незакрытого разрыва
+                self._advance(device_id, end)
+        self.outage_fills += 1
+
+    # ---------------- сенсоры хабов
+
+    async def _async_backfill_sensors(
+        self, sensors: dict[Any, dict[str, dict]], start: datetime, end: datetime
+    ) -> None:
+        """Окнами по всей группе; внутри окна — параллельно по сенсорам."""
+        _LOGGER.debug("Backfilling %d hub sensors from %s to %s", len(sensors), start, end)
+        api = self.coordinator.api
+        window_start = start
+        while window_start < end and sensors:
+            window_end = min(window_start + BACKFILL_WINDOW, end)
+            histories = async_iter_sensor_histories(
+                lambda sensor_id: api.async_iter_sensor_data_range(
+                    sensor_id, window_start, window_end, defer=True
+                ),
+                list(sensors),
+                lambda sensor_id, dp_value: self._wrap_sensor_point(sensors[sensor_id], dp_value),
+                concurrency=BACKFILL_SENSOR_CONCURRENCY,
+            )
+            failed = set()
+            async for history in histories:
+                if history.error is not None:
+                    _LOGGER.warning(
+                        "Backfill of sensor %s failed, will retry later: %s", history.sensor_id, history.error
+                    )
+                    failed.add(history.sensor_id)
+                    continue
+                self._import_sensor(sensors[history.sensor_id], history.points, window_start, window_end)
+                self._advance(f"sensor_{history.sensor_id}", window_end)
+            # сенсор с ошибкой догрузится со своего checkpoint в следующий раз
+            sensors = {sid: values for sid, values in sensors.items() if sid not in failed}
+            window_start = window_end
+
+    def _wrap_sensor_point(self, values: dict[str, dict], dp_value: dict) -> dict:
+        """Точка истории → форма `_wrap_sensor`, по метаданным живого сенсора."""
+        sample = next(iter(values.values()))
+        hub = None if sample["hubId"] == "hub_unassigned" else {"id": sample["hubId"], "name": sample["hubName"]}
+        sensor = {
+            "id": sample["id"],
+            "deviceType": sample["deviceType"],
+            "name": sample["name"],
+            "sensorType": sample["type"],
+        }
+        return self.coordinator._wrap_sensor(hub, sensor, dp_value)
+
+    def _import_sensor(
+        self, values: dict[str, dict], points: list, window_start: datetime, window_end: datetime
+    ) -> None:
+        aggregator = HourlyAggregator(values)
+        for created_at, wrapped in points:
+            moment = parse_created_at(created_at)
+            if moment is not None and window_start <= moment < window_end:
+                key = f"{wrapped['id']}_{slugify(wrapped['valueName'])}"
+                aggregator.add(moment, {key: wrapped["value"]})
+
+        registry = er.async_get(self.hass)
+        for key in aggregator.keys():
+            unique_id = f"{self.entry.entry_id}_hub_{values[key]['hubId']}_{key}"
+            entity_id = registry.async_get_entity_id("sensor", DOMAIN, unique_id)
+            if entity_id is not None:
+                # единицы — как у живого сенсора, без пересчёта
+                self._import(entity_id, aggregator.rows(key), None, None)
+
+    # ---------------- импорт
+
+    def _import(self, entity_id: str, rows: list[dict], native: str | None, device_class) -> None:
+        unit, convert = self._unit_for(entity_id, native, device_class)
+        statistics = [
+            StatisticData(
+                start=row["start"],
+                mean=convert(row["mean"]),
+                min=convert(row["min"]),
+                max=convert(row["max"]),
+            )
+            for row in rows
+        ]
+        async_import_statistics(self.hass, self._metadata(entity_id, unit, device_class), statistics)
+        self.imported_hours += len(statistics)
+
+    def _unit_for(self, entity_id: str, native: str | None, device_class) -> tuple[str | None, Any]:
+        """Единица статистики сущности и перевод в неё из единицы API.
+
+        `native=None` — значения уже в единицах состояния сущности.
+        """
+        state = self.hass.states.get(entity_id)
+        unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT, native) if state else native
+        converter = UNIT_CONVERTERS.get(device_class)
+        if native is None or unit == native or converter is None or unit not in converter.VALID_UNITS:
+            return unit, lambda value: value
+        return unit, converter.converter_factory(native, unit)
+
+    @staticmethod
+    def _metadata(entity_id: str, unit: str | None, device_class) -> StatisticMetaData:
+        metadata: dict[str, Any] = {
+            "has_sum": False,
+            "name": None,
+            "source": "recorder",
+            "statistic_id": entity_id,
+            "unit_of_measurement": unit,
+        }
+        if StatisticMeanType is not None:
+            metadata["mean_type"] = StatisticMeanType.ARITHMETIC
+        else:  # pragma: no cover
+            metadata["has_mean"] = True
+        if "unit_class" in StatisticMetaData.__annotations__:
+            converter = UNIT_CONVERTERS.get(device_class)
+            metadata["unit_class"] = converter.UNIT_CLASS if converter else None
+        return StatisticMetaData(**metadata)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Состояние для диагностики (атрибуты ApiStatusSensor)."""
+        return {
+            "backfill_running": self._running,
+            "backfill_imported_hours": self.imported_hours,
+            "backfill_last_run": self.last_run.isoformat() if self.last_run else None,
+            "outage_fills": self.outage_fills,
+            "outage_points": self.outage_points,
+        }
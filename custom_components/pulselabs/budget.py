@@ -0,0 +1,212 @@
+"""
+custom_components.pulselabs.budget
+----------------------------------
+Предварительная оценка стоимости запроса и «шлагбаум» суточной квоты.
+
+Квота считается по факту ответа (`BaseApi._increment_usage`), поэтому
+без предварительной проверки один `/devices/range` за неделю может выжечь
+весь дневной бюджет. Здесь:
+
+* `CostEstimator` оценивает стоимость запроса *до* отправки: по swagger‑карте
+  (путь без countable‑DTO стоит 1), по известным устройствам, их
+  наблюдённому периоду выборки (по `lastHourData` из `/all-devices`) и
+  длительности диапазона `start`/`end` для исторических эндпоинтов, а для
+  остальных — по последней наблюдённой стоимости того же шаблона пути;
+* `BudgetGate` — token bucket ёмкостью `ceiling` datapoints, который
+  пополняется целиком на границе суток квоты. Обычные вызовы не могут
+  залезть в резерв `reserve`, оставленный для живого опроса; одновременные
+  запросы резервируют токены, пока не придёт фактическое списание.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+import math
+import statistics
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict
+from urllib.parse import parse_qs, urlencode
+
+from .dp_schema import get_dp_router
+from .history import parse_created_at
+
+# Период выборки устройства по умолчанию (секунд), пока не измерен реальный
+DEFAULT_SAMPLE_INTERVAL = 60.0
+
+# шаблоны, стоимость которых пропорциональна длине диапазона
+_RANGE_TEMPLATES = {
+    "/devices/range",
+    "/devices/{deviceId}/data-range",
+}
+
+# корневые коллекции /all-devices → счётчик известных сущностей
+_COLLECTIONS = {
+    "deviceViewDtos": "devices",
+    "hubViewDtos": "hubs",
+    "universalSensorViews": "sensors",
+    "controlsViewDtos": "controls",
+}
+
+
+class BudgetExceededError(Exception):
+    """Оценка запроса не помещается в доступный бюджет квоты."""
+
+    def __init__(self, path: str, estimated: int, available: int) -> None:
+        super().__init__(
+            f"Pulse API call {path} would cost ~{estimated} datapoints, "
+            f"only {available} available in today's budget"
+        )
+        self.path = path
+        self.estimated = estimated
+        self.available = available
+
+
+def with_params(path: str, params: dict[str, Any] | None) -> str:
+    """Добавляет query‑параметры к пути; datetime → ISO 8601."""
+    if not params:
+        return path
+    query = urlencode({
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in params.items()
+    })
+    return f"{path}{'&' if '?' in path else '?'}{query}"
+
+
+def _sample_interval(points: list) -> float | None:
+    """Средний шаг между точками `lastHourData` (секунд)."""
+    if len(points) < 2:
+        return None
+    try:
+        first = datetime.fromisoformat(points[0]["createdAt"])
+        last = datetime.fromisoformat(points[-1]["createdAt"])
+    except (KeyError, TypeError, ValueError):
+        return None  # без меток времени шаг не угадать
+    span = abs((last - first).total_seconds())
+    return span / (len(points) - 1) if span else None
+
+
+def parse_range(path: str) -> tuple[datetime, datetime] | None:
+    """Достаёт `start`/`end` из query‑строки пути (ISO 8601) как aware UTC.
+
+    Литеральный `+` смещения (`…+00:00`) parse_qs прочитал бы как пробел —
+    он экранируется заранее; метки без пояса считаются UTC, как `createdAt`,
+    чтобы разность границ не падала на смеси aware и naive.
+    """
+    query = path.partition("?")[2]
+    if not query:
+        return None
+    params = parse_qs(query.replace("+", "%2B"))
+    try:
+        start = parse_created_at(params["start"][0])
+        end = parse_created_at(params["end"][0])
+    except (KeyError, IndexError):
+        return None
+    if start is None or end is None:
+        return None
+    return start, end
+
+
+@dataclass
+class CostEstimator:
+    """Оценка стоимости запроса в datapoints до его отправки."""
+
+    sample_interval: float = DEFAULT_SAMPLE_INTERVAL
+    counts: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(_COLLECTIONS.values(), 0))
+    # шаблон пути → последняя фактическая стоимость
+    observed: Dict[str, int] = field(default_factory=dict)
+    # id устройства → наблюдённый период выборки (секунд)
+    sample_intervals: Dict[str, float] = field(default_factory=dict)
+
+    def observe(self, path: str, payload: Any, cost: int) -> None:
+        """Учитывает фактический ответ: стоимость и, для /all-devices, состав аккаунта."""
+        entry = get_dp_router().resolve(path)
+        template = entry.path if entry else path.partition("?")[0]
+        self.observed[template] = cost
+
+        if template == "/all-devices" and isinstance(payload, dict):
+            for key, name in _COLLECTIONS.items():
+                self.counts[name] = len(payload.get(key) or ())
+            # пересобираем целиком: удалённые устройства не должны влиять на оценку
+            intervals = {}
+            for device in payload.get("deviceViewDtos") or ():
+                interval = _sample_interval(device.get("lastHourData") or [])
+                if interval:
+                    intervals[str(device.get("id"))] = interval
+            self.sample_intervals = intervals
+
+    def interval_for(self, device_id: str | None = None) -> float:
+        """Период выборки устройства; для неизвестного — медиана по аккаунту."""
+        if device_id is not None and device_id in self.sample_intervals:
+            return self.sample_intervals[device_id]
+        if self.sample_intervals:
+            return statistics.median(self.sample_intervals.values())
+        return self.sample_interval
+
+    def explain(self, path: str) -> dict[str, Any]:
+        """Оценка стоимости с разбивкой: шаблон, длина диапазона, устройства, шаг."""
+        entry = get_dp_router().resolve(path)
+        if entry is None:
+            # правило API: вызов без datapoints = 1
+            return {"template": path.partition("?")[0], "datapoints": 1, "basis": "flat"}
+
+        span = parse_range(path) if entry.path in _RANGE_TEMPLATES else None
+        if span is None:
+            return {
+                "template": entry.path,
+                "datapoints": max(self.observed.get(entry.path, 1), 1),
+                "basis": "observed" if entry.path in self.observed else "flat",
+            }
+
+        seconds = max((span[1] - span[0]).total_seconds(), 0.0)
+        if entry.path == "/devices/range":
+            intervals = list(self.sample_intervals.values())
+            # устройства без замеров периода считаем по медиане
+            intervals += [self.interval_for()] * max(self.counts["devices"] - len(intervals), 0)
+            intervals = intervals or [self.interval_for()]
+        else:
+            intervals = [self.interval_for(path.partition("?")[0].split("/")[2])]
+        return {
+            "template": entry.path,
+            "datapoints": max(sum(math.ceil(seconds / i) for i in intervals), 1),
+            "basis": "range",
+            "span_seconds": seconds,
+            "devices": len(intervals),
+            "sample_interval": round(statistics.mean(intervals), 1),
+        }
+
+    def estimate(self, path: str) -> int:
+        return self.explain(path)["datapoints"]
+
+
+class BudgetGate:
+    """Token bucket суточной квоты с резервом для живого опроса."""
+
+    def __init__(self, ceiling: int, reserve: int = 0) -> None:
+        self.ceiling = ceiling
+        self.reserve = reserve
+        self.pending = 0     # токены, зарезервированные выполняющимися запросами
+        self.refused = 0
+
+    def available(self, used: int, priority: bool = False) -> int:
+        tokens = self.ceiling - used - self.pending
+        return max(tokens if priority else tokens - self.reserve, 0)
+
+    def fits_ceiling(self, estimated: int, priority: bool = False) -> bool:
+        """Поместится ли запрос хотя бы в полный (только что пополненный) bucket."""
+        return estimated <= (self.ceiling if priority else self.ceiling - self.reserve)
+
+    def acquire(self, path: str, estimated: int, used: int, priority: bool = False) -> int:
+        """Резервирует `estimated` токенов или бросает BudgetExceededError."""
+        available = self.available(used, priority)
+        if estimated > available:
+            self.refused += 1
+            raise BudgetExceededError(path, estimated, available)
+        self.pending += estimated
+        return estimated
+
+    def release(self, reserved: int) -> None:
+        """Снимает резерв после фактического списания (или ошибки)."""
+        self.pending = max(self.pending - reserved, 0)
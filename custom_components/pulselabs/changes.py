@@ -0,0 +1,67 @@
+"""
+custom_components.pulselabs.changes
+-----------------------------------
+Набор изменившихся ключей между соседними снимками координатора.
+
+`DataUpdateCoordinator` оповещает всех слушателей, как только `data`
+отличается хоть в одном значении, и каждая сущность пишет состояние —
+даже если её собственное значение не менялось. `changed_keys()` сравнивает
+нормализованные снимки (`devices` / `hubs` / `sensors`) и возвращает
+множество `(раздел, id, ключ)`, по которому сущность за O(1) решает,
+писать ли состояние. Одинаковые элементы отсекаются сравнением dict
+целиком, поэлементно сравниваются только изменившиеся.
+
+`WriteStats` считает записанные и пропущенные обновления сущностей.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Set, Tuple
+
+ChangeKey = Tuple[str, str, str]
+
+
+def changed_keys(
+    old: Mapping[str, Mapping[str, Mapping[str, Any]]], new: Mapping[str, Mapping[str, Mapping[str, Any]]]
+) -> Set[ChangeKey]:
+    """(раздел, id, ключ) всех значений, которые добавились, пропали или изменились."""
+    changes: Set[ChangeKey] = set()
+    for section in old.keys() | new.keys():
+        old_items, new_items = old.get(section, {}), new.get(section, {})
+        for item_id in old_items.keys() | new_items.keys():
+            before, after = old_items.get(item_id, {}), new_items.get(item_id, {})
+            if before == after:
+                continue
+            for key in before.keys() | after.keys():
+                if before.get(key) != after.get(key):
+                    changes.add((section, item_id, key))
+    return changes
+
+
+@dataclass
+class WriteStats:
+    """Записи состояния сущностей: сделанные и пропущенные по набору изменений."""
+
+    written: int = 0
+    skipped: int = 0
+
+    def count(self, write: bool) -> None:
+        if write:
+            self.written += 1
+        else:
+            self.skipped += 1
+
+    @property
+    def skipped_ratio(self) -> float | None:
+        total = self.written + self.skipped
+        return round(self.skipped / total, 3) if total else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "entity_writes": self.written,
+            "entity_writes_skipped": self.skipped,
+            "entity_skipped_write_ratio": self.skipped_ratio,
+        }
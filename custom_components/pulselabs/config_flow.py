@@ -6,28 +6,74 @@ import voluptuous as vol
 import aiohttp
 
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import ConfigEntry, ConfigFlow, ConfigFlowResult, OptionsFlow
+from homeassistant.core import callback
 from homeassistant.const import CONF_API_KEY
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import selector
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_PLAN,
+    CONF_MIN_INTERVAL,
+    CONF_BUDGET_CEILING,
+    CONF_DEDICATED_SESSION,
+    CONF_DLI_DAY_START,
+    DEFAULT_PLAN,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_BUDGET_CEILING,
+    DEFAULT_DEDICATED_SESSION,
+    DEFAULT_DLI_DAY_START,
+)
 from .api import get_api
+from .dp_schema import async_load_dp_schema_map
 
 import logging
 _LOGGER = logging.getLogger(__name__)
 
-STEP_PLAN_SCHEMA = vol.Schema({
-    vol.Required("plan", default="hobbyist"): selector.SelectSelector(
-        selector.SelectSelectorConfig(
-            options=[
-                {"value": "hobbyist", "label": "Hobbyist (4,800/day)"},
-                {"value": "enthusiast", "label": "Enthusiast (24,000/day)"},
-                {"value": "professional", "label": "Professional (120,000/day)"},
-            ],
-            mode=selector.SelectSelectorMode.DROPDOWN,
-        )
+PLAN_SELECTOR = selector.SelectSelector(
+    selector.SelectSelectorConfig(
+        options=[
+            {"value": "hobbyist", "label": "Hobbyist (4,800/day)"},
+            {"value": "enthusiast", "label": "Enthusiast (24,000/day)"},
+            {"value": "professional", "label": "Professional (120,000/day)"},
+        ],
+        mode=selector.SelectSelectorMode.DROPDOWN,
+    )
+)
+
+MIN_INTERVAL_SELECTOR = selector.NumberSelector(
+    selector.NumberSelectorConfig(
+        min=30,
+        max=3600,
+        step=10,
+        unit_of_measurement="s",
+        mode=selector.NumberSelectorMode.BOX,
+    )
+)
+
+BUDGET_CEILING_SELECTOR = selector.NumberSelector(
+    selector.NumberSelectorConfig(
+        min=10,
+        max=100,
+        step=5,
+        unit_of_measurement="%",
+        mode=selector.NumberSelectorMode.SLIDER,
     )
+)
+
+DLI_DAY_START_SELECTOR = selector.NumberSelector(
+    selector.NumberSelectorConfig(
+        min=0,
+        max=23,
+        step=1,
+        unit_of_measurement="h",
+        mode=selector.NumberSelectorMode.BOX,
+    )
+)
+
+STEP_PLAN_SCHEMA = vol.Schema({
+    vol.Required(CONF_PLAN, default=DEFAULT_PLAN): PLAN_SELECTOR
 })
 
 
@@ -38,12 +84,18 @@ class PulseLabsConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
     _api_key: str
     _owner_name: str
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        return PulseLabsOptionsFlow()
+
     async def async_step_user(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
         errors: dict[str, str] = {}
 
         if user_input is not None:
             self._api_key = user_input[CONF_API_KEY].strip()
 
+            await async_load_dp_schema_map(self.hass)
             session = async_get_clientsession(self.hass)
             api = get_api(session, self._api_key)
 
@@ -85,10 +137,42 @@ class PulseLabsConfigFlow(ConfigFlow, domain=DOMAIN):  # type: ignore[call-arg]
                 CONF_API_KEY: self._api_key,
             },
             options={
-                "plan": user_input["plan"],
+                CONF_PLAN: user_input[CONF_PLAN],
                 "owner_name": self._owner_name,
             },
         )
 
+class PulseLabsOptionsFlow(OptionsFlow):
+    """Тариф, интервал опроса, потолок бюджета, пул соединений и начало суток DLI."""
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> ConfigFlowResult:
+        if user_input is not None:
+            # owner_name и прочие опции из config flow не теряем
+            return self.async_create_entry(data={**self.config_entry.options, **user_input})
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Required(CONF_PLAN, default=options.get(CONF_PLAN, DEFAULT_PLAN)): PLAN_SELECTOR,
+                vol.Required(
+                    CONF_MIN_INTERVAL,
+                    default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                ): MIN_INTERVAL_SELECTOR,
+                vol.Required(
+                    CONF_BUDGET_CEILING,
+                    default=options.get(CONF_BUDGET_CEILING, DEFAULT_BUDGET_CEILING),
+                ): BUDGET_CEILING_SELECTOR,
+                vol.Required(
+                    CONF_DEDICATED_SESSION,
+                    default=options.get(CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION),
+                ): selector.BooleanSelector(),
+                vol.Required(
+                    CONF_DLI_DAY_START,
+                    default=options.get(CONF_DLI_DAY_START, DEFAULT_DLI_DAY_START),
+                ): DLI_DAY_START_SELECTOR,
+            }),
+        )
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
\ No newline at end of file
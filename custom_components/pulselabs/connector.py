@@ -0,0 +1,136 @@
+"""
+custom_components.pulselabs.connector
+-------------------------------------
+Выделенная HTTP‑сессия для Pulse cloud с настроенным пулом и счётчиками.
+
+Общая сессия Home Assistant (`async_get_clientsession`) не даёт настроить
+keep‑alive, кэш DNS и лимит соединений на хост, и по ней не видно,
+переиспользуются ли соединения. Когда поверх опроса `/all-devices` идут
+backfill и запросы по отдельным устройствам, это важно. Здесь:
+
+* `InstrumentedConnector` — `TCPConnector` с лимитом на хост, DNS‑кэшем
+  и долгим keep‑alive; входящие байты считаются на уровне протокола,
+  то есть до распаковки gzip — это реальный трафик «по проводу»;
+* `TraceConfig` считает новые и переиспользованные соединения,
+  TLS‑рукопожатия (новое соединение по https) и исходящие байты
+  (строка запроса + заголовки + тело);
+* `create_session()` собирает всё в `ClientSession` со сжатием ответов.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+import functools
+
+from dataclasses import asdict, dataclass
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+from aiohttp.client_proto import ResponseHandler
+
+# настройки пула для одного хоста api.pulsegrow.com
+CONNECTION_LIMIT_PER_HOST = 4
+KEEPALIVE_TIMEOUT = 60      # секунд; опрос раз в минуту держит соединение тёплым
+DNS_CACHE_TTL = 300         # секунд
+
+_ACCEPT_ENCODING = "gzip, deflate"
+
+
+@dataclass
+class ConnectionStats:
+    new_connections: int = 0
+    reused_connections: int = 0
+    tls_handshakes: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+    @property
+    def reuse_rate(self) -> float | None:
+        """Доля запросов, ушедших по уже открытому соединению (0…1)."""
+        total = self.new_connections + self.reused_connections
+        return self.reused_connections / total if total else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Счётчики для диагностики (атрибуты ApiStatusSensor)."""
+        rate = self.reuse_rate
+        return {**asdict(self), "connection_reuse_rate": round(rate, 3) if rate is not None else None}
+
+
+class _CountingResponseHandler(ResponseHandler):
+    """Протокол ответа, считающий сырые байты до HTTP‑парсера."""
+
+    def __init__(self, stats: ConnectionStats, loop) -> None:
+        super().__init__(loop)
+        self._stats = stats
+
+    def data_received(self, data: bytes) -> None:
+        self._stats.bytes_received += len(data)
+        super().data_received(data)
+
+
+class InstrumentedConnector(aiohttp.TCPConnector):
+    """TCPConnector с подсчётом входящего трафика."""
+
+    def __init__(self, stats: ConnectionStats, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        # фабрика протокола — внутренняя деталь aiohttp; если её нет,
+        # остаются счётчики из TraceConfig, без входящих байт
+        if hasattr(self, "_factory"):
+            self._factory = functools.partial(_CountingResponseHandler, stats, loop=self._loop)
+
+
+def _request_head_size(method: str, url, headers) -> int:
+    """Размер строки запроса и заголовков HTTP/1.1 в байтах."""
+    size = len(method) + len(url.raw_path_qs) + len(" HTTP/1.1\r\n") + 1
+    for name, value in headers.items():
+        size += len(name) + len(value) + 4  # ": " и "\r\n"
+    return size + 2
+
+
+def _trace_config(stats: ConnectionStats) -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig()
+
+    async def on_request_start(_session, ctx: SimpleNamespace, params) -> None:
+        ctx.secure = params.url.scheme == "https"
+
+    async def on_connection_create_end(_session, ctx: SimpleNamespace, _params) -> None:
+        stats.new_connections += 1
+        if getattr(ctx, "secure", False):
+            stats.tls_handshakes += 1
+
+    async def on_connection_reuseconn(_session, _ctx, _params) -> None:
+        stats.reused_connections += 1
+
+    async def on_request_headers_sent(_session, _ctx, params) -> None:
+        stats.bytes_sent += _request_head_size(params.method, params.url, params.headers)
+
+    async def on_request_chunk_sent(_session, _ctx, params) -> None:
+        stats.bytes_sent += len(params.chunk)
+
+    trace.on_request_start.append(on_request_start)
+    trace.on_connection_create_end.append(on_connection_create_end)
+    trace.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace.on_request_headers_sent.append(on_request_headers_sent)
+    trace.on_request_chunk_sent.append(on_request_chunk_sent)
+    return trace
+
+
+def create_session(stats: ConnectionStats | None = None) -> tuple[aiohttp.ClientSession, ConnectionStats]:
+    """Новая сессия с выделенным пулом; закрыть её обязан вызывающий код."""
+    stats = stats or ConnectionStats()
+    connector = InstrumentedConnector(
+        stats,
+        limit_per_host=CONNECTION_LIMIT_PER_HOST,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        use_dns_cache=True,
+    )
+    session = aiohttp.ClientSession(
+        connector=connector,
+        headers={"Accept-Encoding": _ACCEPT_ENCODING},
+        auto_decompress=True,
+        trace_configs=[_trace_config(stats)],
+    )
+    return session, stats
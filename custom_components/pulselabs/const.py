@@ -1,6 +1,7 @@
 """Constants for the Pulse Labs integration."""
 import re
 
+from datetime import timedelta
 from enum import IntEnum
 from homeassistant.components.sensor import SensorEntityDescription, SensorDeviceClass, SensorStateClass
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass
@@ -29,6 +30,63 @@ PLAN_LIMITS = {
     "professional": 120000,
 }
 
+CONF_PLAN = "plan"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_BUDGET_CEILING = "budget_ceiling"
+CONF_DEDICATED_SESSION = "dedicated_session"
+CONF_DLI_DAY_START = "dli_day_start"
+
+DEFAULT_PLAN = "hobbyist"
+DEFAULT_MIN_INTERVAL = 60  # секунд
+DEFAULT_BUDGET_CEILING = 100  # % суточного лимита тарифа
+DEFAULT_DEDICATED_SESSION = False
+DEFAULT_DLI_DAY_START = 0  # час начала «суток» DLI (полночь или включение света)
+
+# доля бюджета, которую разовые вызовы не трогают — остаётся живому опросу
+BUDGET_POLL_RESERVE = 0.1
+
+# догрузка истории в статистику (см. backfill.py)
+BACKFILL_WINDOW = timedelta(hours=6)            # один запрос data-range
+BACKFILL_INITIAL_LOOKBACK = timedelta(hours=6)  # при первом запуске
+BACKFILL_MAX_LOOKBACK = timedelta(days=7)       # самый длинный догружаемый разрыв
+BACKFILL_LIVE_GAP = timedelta(hours=1)          # больший разрыв между опросами — пропуск
+BACKFILL_CHECK_INTERVAL = timedelta(hours=1)
+BACKFILL_SENSOR_CONCURRENCY = 4                 # параллельных data-range сенсоров хаба
+
+# кольцевые буферы недавних значений (см. series.py): точек на серию
+# (≈ 16 байт каждая) и точек в атрибуте sparkline
+SERIES_CAPACITY = 360
+SERIES_SPARKLINE_POINTS = 24
+
+# снимок результата опроса для быстрого старта (см. snapshot.py)
+SNAPSHOT_MAX_AGE = timedelta(days=7)    # более старый снимок не используем
+SNAPSHOT_SAVE_DELAY = 300               # секунд; при остановке HA пишется сразу
+
+# спектральные замеры Pulse Pro (см. light_readings.py): замеров на прибор
+LIGHT_READINGS_CACHE_SIZE = 200
+# сенсоры полос спектра (spectrum.KEYS) — только у Pulse Pro с ppfd:
+# спектры приходят лишь из его /api/light-readings
+SPECTRUM_SENSOR_KEYS = ("ppfd_blue", "ppfd_green", "ppfd_red", "ppfd_far_red", "ypf_ppfd", "r_fr_ratio")
+
+# лента событий /api/timeline (см. timeline.py, events.py)
+TIMELINE_INTERVAL = timedelta(minutes=5)
+TIMELINE_PAGE_SIZE = 10
+TIMELINE_MAX_PAGES = 10                 # предел страниц за опрос (защита от всплеска)
+
+# сработавшие пороги /api/triggered-thresholds (см. thresholds.py) — реже
+# /all-devices, но чаще ленты событий: это алерты
+THRESHOLDS_INTERVAL = timedelta(minutes=3)
+
+# локальный DLI из PPFD (см. dli.py): более длинный интервал между
+# измерениями не интегрируется
+DLI_MAX_GAP = timedelta(minutes=30)
+
+# таймаут одной попытки запроса к Pulse API (секунд)
+REQUEST_TIMEOUT = 15
+
+# короткий кэш ответов API: гасит всплески одинаковых GET (секунд, 0 — выкл.)
+RESPONSE_CACHE_TTL = 5
+
 class DeviceType(IntEnum):
     PulseOne=0
     PulsePro=1
@@ -139,6 +197,55 @@ DEVICE_SENSOR_MAP: dict[str, SensorEntityDescription] = {
         icon="mdi:white-balance-sunny",
         state_class=SensorStateClass.MEASUREMENT,
     ),
+    # полосы спектра последнего замера Pro (spectrum.py); создаются для приборов с ppfd
+    "ppfd_blue": SensorEntityDescription(
+        key="ppfd_blue",
+        translation_key="ppfd_blue",
+        device_class=None,
+        native_unit_of_measurement="µmol/m²/s",
+        icon="mdi:alpha-b-circle-outline",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    "ppfd_green": SensorEntityDescription(
+        key="ppfd_green",
+        translation_key="ppfd_green",
+        device_class=None,
+        native_unit_of_measurement="µmol/m²/s",
+        icon="mdi:alpha-g-circle-outline",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    "ppfd_red": SensorEntityDescription(
+        key="ppfd_red",
+        translation_key="ppfd_red",
+        device_class=None,
+        native_unit_of_measurement="µmol/m²/s",
+        icon="mdi:alpha-r-circle-outline",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    "ppfd_far_red": SensorEntityDescription(
+        key="ppfd_far_red",
+        translation_key="ppfd_far_red",
+        device_class=None,
+        native_unit_of_measurement="µmol/m²/s",
+        icon="mdi:alpha-f-circle-outline",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    "ypf_ppfd": SensorEntityDescription(
+        key="ypf_ppfd",
+        translation_key="ypf_ppfd",
+        device_class=None,
+        native_unit_of_measurement="µmol/m²/s",
+        icon="mdi:leaf",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    "r_fr_ratio": SensorEntityDescription(
+        key="r_fr_ratio",
+        translation_key="r_fr_ratio",
+        device_class=None,
+        native_unit_of_measurement=None,
+        icon="mdi:scale-balance",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
     "dli": SensorEntityDescription(
         key="dli",
         translation_key="dli",
@@ -147,6 +254,16 @@ DEVICE_SENSOR_MAP: dict[str, SensorEntityDescription] = {
         icon="mdi:solar-power-variant",
         state_class=SensorStateClass.MEASUREMENT,
     ),
+    # DLI, накопленный интеграцией PPFD между опросами (coordinator/dli.py)
+    "dli_calculated": SensorEntityDescription(
+        key="dli_calculated",
+        translation_key="dli_calculated",
+        device_class=None,
+        native_unit_of_measurement="mol/m²/d",
+        icon="mdi:solar-power-variant-outline",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+    ),
     "lightLux": SensorEntityDescription(
         key="lightLux",
         translation_key="light",
@@ -1,15 +1,48 @@
 from __future__ import annotations
 
 import math
+import time
 import logging
-from datetime import timedelta
+from datetime import datetime, timedelta
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 from homeassistant.helpers.storage import Store
-
-from .const import DOMAIN, DeviceType, slugify
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .const import (
+    DOMAIN,
+    PLAN_LIMITS,
+    CONF_PLAN,
+    CONF_MIN_INTERVAL,
+    CONF_BUDGET_CEILING,
+    CONF_DLI_DAY_START,
+    DEFAULT_PLAN,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_BUDGET_CEILING,
+    DEFAULT_DLI_DAY_START,
+    DLI_MAX_GAP,
+    LIGHT_READINGS_CACHE_SIZE,
+    BUDGET_POLL_RESERVE,
+    SERIES_CAPACITY,
+    SNAPSHOT_MAX_AGE,
+    SNAPSHOT_SAVE_DELAY,
+    DEVICE_SENSOR_MAP,
+    HUB_SENSOR_MAP,
+    SPECTRUM_SENSOR_KEYS,
+    DeviceType,
+    slugify,
+)
+from .budget import BudgetGate
+from .changes import WriteStats, changed_keys
+from .scheduler import QuotaPollScheduler
+from .dli import DliTracker
+from .history import parse_created_at
+from .light_readings import SCALAR_FIELDS, LightReadingCache, async_sync
+from .spectrum import band_integrals_batch
+from .series import SeriesStore
+from .snapshot import pack, unpack
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,17 +62,90 @@ class PulseDeviceCoordinator(DataUpdateCoordinator[dict[str, dict]]):
         self.api = api
 
         self._last_successful_data: dict[str, dict] | None = None
-        
+        # последний сырой ответ /all-devices: тот же объект ⇒ тело не менялось
+        self._last_raw: dict | None = None
+        # сутки DLI, в которые он нормализован: после их смены тот же ответ
+        # нормализуется заново, иначе DLI замолчавших приборов не обнулится
+        self._last_raw_period: datetime | None = None
+
+        # простой: момент последнего успешного опроса перед первой ошибкой;
+        # после восстановления окно догружается одним /devices/range
+        self._last_fresh_at: datetime | None = None
+        self._outage_since: datetime | None = None
+
+        # API‑сенсоры обновляются на каждом опросе, даже если данные устройств
+        # не изменились и слушатели координатора не вызываются
+        self.api_signal = f"{DOMAIN}_api_updated_{entry.entry_id}"
+
+        # догрузка пропусков истории (PulseBackfill), подключается в async_setup_entry
+        self.backfill = None
+        # события /api/timeline → шина HA (PulseEvents), подключаются там же
+        self.events = None
+
+        # недавние значения каждой метрики — для скользящих агрегатов и sparkline
+        self.series = SeriesStore(
+            SERIES_CAPACITY,
+            {"devices": DEVICE_SENSOR_MAP, "hubs": HUB_SENSOR_MAP, "sensors": ("value",)},
+            # полосы спектра — по моментам замеров из _update_light_bands
+            merged_only={"devices": SPECTRUM_SENSOR_KEYS},
+        )
+
+        # интервал опроса пересчитывается после каждого fetch по остатку квоты
+        plan = entry.options.get(CONF_PLAN, DEFAULT_PLAN).lower()
+        min_interval = timedelta(seconds=entry.options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL))
+        ceiling = PLAN_LIMITS.get(plan, PLAN_LIMITS[DEFAULT_PLAN]) * (
+            entry.options.get(CONF_BUDGET_CEILING, DEFAULT_BUDGET_CEILING) / 100
+        )
+        self.scheduler = QuotaPollScheduler(limit=int(ceiling), min_interval=min_interval)
+
+        # разовые дорогие вызовы не отправляются, если не влезают в бюджет
+        self.api.set_budget_gate(
+            BudgetGate(ceiling=int(ceiling), reserve=int(ceiling * BUDGET_POLL_RESERVE))
+        )
+
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN}_all_devices",
-            update_interval=timedelta(seconds=60),
-            config_entry=entry
+            update_interval=min_interval,
+            config_entry=entry,
+            # слушатели вызываются только если data действительно изменилась
+            always_update=False,
         )
 
         self._api_usage_store = Store(hass, 1, f"{DOMAIN}_api_usage_{entry.entry_id}.json")
 
+        # DLI из PPFD копится локально между опросами и переживает перезапуск
+        self.dli = DliTracker(
+            dt_util.get_default_time_zone(),
+            day_start_hour=int(entry.options.get(CONF_DLI_DAY_START, DEFAULT_DLI_DAY_START)),
+            max_gap=DLI_MAX_GAP,
+        )
+        self._dli_store = Store(hass, 1, f"{DOMAIN}_dli_{entry.entry_id}.json")
+
+        # полные спектральные замеры Pro: докачиваются, когда в превью
+        # /all-devices появляется замер, которого ещё нет в кэше
+        self.light_readings: dict[str, LightReadingCache] = {}
+        self._light_syncing: set[str] = set()
+        # моменты скачанных замеров и полосы последнего: после перезапуска
+        # синхронизация продолжается, а сенсоры спектра не ждут нового замера
+        self._light_store = Store(hass, 1, f"{DOMAIN}_light_readings_{entry.entry_id}.json")
+        # полосы спектра последнего замера: device_id → {ppfd_blue: …, r_fr_ratio: …}
+        self._light_bands: dict[str, dict] = {}
+
+        # снимок последнего результата: сущности строятся из него до живого опроса
+        self._snapshot_store = Store(hass, 1, f"{DOMAIN}_snapshot_{entry.entry_id}.json")
+        self.snapshot_saved_at: datetime | None = None
+        # данные из снимка, живой опрос ещё не прошёл
+        self.stale = False
+        self.startup_ms: float | None = None
+
+        # (раздел, id, ключ) значений, изменившихся на последнем опросе:
+        # сущности с неизменным значением состояние не переписывают;
+        # None — обновить все (первый опрос, выход из снимка)
+        self._changes: set[tuple[str, str, str]] | None = None
+        self.write_stats = WriteStats()
+
         self._api_usage_state = {
             "used": 0,
             "last_call_datetime": dt_util.now().isoformat()
@@ -148,7 +254,7 @@ class PulseDeviceCoordinator(DataUpdateCoordinator[dict[str, dict]]):
         return wrapped
 
     @callback
-    def _wrap_sensor(self,  hub: dict | None , sensor: dict, dp_value: dict) -> dict:
+    def _wrap_sensor(self,  hub: dict | None , sensor: dict, dp_value: dict, created_at: str | None = None) -> dict:
         
         hub_id=hub["id"] if hub else "hub_unassigned"
         hub_name = (hub.get("name")) if hub else "Hub: Unassigned Sensors"
@@ -162,19 +268,49 @@ class PulseDeviceCoordinator(DataUpdateCoordinator[dict[str, dict]]):
             "type": sensor.get("sensorType"),
             "valueName":  dp_value["ParamName"],
             "measuringUnit": dp_value.get("MeasuringUnit"),
-            "value":dp_value.get("ParamValue")
+            "value":dp_value.get("ParamValue"),
+            # момент измерения — для догрузки пропусков истории (backfill.py)
+            "createdAt": created_at,
         }
 
         return result
 
     async def _async_update_data(self) -> dict[str, dict]:
+        # пока данные из снимка, слушателей оповещаем даже при равных data —
+        # иначе отметка stale не снимется, если за время простоя ничего не поменялось
+        self.always_update = self.stale
+        try:
+            return await self._async_poll_all_devices()
+        finally:
+            async_dispatcher_send(self.hass, self.api_signal)
+
+    async def _async_poll_all_devices(self) -> dict[str, dict]:
         """Запрашиваем /all-devices и возвращаем данные всех приборов."""
         _LOGGER.debug("Coordinator fetch  id=%s  at=%s", id(self), dt_util.utcnow().isoformat(timespec="seconds"))
 
         try:
             raw = await self.api.async_get_all_devices()
-            _LOGGER.debug(f"raw:{raw}")
-            
+            self._end_outage()
+
+            # стоимость именно /all-devices: последний вызов API мог быть
+            # фоновой догрузкой, страницей замеров или ответом из кэша
+            self.update_interval = self.scheduler.next_interval(
+                cost=self.api.estimator.estimate("/all-devices"),
+                used=self.api.datapoints_today,
+                now=dt_util.now(),
+                reset_at=self.api.next_quota_reset(),
+            )
+            _LOGGER.debug("Next /all-devices poll in %s", self.update_interval)
+
+            period = self.dli.period_start(dt_util.utcnow())
+            if self._can_reuse(raw, period):
+                # тело ответа не изменилось (см. BaseApi._decode_body):
+                # нормализацию и оповещение сущностей пропускаем
+                _LOGGER.debug("/all-devices unchanged, reusing normalized data")
+                return self._last_successful_data
+            _LOGGER.debug("raw:%s", raw)
+            started = time.perf_counter()
+
             # собираем устройства и их сенсоры (из deviceViewDtos)
             device_list = raw.get("deviceViewDtos", [])
             devices: dict[str, dict] = {}
@@ -183,6 +319,9 @@ class PulseDeviceCoordinator(DataUpdateCoordinator[dict[str, dict]]):
                 dev_id = str(dev["id"])
                 mrd = dev.get("mostRecentDataPoint", {})
                 devices[dev_id] = self._wrap_device(dev, mrd)
+                self._add_dli(dev_id, devices[dev_id])
+                self._check_light_reading(dev_id, dev.get("proLightReadingPreviewDto"))
+                devices[dev_id].update(self._light_bands.get(dev_id, {}))
 
             # собираем хабы и встроенные в него сенсоры (из hubViewDtos)
             hub_list = raw.get("hubViewDtos", [])
@@ -208,7 +347,7 @@ class PulseDeviceCoordinator(DataUpdateCoordinator[dict[str, dict]]):
                     sensor_id = sensor.get("id")
                     key = f"{sensor_id}_{slug}"
 
-                    sensors[key] = self._wrap_sensor(hub, sensor, value)
+                    sensors[key] = self._wrap_sensor(hub, sensor, value, mrd.get("createdAt"))
 
             result = {
                 "devices": devices,
@@ -216,18 +355,171 @@ class PulseDeviceCoordinator(DataUpdateCoordinator[dict[str, dict]]):
                 "sensors": sensors
             }
 
-            _LOGGER.debug(f"result:{result}")
+            _LOGGER.debug("result:%s", result)
+            self.api.metrics.observe("/all-devices", "wrap_ms", (time.perf_counter() - started) * 1000)
+            pushed = self.series.observe(result, time.time())
+
+            # пока данные из снимка, переписываем все сущности — снимается отметка stale;
+            # серии с новой точкой переписываем ради атрибутов min/max/sparkline
+            previous = self._last_successful_data
+            self._changes = None if self.stale or previous is None else changed_keys(previous, result) | pushed
+            _LOGGER.debug("Changed values: %s", "all" if self._changes is None else len(self._changes))
 
+            self._last_raw = raw
+            self._last_raw_period = period
             self._last_successful_data = result
+            self.stale = False
+            self._snapshot_store.async_delay_save(
+                lambda: pack(result, dt_util.utcnow()), SNAPSHOT_SAVE_DELAY
+            )
             return result
 
         except Exception as err:
             self.logger.warning("API fetch failed: %s", err)
+            if self._outage_since is None:
+                self._outage_since = self._last_fresh_at
             if self._last_successful_data is not None:
                 self.logger.debug("Using cached data from previous update.")
                 return self._last_successful_data
             raise UpdateFailed("Initial fetch failed and no cached data available") from err
 
+    def _can_reuse(self, raw: dict, period: datetime) -> bool:
+        """Тот же ответ /all-devices в тех же сутках DLI — нормализованные данные верны."""
+        return (
+            raw is self._last_raw
+            and self._last_successful_data is not None
+            and period == self._last_raw_period
+        )
+
+    @callback
+    def _add_dli(self, device_id: str, wrapped: dict) -> None:
+        """Интегрирует PPFD прибора в накопленный DLI текущих суток."""
+        ppfd = wrapped.get("ppfd", wrapped.get("par"))
+        if not isinstance(ppfd, (int, float)):
+            return
+        now = dt_util.utcnow()
+        moment = parse_created_at(wrapped.get("createdAt")) or now
+        wrapped["dli_calculated"] = round(self.dli.add(device_id, moment, ppfd, now), 3)
+        self._dli_store.async_delay_save(self.dli.as_dict, 60)
+
+    @callback
+    def _check_light_reading(self, device_id: str, preview: dict | None) -> None:
+        """Новый замер в превью — докачиваем спектры в фоне."""
+        created = parse_created_at(preview.get("createdAt")) if preview else None
+        if created is None or device_id in self._light_syncing:
+            return
+        cache = self.light_readings.get(device_id)
+        if cache is None:
+            cache = self.light_readings[device_id] = LightReadingCache(device_id, LIGHT_READINGS_CACHE_SIZE)
+        if created.timestamp() in cache:
+            return
+        self._light_syncing.add(device_id)
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_sync_light_readings(cache),
+            f"{DOMAIN}_light_readings_{device_id}",
+        )
+
+    async def _async_sync_light_readings(self, cache: LightReadingCache) -> None:
+        try:
+            added = await async_sync(
+                cache, self.api.async_iter_light_reading_pages(cache.device_id, defer=True)
+            )
+            _LOGGER.debug("Fetched %d light readings for device %s", added, cache.device_id)
+            if added:
+                self._update_light_bands(cache)
+                self._light_store.async_delay_save(self._light_state, 60)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Light readings sync for device %s failed: %s", cache.device_id, err)
+        finally:
+            self._light_syncing.discard(cache.device_id)
+
+    @callback
+    def _update_light_bands(self, cache: LightReadingCache) -> None:
+        """Полосы спектра по всем замерам кэша — одним проходом (spectrum.py)."""
+        ppfd_index = SCALAR_FIELDS.index("ppfd")
+        rows = list(cache.items())
+        width = len(SCALAR_FIELDS)
+        bands = band_integrals_batch([(row[ppfd_index], row[width:]) for _, row in rows])
+
+        # история замеров — в кольцевые буферы, последний — в данные прибора
+        self.series.merge("devices", cache.device_id, zip((moment for moment, _ in rows), bands))
+        latest = {key: value for key, value in bands[-1].items() if value is not None}
+        self._light_bands[cache.device_id] = latest
+
+        device = (self.data or {}).get("devices", {}).get(cache.device_id)
+        if device is not None:
+            device.update(latest)
+            self._changes = {("devices", cache.device_id, key) for key in latest}
+            self.async_update_listeners()
+
+    @callback
+    def entity_changed(self, key: tuple[str, str, str]) -> bool:
+        """Надо ли сущности с ключом (раздел, id, ключ) переписать состояние."""
+        # недоступность после ошибки опроса пишут все
+        write = self._changes is None or not self.last_update_success or key in self._changes
+        self.write_stats.count(write)
+        return write
+
+    async def async_load_dli_state(self) -> None:
+        saved = await self._dli_store.async_load()
+        if saved:
+            self.dli.load(saved)
+
+    def _light_state(self) -> dict:
+        return {
+            device_id: {"moments": cache.known_moments(), "bands": self._light_bands.get(device_id, {})}
+            for device_id, cache in self.light_readings.items()
+        }
+
+    async def async_load_light_readings(self) -> None:
+        # массивы замеров не сохраняются: без полос последнего замера новый
+        # в превью не появится до следующего замера, и полосы были бы пусты
+        saved = await self._light_store.async_load()
+        for device_id, state in (saved or {}).items():
+            cache = self.light_readings[device_id] = LightReadingCache(device_id, LIGHT_READINGS_CACHE_SIZE)
+            cache.load_known(state.get("moments", ()))
+            if state.get("bands"):
+                self._light_bands[device_id] = dict(state["bands"])
+
+    async def async_load_snapshot(self) -> bool:
+        """Данные из сохранённого снимка, до живого опроса; False — снимка нет."""
+        snapshot = unpack(await self._snapshot_store.async_load(), dt_util.utcnow(), SNAPSHOT_MAX_AGE)
+        if snapshot is None:
+            return False
+        self.data, self.snapshot_saved_at = snapshot
+        self._last_successful_data = self.data
+        self.stale = True
+        self.always_update = True
+        _LOGGER.debug("Loaded snapshot saved at %s", self.snapshot_saved_at)
+        return True
+
+    def diagnostics(self) -> dict:
+        """Старт, снимок и пропущенные записи сущностей — для атрибутов ApiStatusSensor."""
+        return {
+            "stale": self.stale,
+            "snapshot_saved_at": self.snapshot_saved_at.isoformat() if self.snapshot_saved_at else None,
+            "startup_ms": self.startup_ms,
+            "light_readings_cached": sum(len(cache) for cache in self.light_readings.values()),
+            "light_readings_memory_bytes": sum(cache.nbytes for cache in self.light_readings.values()),
+            **self.write_stats.as_dict(),
+        }
+
+    def _end_outage(self) -> None:
+        """Опрос прошёл: если до него был простой, отдаём окно на догрузку."""
+        now = dt_util.utcnow()
+        since, self._outage_since = self._outage_since, None
+        self._last_fresh_at = now
+        if since is None or self.backfill is None:
+            return
+        # последние живые createdAt до простоя — их точки из range не нужны
+        last_seen = {
+            device_id: parse_created_at(device.get("createdAt"))
+            for device_id, device in (self._last_successful_data or {}).get("devices", {}).items()
+        }
+        _LOGGER.debug("Outage from %s to %s is over", since, now)
+        self.backfill.async_fill_outage(since, now, last_seen)
+
     async def async_load_api_usage_state(self):
         saved = await self._api_usage_store.async_load()
         if saved:
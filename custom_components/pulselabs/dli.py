@@ -0,0 +1,111 @@
+"""
+custom_components.pulselabs.dli
+-------------------------------
+Локальный расчёт DLI (daily light integral) из мгновенного PPFD.
+
+Pulse Pro присылает мгновенный `ppfd` (µmol/m²/s), а управлять светом
+удобнее по суточному интегралу. Вместо плотной истории
+`/devices/{id}/data-range` (дорого по квоте) `DliTracker` интегрирует PPFD
+по трапециям между соседними измерениями опроса:
+
+* интервал длиннее `max_gap` (простой, пропущенные опросы) не
+  интегрируется — за него ничего не выдумываем;
+* повтор того же измерения (createdAt не сдвинулся) ничего не добавляет;
+* в момент начала суток (`day_start_hour`, по умолчанию — полночь; для
+  фотопериода — час включения света) сумма сбрасывается, а интервал через
+  границу делится по линейной интерполяции PPFD.
+
+Состояние (`as_dict` / `load`) хранится в `Store` записи, поэтому сумма
+за текущие сутки переживает перезапуск.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, tzinfo
+from typing import Any, Dict, Mapping
+
+# µmol/m²/s × с → mol/m²
+_MICRO = 1e-6
+
+
+@dataclass
+class _DeviceDli:
+    period: str          # ISO начала текущих «суток»
+    total: float         # mol/m² с начала суток
+    last_time: float     # epoch последнего измерения
+    last_ppfd: float
+
+
+class DliTracker:
+    """Накопленный DLI по устройствам."""
+
+    def __init__(self, tz: tzinfo, day_start_hour: int = 0, max_gap: timedelta = timedelta(minutes=30)) -> None:
+        self.tz = tz
+        self.day_start_hour = day_start_hour
+        self.max_gap = max_gap.total_seconds()
+        self._devices: Dict[str, _DeviceDli] = {}
+        # пропущенные из‑за разрыва интервалы — для диагностики
+        self.gaps = 0
+
+    def period_start(self, moment: datetime) -> datetime:
+        """Начало «суток», которым принадлежит момент."""
+        local = moment.astimezone(self.tz)
+        start = local.replace(hour=self.day_start_hour, minute=0, second=0, microsecond=0)
+        return start if local >= start else start - timedelta(days=1)
+
+    def add(self, device_id: str, moment: datetime, ppfd: float, current: datetime | None = None) -> float:
+        """Новое измерение PPFD; возвращает DLI с начала текущих суток (mol/m²).
+
+        «Текущие» сутки считаются по `current` (по умолчанию — момент
+        измерения): прибор, замолчавший до границы суток, после неё даёт 0,
+        а не вчерашнюю сумму.
+        """
+        current = current or moment
+        now = moment.timestamp()
+        period = self.period_start(moment)
+        state = self._devices.get(device_id)
+
+        if state is None:
+            self._devices[device_id] = _DeviceDli(period.isoformat(), 0.0, now, ppfd)
+            return 0.0
+        if now <= state.last_time:
+            return self.value(device_id, current)
+
+        dt = now - state.last_time
+        if state.period != period.isoformat():
+            # новые сутки: в сумму идёт только часть интервала после границы
+            boundary = period.timestamp()
+            total = 0.0
+            if dt <= self.max_gap and state.last_time < boundary:
+                at_boundary = state.last_ppfd + (ppfd - state.last_ppfd) * (boundary - state.last_time) / dt
+                total = (at_boundary + ppfd) / 2 * (now - boundary) * _MICRO
+            state.period, state.total = period.isoformat(), total
+        elif dt <= self.max_gap:
+            state.total += (state.last_ppfd + ppfd) / 2 * dt * _MICRO
+        else:
+            self.gaps += 1
+
+        state.last_time, state.last_ppfd = now, ppfd
+        return self.value(device_id, current)
+
+    def value(self, device_id: str, moment: datetime) -> float | None:
+        """Текущая сумма; если сутки уже сменились без новых измерений — 0."""
+        state = self._devices.get(device_id)
+        if state is None:
+            return None
+        return state.total if state.period == self.period_start(moment).isoformat() else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {device_id: asdict(state) for device_id, state in self._devices.items()}
+
+    def load(self, saved: Mapping[str, Mapping[str, Any]]) -> None:
+        for device_id, state in saved.items():
+            try:
+                self._devices[device_id] = _DeviceDli(
+                    str(state["period"]), float(state["total"]), float(state["last_time"]), float(state["last_ppfd"])
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
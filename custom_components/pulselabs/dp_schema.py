@@ -0,0 +1,466 @@
+"""
+custom_components.pulselabs.dp_schema
+-------------------------------------
+Карта «REST‑путь → JSON‑пойнтеры на countable‑DTO» для учёта квоты datapoints.
+
+Построение карты требует разбора 80 КБ `resources/swagger.json` и обхода
+всех схем, поэтому:
+
+* результат сохраняется компактным артефактом `resources/dp_schema_map.json`,
+  ключ которого — sha256 swagger‑файла (+ версия формата);
+* при несовпадении ключа карта перестраивается и артефакт перезаписывается;
+* загрузка ленивая: при первом обращении через `get_dp_schema_map()` или
+  заранее в executor через `async_load_dp_schema_map(hass)`, чтобы не
+  блокировать event loop Home Assistant.
+
+Модуль намеренно не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import logging
+_LOGGER = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# 1) Константы
+
+# DTO‑типы, которые *засчитываются* как расход квоты
+_COUNTABLE_TYPES: set[str] = {
+    "DataPointDto",
+    "UniversalDataPointDto",
+    "PublicApiDataPoint",
+    "HubDataPointDto",
+}
+
+_RESOURCES_DIR = Path(__file__).parent / "resources"
+_SWAGGER_FILE = _RESOURCES_DIR / "swagger.json"
+_CACHE_FILE = _RESOURCES_DIR / "dp_schema_map.json"
+
+# Увеличивать при любом изменении алгоритма построения карты —
+# старые артефакты будут перестроены автоматически.
+_CACHE_VERSION = 3
+
+Pointer = Tuple[str, ...]
+
+
+@dataclass
+class _PathPointers:
+    path: str  # /devices/{deviceId}/recent-data
+    pointers: List[List[str]]  # [['deviceViewDtos', '*', 'mostRecentDataPoint'], ...]
+    # специализированный счётчик, сгенерированный по `pointers`
+    count: Callable[[Any], int] = field(init=False, repr=False, compare=False)
+    # счётчик для одного элемента массива верхнего уровня (потоковый режим);
+    # None, если ответ не является массивом countable‑элементов
+    item_count: Callable[[Any], int] | None = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.count = _compile_counter(self.pointers)
+        self.item_count = (
+            _compile_counter([ptr[1:] for ptr in self.pointers])
+            if self.pointers and all(ptr and ptr[0] == "*" for ptr in self.pointers)
+            else None
+        )
+
+# ---------------------------------------------------------------------------
+# 2) Счётчик datapoint‑ов по payload & pointers
+def _count_by_pointers(payload: Any, pointers: Sequence[Sequence[str]]) -> int:
+    """Считает datapoints, обходя payload только по интересующим путям.
+
+    Эталонный интерпретатор: в рабочем пути используется `_PathPointers.count`,
+    сгенерированный `_compile_counter`, а эта функция остаётся для сверки.
+    """
+
+    def _count_for_ptr(node: Any, ptr: Sequence[str]) -> int:
+        if not ptr:
+            # оказались на объекте, который swagger пометил как countable
+            if isinstance(node, list):
+                return len(node)
+            return 1 if node is not None else 0
+
+        key, *rest = ptr
+        if key == "*":
+            if not isinstance(node, list):
+                return 0
+            return sum(_count_for_ptr(child, rest) for child in node)
+        if isinstance(node, dict) and key in node:
+            return _count_for_ptr(node[key], rest)
+        return 0
+
+    return sum(_count_for_ptr(payload, ptr) for ptr in pointers)
+
+
+_NONE_TYPE = type(None)
+
+
+def _count_items(items: list) -> int:
+    """Сумма листовых счётчиков по элементам массива.
+
+    Обычный случай — массив DTO‑объектов: одного C‑level прохода
+    `set(map(type, items))` хватает, чтобы убедиться, что среди элементов
+    нет `None` и вложенных списков, и вернуть `len(items)`.
+    """
+    types = set(map(type, items))
+    if _NONE_TYPE not in types and not any(issubclass(t, list) for t in types):
+        return len(items)
+    return sum(
+        len(item) if isinstance(item, list) else item is not None
+        for item in items
+    )
+
+
+@dataclass
+class _PointerTrie:
+    leaves: int = 0  # сколько пойнтеров заканчивается в этом узле
+    children: Dict[str, "_PointerTrie"] = field(default_factory=dict)
+
+
+def _compile_counter(pointers: Sequence[Sequence[str]]) -> Callable[[Any], int]:
+    """Генерирует функцию подсчёта, эквивалентную `_count_by_pointers`.
+
+    Пойнтеры сливаются в префиксное дерево, поэтому общий префикс
+    (`deviceViewDtos/*`) обходится один раз. Хвостовой `*` считается
+    без Python‑цикла — см. `_count_items`.
+    """
+    trie = _PointerTrie()
+    for ptr in pointers:
+        node = trie
+        for key in ptr:
+            node = node.children.setdefault(key, _PointerTrie())
+        node.leaves += 1
+
+    lines = ["def _count(payload):", "    total = 0"]
+    names = iter(f"n{i}" for i in range(1, 1 << 30))
+
+    def _mul(k: int, expr: str) -> str:
+        return expr if k == 1 else f"{k} * ({expr})"
+
+    def _emit(node: _PointerTrie, var: str, indent: str) -> None:
+        if node.leaves:
+            lines.append(
+                f"{indent}total += "
+                + _mul(node.leaves, f"0 if {var} is None else len({var}) if isinstance({var}, list) else 1")
+            )
+
+        keys = {k: v for k, v in node.children.items() if k != "*"}
+        if keys:
+            lines.append(f"{indent}if isinstance({var}, dict):")
+            for key, child in keys.items():
+                child_var = next(names)
+                lines.append(f"{indent}    {child_var} = {var}.get({key!r})")
+                _emit(child, child_var, indent + "    ")
+
+        star = node.children.get("*")
+        if star is None:
+            return
+        lines.append(f"{indent}if isinstance({var}, list):")
+        if not star.children:
+            # элементы массива — сами countable‑объекты
+            lines.append(f"{indent}    total += " + _mul(star.leaves, f"_count_items({var})"))
+        else:
+            item = next(names)
+            lines.append(f"{indent}    for {item} in {var}:")
+            _emit(star, item, indent + "        ")
+
+    _emit(trie, "payload", "    ")
+    lines.append("    return total")
+
+    namespace: Dict[str, Any] = {"_count_items": _count_items}
+    source = "\n".join(lines)
+    # ключи попадают в исходник только через repr() — инъекция невозможна
+    exec(source, namespace)  # pylint: disable=exec-used
+    fn = namespace["_count"]
+    fn.__source__ = source
+    return fn
+
+# ---------------------------------------------------------------------------
+# 3) Построение карты path → pointers по swagger
+def _build_dp_schema_map(swagger: Dict[str, Any]) -> Dict[str, List[List[str]]]:
+    """Строит карту REST‑путь → JSON‑пойнтеры для DTO‑datapoint."""
+
+    # ---------- helpers ----------
+    def _schema_name(ref: str) -> str | None:
+        return ref.split("/")[-1] if ref.startswith("#/components/schemas/") else None
+
+    def _merge_composite(schema: Dict[str, Any]) -> Dict[str, Any]:
+        """Разворачивает allOf/oneOf/anyOf в плоский dict."""
+        for key in ("allOf", "oneOf", "anyOf"):
+            if key in schema:
+                merged: Dict[str, Any] = {}
+                for sub in schema[key]:
+                    merged.update(_merge_composite(sub))
+                return merged
+        return schema
+
+    def _refs(schema: Any) -> set[str]:
+        """Имена всех `$ref` внутри схемы."""
+        if isinstance(schema, dict):
+            found = {_schema_name(schema["$ref"])} - {None} if isinstance(schema.get("$ref"), str) else set()
+            for value in schema.values():
+                found |= _refs(value)
+            return found
+        if isinstance(schema, list):
+            return set().union(*map(_refs, schema)) if schema else set()
+        return set()
+
+    def _cycles() -> Dict[str, frozenset]:
+        """Компонента сильной связности каждой схемы (Тарьян); вне циклов — пустая."""
+        graph = {name: _refs(schema) & components.keys() for name, schema in components.items()}
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        stack: List[str] = []
+        result: Dict[str, frozenset] = {}
+
+        def _visit(name: str) -> None:
+            index[name] = low[name] = len(index)
+            stack.append(name)
+            for nxt in graph[name]:
+                if nxt not in index:
+                    _visit(nxt)
+                    low[name] = min(low[name], low[nxt])
+                elif nxt in stack:
+                    low[name] = min(low[name], index[nxt])
+            if low[name] == index[name]:
+                members = []
+                while True:
+                    member = stack.pop()
+                    members.append(member)
+                    if member == name:
+                        break
+                cyclic = len(members) > 1 or name in graph[name]
+                for member in members:
+                    result[member] = frozenset(members) if cyclic else frozenset()
+
+        for name in graph:
+            if name not in index:
+                _visit(name)
+        return result
+
+    # Пойнтеры считаются *относительно* схемы и мемоизируются по имени
+    # `$ref`: каждая компонента раскрывается один раз, сколько бы путей к ней
+    # ни вело. Время построения растёт с размером схемы, а не с числом путей.
+    #
+    # Цикл обрезается на обратном ребре к предку, который ещё раскрывается,
+    # так что внутри цикла результат схемы зависит от того, какие схемы её
+    # цикла уже раскрываются выше. Они и входят в ключ memo; для схем вне
+    # циклов эта часть ключа пуста.
+    memo: Dict[Tuple[str, frozenset], Tuple[Pointer, ...]] = {}
+    in_progress: set[str] = set()
+
+    def _ref_pointers(ref_name: str) -> Tuple[Pointer, ...]:
+        """Пойнтеры до countable‑DTO внутри компоненты `ref_name`."""
+        if ref_name in in_progress:  # цикл A→B→A: обратное ребро ничего не добавляет
+            return ()
+        key = (ref_name, cycles.get(ref_name, frozenset()) & in_progress)
+        if key in memo:
+            return memo[key]
+
+        in_progress.add(ref_name)
+        found: List[Pointer] = []
+        if ref_name in _COUNTABLE_TYPES:
+            found.append(())
+            # продолжаем обход, чтобы захватить дочерние массивы, если есть
+        resolved = components.get(ref_name)
+        if resolved:
+            found.extend(_traverse_schema(resolved))
+        in_progress.discard(ref_name)
+
+        memo[key] = result = tuple(found)
+        return result
+
+    def _traverse_schema(schema: Dict[str, Any]) -> List[Pointer]:
+        """Ищет пути до countable‑DTO относительно `schema`."""
+        schema = _merge_composite(schema)
+
+        # --- $ref ---
+        if "$ref" in schema:
+            ref_name = _schema_name(schema["$ref"])
+            return list(_ref_pointers(ref_name)) if ref_name else []
+
+        stype = schema.get("type")
+
+        # объект‑контейнер
+        if stype == "object":
+            found: List[Pointer] = []
+            for prop, subschema in (schema.get("properties") or {}).items():
+                found.extend((prop, *ptr) for ptr in _traverse_schema(subschema))
+            return found
+
+        # массив
+        if stype == "array":
+            return [("*", *ptr) for ptr in _traverse_schema(schema.get("items", {}))]
+        return []
+
+    # ---------- основная логика ----------
+    components = swagger.get("components", {}).get("schemas", {})
+    paths_obj = swagger.get("paths", {})
+    cycles = _cycles()
+
+    result: Dict[str, List[List[str]]] = {}
+    for raw_path, methods in paths_obj.items():
+        get_def = methods.get("get")
+        if not get_def:
+            continue
+
+        resp_block = get_def.get("responses", {}).get("200", {})
+        content = resp_block.get("content")
+        if content:
+            resp_schema = next(iter(content.values())).get("schema", {})
+        else:
+            resp_schema = resp_block.get("schema", {})
+        if not resp_schema:
+            continue
+
+        pointers = [list(ptr) for ptr in _traverse_schema(resp_schema)]
+        if not pointers:
+            continue
+
+        result[raw_path] = pointers
+
+    return result
+
+# ---------------------------------------------------------------------------
+# 4) Кэш‑артефакт
+def _cache_key(swagger_bytes: bytes) -> str:
+    return f"{_CACHE_VERSION}:{hashlib.sha256(swagger_bytes).hexdigest()}"
+
+
+def _read_cache(cache_file: Path, key: str) -> Dict[str, List[List[str]]] | None:
+    try:
+        cached = json.loads(cache_file.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("key") != key:
+        return None
+    return cached.get("paths")
+
+
+def _write_cache(cache_file: Path, key: str, paths: Dict[str, List[List[str]]]) -> None:
+    try:
+        cache_file.write_text(
+            json.dumps({"key": key, "paths": paths}, separators=(",", ":")),
+            encoding="utf-8",
+        )
+    except OSError as err:
+        # каталог интеграции может быть read‑only — просто работаем без кэша
+        _LOGGER.debug("Cannot write datapoint schema cache %s: %s", cache_file, err)
+
+
+def load_dp_schema_map(
+    swagger_file: Path = _SWAGGER_FILE,
+    cache_file: Path = _CACHE_FILE,
+) -> List[_PathPointers]:
+    """Загружает карту из артефакта или перестраивает её по swagger.
+
+    Блокирующая функция (файловый I/O) — из event loop вызывать через executor.
+    """
+    started = time.perf_counter()
+    swagger_bytes = swagger_file.read_bytes()
+    key = _cache_key(swagger_bytes)
+
+    paths = _read_cache(cache_file, key)
+    source = "cache"
+    if paths is None:
+        paths = _build_dp_schema_map(json.loads(swagger_bytes))
+        _write_cache(cache_file, key, paths)
+        source = "swagger"
+
+    result = [
+        _PathPointers(path=raw_path, pointers=pointers)
+        for raw_path, pointers in paths.items()
+    ]
+    _LOGGER.debug(
+        "Datapoint schema map loaded from %s in %.2f ms: %s",
+        source, (time.perf_counter() - started) * 1000, result,
+    )
+    return result
+
+# ---------------------------------------------------------------------------
+# 5) Роутер: конкретный путь → запись карты за один проход по сегментам
+_WILDCARD = "{}"
+
+
+@dataclass
+class _TrieNode:
+    children: Dict[str, "_TrieNode"] = field(default_factory=dict)
+    entry: _PathPointers | None = None
+
+
+class DpRouter:
+    """Префиксное дерево по сегментам swagger‑путей.
+
+    `{param}` превращается в wildcard‑узел; литеральный сегмент имеет
+    приоритет (`/hubs/ids` раньше `/hubs/{hubId}`). Результаты кэшируются
+    по конкретному пути — сотни `/devices/{id}/recent-data` за цикл
+    разрешаются словарным поиском.
+    """
+
+    def __init__(self, entries: List[_PathPointers], cache_size: int = 1024) -> None:
+        self._root = _TrieNode()
+        for entry in entries:
+            node = self._root
+            for segment in entry.path.strip("/").split("/"):
+                if segment.startswith("{") and segment.endswith("}"):
+                    segment = _WILDCARD
+                node = node.children.setdefault(segment, _TrieNode())
+            node.entry = entry
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _resolve(self, path: str) -> _PathPointers | None:
+        """Находит запись карты для `path` (query‑строка отбрасывается)."""
+        segments = path.partition("?")[0].strip("/").split("/")
+        return self._match(self._root, segments, 0)
+
+    def _match(self, node: _TrieNode, segments: List[str], idx: int) -> _PathPointers | None:
+        if idx == len(segments):
+            return node.entry
+        segment = segments[idx]
+        literal = node.children.get(segment)
+        if literal is not None:
+            found = self._match(literal, segments, idx + 1)
+            if found is not None:
+                return found
+        wildcard = node.children.get(_WILDCARD)
+        if wildcard is not None and segment:
+            return self._match(wildcard, segments, idx + 1)
+        return None
+
+# ---------------------------------------------------------------------------
+# 6) Ленивая загрузка
+_DP_SCHEMA_MAP: List[_PathPointers] | None = None
+_DP_ROUTER: DpRouter | None = None
+_LOAD_LOCK = threading.Lock()
+
+
+def get_dp_schema_map() -> List[_PathPointers]:
+    """Возвращает карту, загружая её при первом обращении."""
+    global _DP_SCHEMA_MAP, _DP_ROUTER
+    if _DP_SCHEMA_MAP is None:
+        with _LOAD_LOCK:
+            if _DP_SCHEMA_MAP is None:
+                entries = load_dp_schema_map()
+                _DP_ROUTER = DpRouter(entries)
+                _DP_SCHEMA_MAP = entries
+    return _DP_SCHEMA_MAP
+
+
+def get_dp_router() -> DpRouter:
+    """Роутер поверх карты (загружает карту при необходимости)."""
+    get_dp_schema_map()
+    return _DP_ROUTER
+
+
+async def async_load_dp_schema_map(hass) -> List[_PathPointers]:
+    """Прогревает карту в executor, не блокируя event loop."""
+    if _DP_SCHEMA_MAP is not None:
+        return _DP_SCHEMA_MAP
+    return await hass.async_add_executor_job(get_dp_schema_map)
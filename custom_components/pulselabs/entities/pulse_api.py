@@ -1,18 +1,25 @@
-from ..const import PLAN_LIMITS
+from ..const import PLAN_LIMITS, CONF_PLAN, DEFAULT_PLAN
 from ..sensors.ApiUsedSensor import ApiUsedSensor
 from ..sensors.ApiRemainingSensor import ApiRemainingSensor
 from ..sensors.ApiStatusSensor import ApiStatusSensor
+from ..sensors.ApiThresholdsSensor import ApiThresholdsSensor
+from ..sensors.ApiPollIntervalSensor import ApiPollIntervalSensor
+from ..sensors.ApiUnchangedRateSensor import ApiUnchangedRateSensor
+from ..sensors.ApiEndpointMetricSensor import build_endpoint_metric_sensors
 
 
 async def build_sensors(hass, entry, coordinator):
     """Создаёт сенсоры, связанные с API аккаунтом."""
     sensors = []
 
-    plan = entry.options.get("plan", "hobbyist").lower()
-    limit = PLAN_LIMITS.get(plan, 4800)
+    plan = entry.options.get(CONF_PLAN, DEFAULT_PLAN).lower()
+    limit = PLAN_LIMITS.get(plan, PLAN_LIMITS[DEFAULT_PLAN])
 
     sensors.append(ApiUsedSensor(coordinator, entry))
     sensors.append(ApiRemainingSensor(coordinator, entry, limit, plan))
+    sensors.append(ApiPollIntervalSensor(coordinator, entry))
+    sensors.append(ApiUnchangedRateSensor(coordinator, entry))
+    sensors.extend(build_endpoint_metric_sensors(coordinator, entry))
 
     return sensors
 
@@ -20,5 +27,6 @@ async def build_sensors(hass, entry, coordinator):
 async def build_binary_sensors(hass, entry, coordinator):
     """Создаёт бинарные сенсоры, связанные с API аккаунтом."""
     return [
-        ApiStatusSensor(coordinator,entry)
+        ApiStatusSensor(coordinator,entry),
+        ApiThresholdsSensor(coordinator, entry),
     ]
@@ -4,12 +4,18 @@ from homeassistant.components.sensor import SensorEntityDescription
 from ..sensors.PulseDeviceSensor import PulseDeviceSensor
 from ..sensors.PulseDeviceBinarySensor import PulseDeviceBinarySensor
 
-from ..const import (DeviceType, DEVICE_SENSOR_MAP as SENSOR_MAP, DEVICE_BINARY_SENSOR_MAP as BINARY_SENSOR_MAP)
+from ..const import (DeviceType, DEVICE_SENSOR_MAP as SENSOR_MAP, DEVICE_BINARY_SENSOR_MAP as BINARY_SENSOR_MAP, SPECTRUM_SENSOR_KEYS)
 
 SUPPORTED_TYPES = (DeviceType.PulseOne, DeviceType.PulsePro, DeviceType.PulseZero)
 
 def get_sensor_descriptions(device: dict) -> list[SensorEntityDescription]:
-    return [desc for key, desc in SENSOR_MAP.items() if key in device]
+    # полосы спектра считаются из замеров, которые докачиваются уже после
+    # первого опроса, — создаём их для любого Pulse Pro с ppfd
+    spectrum = "ppfd" in device and DeviceType.parse(device.get("deviceType")) == DeviceType.PulsePro
+    return [
+        desc for key, desc in SENSOR_MAP.items()
+        if key in device or (key in SPECTRUM_SENSOR_KEYS and spectrum)
+    ]
 
 def get_binary_sensor_descriptions(device: dict) -> list[SensorEntityDescription]:
     return [desc for key, desc in BINARY_SENSOR_MAP.items() if key in device]
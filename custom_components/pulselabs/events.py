@@ -0,0 +1,189 @@
+"""
+custom_components.pulselabs.events
+----------------------------------
+События Pulse в шине Home Assistant.
+
+Лента `/api/timeline` (заметки, уведомления, кормления, калибровки …)
+читается фоновой задачей записи раз в `TIMELINE_INTERVAL` — только то, что
+новее сохранённого курсора (`timeline.py`). Каждое новое событие уходит в
+шину как `pulselabs_timeline_event` и описывается в журнале (`logbook.py`).
+Курсор хранится в `Store` записи, так что после перезапуска история повторно
+не скачивается и не рассылается.
+
+Сработавшие пороги `/api/triggered-thresholds` опрашиваются по своему
+расписанию `THRESHOLDS_INTERVAL`; в шину уходят только переходы
+(`pulselabs_threshold_triggered` / `pulselabs_threshold_cleared`), а
+бинарный сенсор порогов обновляется по сигналу, без пересборки сущностей.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from datetime import datetime
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .budget import BudgetExceededError
+from .const import DOMAIN, THRESHOLDS_INTERVAL, TIMELINE_INTERVAL, TIMELINE_MAX_PAGES, TIMELINE_PAGE_SIZE
+from .thresholds import THRESHOLD_TYPES, ThresholdTracker
+from .timeline import EVENT_TYPES, TimelineCursor, async_fetch_new
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_TIMELINE = f"{DOMAIN}_timeline_event"
+EVENT_THRESHOLD_TRIGGERED = f"{DOMAIN}_threshold_triggered"
+EVENT_THRESHOLD_CLEARED = f"{DOMAIN}_threshold_cleared"
+
+
+def thresholds_signal(entry_id: str) -> str:
+    """Сигнал dispatcher: активные пороги записи изменились."""
+    return f"{DOMAIN}_thresholds_{entry_id}"
+
+
+class PulseEvents:
+    """Фоновое чтение ленты событий Pulse и рассылка их в шину HA."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, coordinator) -> None:
+        self.hass = hass
+        self.entry = entry
+        self.coordinator = coordinator
+        self._store = Store(hass, 1, f"{DOMAIN}_events_{entry.entry_id}.json")
+        self._cursor = TimelineCursor()
+        self.thresholds = ThresholdTracker()
+        # первый ответ порогов получен — до него состояние неизвестно
+        self.thresholds_polled = False
+        self._running: set[str] = set()
+
+        self.timeline_fired = 0
+        self.timeline_requests = 0
+        self.thresholds_fired = 0
+
+    async def async_load(self) -> None:
+        saved = await self._store.async_load() or {}
+        self._cursor = TimelineCursor.from_dict(saved.get("timeline"))
+        self.thresholds.load(saved.get("thresholds"))
+        if self._cursor.high_water is None:
+            # первый запуск: прошлую историю не рассылаем
+            self._cursor.high_water = dt_util.utcnow()
+            self._save()
+
+    def _save(self) -> None:
+        self._store.async_delay_save(
+            lambda: {"timeline": self._cursor.as_dict(), "thresholds": self.thresholds.as_dict()}, 0
+        )
+
+    @callback
+    def async_start(self) -> None:
+        for name, poll, interval in (
+            ("timeline", self._async_poll_timeline, TIMELINE_INTERVAL),
+            ("thresholds", self._async_poll_thresholds, THRESHOLDS_INTERVAL),
+        ):
+            schedule = self._scheduler(name, poll)
+            self.entry.async_on_unload(async_track_time_interval(self.hass, schedule, interval))
+            schedule()
+
+    def _scheduler(self, name: str, poll):
+        """Запуск опроса фоновой задачей; пока предыдущий идёт — пропуск."""
+
+        @callback
+        def schedule(_now: datetime | None = None) -> None:
+            if name in self._running:
+                return
+            self._running.add(name)
+            self.entry.async_create_background_task(
+                self.hass, self._async_run(name, poll), f"{DOMAIN}_{name}_{self.entry.entry_id}"
+            )
+
+        return schedule
+
+    async def _async_run(self, name: str, poll) -> None:
+        try:
+            await poll()
+        except BudgetExceededError as err:
+            _LOGGER.debug("%s poll skipped: %s", name, err)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("%s poll failed: %s", name, err)
+        finally:
+            self._running.discard(name)
+
+    async def _fetch_page(self, start: datetime, end: datetime | None, count: int, page: int) -> list[dict]:
+        self.timeline_requests += 1
+        return await self.coordinator.api.async_get_timeline(start, end=end, count=count, page=page)
+
+    async def _async_poll_timeline(self) -> None:
+        window_end = self._cursor.window_end
+        events = await async_fetch_new(self._fetch_page, self._cursor, TIMELINE_PAGE_SIZE, TIMELINE_MAX_PAGES)
+        if self._cursor.window_end != window_end:
+            # всплеск больше лимита страниц: окно догрузки сузилось
+            self._save()
+        for event in events:
+            self.hass.bus.async_fire(EVENT_TIMELINE, self._event_data(event))
+        if events:
+            self.timeline_fired += len(events)
+            self._cursor.advance(events)
+            self._save()
+
+    async def _async_poll_thresholds(self) -> None:
+        triggered, cleared = self.thresholds.update(await self.coordinator.api.async_get_triggered_thresholds())
+        first = not self.thresholds_polled
+        self.thresholds_polled = True
+        for threshold in triggered:
+            self.hass.bus.async_fire(EVENT_THRESHOLD_TRIGGERED, self._threshold_data(threshold))
+        for threshold in cleared:
+            self.hass.bus.async_fire(EVENT_THRESHOLD_CLEARED, self._threshold_data(threshold))
+        self.thresholds_fired += len(triggered) + len(cleared)
+
+        if triggered or cleared:
+            self._save()
+        if triggered or cleared or first:
+            async_dispatcher_send(self.hass, thresholds_signal(self.entry.entry_id))
+
+    @staticmethod
+    def threshold_type(threshold) -> str | int | None:
+        threshold_type = threshold.get("thresholdType")
+        return THRESHOLD_TYPES.get(threshold_type, threshold_type)
+
+    def _threshold_data(self, threshold) -> dict[str, Any]:
+        return {
+            "config_entry_id": self.entry.entry_id,
+            "id": threshold.get("id"),
+            "threshold_id": threshold.get("thresholdId"),
+            "type": self.threshold_type(threshold),
+            "device_id": threshold.get("deviceId"),
+            "device_name": threshold.get("deviceName"),
+            "low_or_high": threshold.get("lowOrHigh"),
+            "low_threshold": threshold.get("lowThresholdValue"),
+            "high_threshold": threshold.get("highThresholdValue"),
+            "triggering_value": threshold.get("triggeringValue"),
+            "created_at": threshold.get("createdAt"),
+            "resolved_at": threshold.get("resolvedAt"),
+        }
+
+    def _event_data(self, event: dict) -> dict[str, Any]:
+        event_type = event.get("timelineEventType")
+        return {
+            "config_entry_id": self.entry.entry_id,
+            "id": event.get("id"),
+            "type": EVENT_TYPES.get(event_type, event_type),
+            "title": event.get("title"),
+            "detail": event.get("detail"),
+            "created_at": event.get("createdAt"),
+            "grow_id": event.get("growId"),
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Состояние для диагностики (атрибуты ApiStatusSensor)."""
+        return {
+            "timeline_cursor": self._cursor.as_dict()["high_water"],
+            "timeline_fired": self.timeline_fired,
+            "timeline_requests": self.timeline_requests,
+            "thresholds_ongoing": len(self.thresholds.ongoing),
+            "thresholds_fired": self.thresholds_fired,
+        }
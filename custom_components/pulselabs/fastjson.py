@@ -0,0 +1,35 @@
+"""
+custom_components.pulselabs.fastjson
+------------------------------------
+Разбор JSON тела ответа прямо из `bytes`.
+
+`await resp.json()` сначала декодирует тело в `str` (копия размером с
+ответ), а потом разбирает его stdlib‑`json`. Клиент вместо этого читает
+тело один раз (`resp.read()`) и отдаёт те же байты декодеру: orjson, если
+он установлен (в Home Assistant он есть всегда), иначе stdlib `json.loads`,
+который тоже принимает `bytes`. Эти же байты идут в отпечаток ответа и в
+отладочный лог — повторной сериализации нет.
+
+orjson разбирает типичные ответы в 2–3 раза быстрее, но на время разбора
+занимает больше памяти (арена парсера), поэтому большие исторические
+диапазоны по‑прежнему читаются потоково (`json_stream`), а не целиком.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+import json
+
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - без orjson работаем на stdlib
+    orjson = None
+
+JsonLoads = Callable[[bytes], Any]
+
+# декодер по умолчанию для BaseApi; можно передать свой в конструктор
+json_loads: JsonLoads = orjson.loads if orjson is not None else json.loads
+DECODER_NAME = "orjson" if orjson is not None else "json"
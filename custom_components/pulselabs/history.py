@@ -0,0 +1,107 @@
+"""
+custom_components.pulselabs.history
+-----------------------------------
+Свёртка исторических точек Pulse API в часовые статистики.
+
+Долгосрочная статистика Home Assistant хранится по часам (mean/min/max).
+`HourlyAggregator` принимает нормализованные точки (как `_wrap_device`:
+исходные поля + рассчитанные VPD и точка росы) и копит для каждого ключа
+сумму, минимум и максимум в корзине своего часа — память O(ключи × часы),
+а не O(точки).
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+
+def floor_hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def parse_created_at(value: Any) -> datetime | None:
+    """`createdAt` точки → aware datetime (метки без пояса — UTC)."""
+    if not isinstance(value, str):
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+def missed_points(
+    points: Iterable[Mapping[str, Any]], last_seen: Mapping[str, datetime | None]
+) -> Dict[str, List[Tuple[datetime, Mapping[str, Any]]]]:
+    """Точки `/devices/range` по устройствам, без уже виденных вживую.
+
+    Отбрасываются точки не позже последнего живого `createdAt` устройства
+    (`last_seen`) и повторы одного момента; результат упорядочен по времени.
+    """
+    by_device: Dict[str, Dict[datetime, Mapping[str, Any]]] = {}
+    for point in points:
+        moment = parse_created_at(point.get("createdAt"))
+        device_id = point.get("deviceId")
+        if moment is None or device_id is None:
+            continue
+        device_id = str(device_id)
+        seen = last_seen.get(device_id)
+        if seen is not None and moment <= seen:
+            continue
+        by_device.setdefault(device_id, {}).setdefault(moment, point)
+    return {device_id: sorted(found.items(), key=lambda item: item[0]) for device_id, found in by_device.items()}
+
+
+@dataclass
+class _Bucket:
+    count: int = 0
+    total: float = 0.0
+    min: float = float("inf")
+    max: float = float("-inf")
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+
+class HourlyAggregator:
+    """Часовые mean/min/max по набору ключей."""
+
+    def __init__(self, keys: Iterable[str]) -> None:
+        self._keys = tuple(keys)
+        self._buckets: Dict[str, Dict[datetime, _Bucket]] = {key: {} for key in self._keys}
+        self.points = 0
+
+    def add(self, moment: datetime, values: Mapping[str, Any]) -> None:
+        hour = floor_hour(moment)
+        self.points += 1
+        for key in self._keys:
+            value = values.get(key)
+            # bool — подкласс int, но это не измерение
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                buckets = self._buckets[key]
+                bucket = buckets.get(hour)
+                if bucket is None:
+                    bucket = buckets[hour] = _Bucket()
+                bucket.add(value)
+
+    def keys(self) -> List[str]:
+        """Ключи, для которых есть хотя бы одно значение."""
+        return [key for key in self._keys if self._buckets[key]]
+
+    def rows(self, key: str) -> List[Dict[str, Any]]:
+        """Часовые строки по возрастанию времени: start, mean, min, max."""
+        return [
+            {"start": hour, "mean": b.total / b.count, "min": b.min, "max": b.max}
+            for hour, b in sorted(self._buckets[key].items())
+        ]
@@ -0,0 +1,93 @@
+"""
+custom_components.pulselabs.hub_history
+---------------------------------------
+Параллельная загрузка истории сенсоров, подключённых к хабу.
+
+`/sensors/{sensorId}/data-range` отдаёт историю одного сенсора, поэтому хаб
+с десятками щупов (VWC1, EC1, PH10, THC1 …) по одному запросу за раз
+грузился бы N сетевых циклов. Здесь запросы идут параллельно под
+семафором (`concurrency`), каждый ответ читается потоково, а результат
+отдаётся вызывающему коду по мере готовности каждого сенсора — общий
+wall‑time ≈ самый медленный запрос, а не сумма.
+
+Ответ — массив `UniversalDataPointArrayDto` в «столбцовом» виде:
+`dataPointValues[i].paramValues[j]` измерен в `dataPointValuesCreatedAt[j]`.
+`iter_array_points()` разворачивает его в точки той же формы, что
+`dataPointValues` из `/all-devices` (`ParamName` / `MeasuringUnit` /
+`ParamValue`), чтобы их нормализовал `_wrap_sensor` координатора.
+
+Квоту бережёт сам API‑клиент: каждый запрос проходит бюджетный gate.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Tuple
+
+
+def _field(item: dict, name: str) -> Any:
+    """Поле в camelCase (swagger) или PascalCase (как в /all-devices)."""
+    value = item.get(name)
+    return value if value is not None else item.get(name[0].upper() + name[1:])
+
+
+def iter_array_points(dto: dict) -> Iterator[Tuple[str, dict]]:
+    """(createdAt, dp_value) для каждого значения `UniversalDataPointArrayDto`."""
+    created = _field(dto, "dataPointValuesCreatedAt") or []
+    for values in _field(dto, "dataPointValues") or []:
+        name = _field(values, "paramName")
+        unit = _field(values, "measuringUnit")
+        for created_at, value in zip(created, _field(values, "paramValues") or []):
+            yield created_at, {"ParamName": name, "MeasuringUnit": unit, "ParamValue": value}
+
+
+@dataclass
+class SensorHistory:
+    """История одного сенсора: нормализованные точки или ошибка загрузки."""
+
+    sensor_id: Any
+    points: List[Tuple[str, dict]] = field(default_factory=list)
+    error: BaseException | None = None
+
+
+async def async_iter_sensor_histories(
+    fetch: Callable[[Any], AsyncIterator[dict]],
+    sensor_ids: Iterable[Any],
+    normalize: Callable[[Any, dict], dict],
+    concurrency: int = 4,
+) -> AsyncIterator[SensorHistory]:
+    """Грузит историю сенсоров параллельно, не более `concurrency` запросов сразу.
+
+    `fetch(sensor_id)` — потоковый итератор `UniversalDataPointArrayDto`,
+    `normalize(sensor_id, dp_value)` — приведение точки к виду `_wrap_sensor`.
+    Результаты отдаются в порядке готовности; ошибка одного сенсора не
+    прерывает остальные. Если вызывающий код перестал читать, оставшиеся
+    запросы отменяются.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    done: asyncio.Queue[SensorHistory] = asyncio.Queue()
+
+    async def load(sensor_id: Any) -> None:
+        history = SensorHistory(sensor_id)
+        try:
+            async with semaphore:
+                async for dto in fetch(sensor_id):
+                    for created_at, dp_value in iter_array_points(dto):
+                        history.points.append((created_at, normalize(sensor_id, dp_value)))
+        except Exception as err:  # pylint: disable=broad-except
+            history.error = err
+        done.put_nowait(history)
+
+    tasks: Dict[Any, asyncio.Task] = {
+        sensor_id: asyncio.ensure_future(load(sensor_id)) for sensor_id in dict.fromkeys(sensor_ids)
+    }
+    try:
+        for _ in range(len(tasks)):
+            yield await done.get()
+    finally:
+        for task in tasks.values():
+            task.cancel()
@@ -0,0 +1,128 @@
+"""
+custom_components.pulselabs.json_stream
+---------------------------------------
+Инкрементальный разбор JSON‑массива верхнего уровня.
+
+История (`/devices/range`, `/devices/{id}/data-range`, `/sensors/{id}/data-range`)
+приходит одним большим массивом. Вместо `await resp.json()` тело читается
+чанками, и каждый элемент массива отдаётся вызывающему коду, как только он
+целиком пришёл. В памяти держится только недоразобранный хвост буфера, так
+что пиковое потребление не зависит от длины диапазона.
+
+Незавершённый элемент разбирается заново с начала, поэтому для одного
+большого элемента (колоночный `UniversalDataPointArrayDto` датчика — это
+мегабайты) повтор на каждом чанке дал бы квадратичное время. Чанки копятся
+списком, а следующая попытка разбора делается, только когда хвост вырос
+вдвое с прошлой неудачной: суммарно разбор линеен по размеру элемента, а
+мелкие элементы по‑прежнему отдаются с первым же чанком, где они закончились.
+
+Модуль намеренно не зависит от Home Assistant и aiohttp.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+
+from typing import Any, AsyncIterable, AsyncIterator, List
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+# состояния автомата
+_START, _FIRST, _VALUE, _AFTER, _DONE = range(5)
+
+
+class JsonArrayStreamParser:
+    """Принимает куски тела ответа, возвращает готовые элементы массива."""
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        # недоразобранный хвост кусками и его длина
+        self._parts: List[str] = []
+        self._size = 0
+        # с какой длины хвоста снова пробовать разобрать незавершённый элемент
+        self._retry_at = 0
+        self._state = _START
+
+    @property
+    def buffered(self) -> int:
+        """Размер недоразобранного хвоста (символов)."""
+        return self._size
+
+    def _append(self, text: str) -> None:
+        if text:
+            self._parts.append(text)
+            self._size += len(text)
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Добавляет кусок тела и возвращает элементы, завершённые им."""
+        self._append(self._utf8.decode(chunk))
+        if self._size < self._retry_at:
+            return []
+        return self._drain(final=False)
+
+    def close(self) -> List[Any]:
+        """Конец тела: дочитывает хвост и проверяет, что массив закрыт."""
+        self._append(self._utf8.decode(b"", final=True))
+        items = self._drain(final=True)
+        if self._state != _DONE:
+            raise ValueError("Unexpected end of JSON array stream")
+        return items
+
+    def _drain(self, final: bool) -> List[Any]:
+        buf = "".join(self._parts)
+        pos, end = 0, len(buf)
+        items: List[Any] = []
+        self._retry_at = 0
+
+        while True:
+            while pos < end and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos == end:
+                break
+            char = buf[pos]
+
+            if self._state == _START:
+                if char != "[":
+                    raise ValueError(f"Expected JSON array, got {char!r}")
+                self._state, pos = _FIRST, pos + 1
+            elif self._state in (_FIRST, _AFTER) and char == "]":
+                self._state, pos = _DONE, pos + 1
+            elif self._state == _AFTER:
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+                self._state, pos = _VALUE, pos + 1
+            elif self._state in (_FIRST, _VALUE):
+                try:
+                    item, item_end = self._decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    # элемент ещё не пришёл целиком: ждём, пока хвост вырастет вдвое
+                    self._retry_at = 2 * (end - pos)
+                    break
+                if not final and (item_end == end or buf[item_end] not in _DELIMITERS):
+                    # число может быть разобрано по префиксу («-0» из «-0.5e-3»),
+                    # поэтому элемент принимаем только вместе с разделителем
+                    break
+                items.append(item)
+                self._state, pos = _AFTER, item_end
+            else:  # _DONE
+                raise ValueError(f"Unexpected data after JSON array: {char!r}")
+
+        tail = buf[pos:]
+        self._parts = [tail] if tail else []
+        self._size = len(tail)
+        return items
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Асинхронно отдаёт элементы JSON‑массива по мере поступления чанков."""
+    parser = JsonArrayStreamParser()
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    for item in parser.close():
+        yield item
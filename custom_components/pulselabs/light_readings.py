@@ -0,0 +1,148 @@
+"""
+custom_components.pulselabs.light_readings
+------------------------------------------
+Кэш спектральных замеров Pulse Pro (`/api/light-readings/{deviceId}`).
+
+`/all-devices` отдаёт только `proLightReadingPreviewDto` (ppfd, dli), а
+полный `ProLightReadingDto` со спектром лежит в постраничном
+`/api/light-readings`. Хранить его как список dict — десятки Python‑объектов
+на замер; `LightReadingCache` держит каждый замер одним `array('d')`:
+`SCALAR_FIELDS` подряд (отсутствующие — NaN), за ними `spectrum`.
+
+Замеры ключуются моментом `createdAt`. Страницы идут от новых к старым,
+поэтому `async_sync()` останавливается на первой странице с уже известным
+замером — ранее скачанные страницы повторно не запрашиваются, а если новых
+замеров нет, синхронизация стоит один запрос.
+
+Массивы живут только в памяти, а моменты скачанных замеров
+(`known_moments`) сохраняются в `Store` записи: после перезапуска
+`load_known()` возвращает их, и синхронизация продолжает с места
+остановки, а не качает `capacity` замеров заново. Полосы спектра
+последнего замера координатор сохраняет рядом с моментами.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+import math
+
+from array import array
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+from .history import parse_created_at
+
+# скалярные поля ProLightReadingDto в порядке хранения
+SCALAR_FIELDS = (
+    "channel1", "channel2", "channel3", "channel4",
+    "channel5", "channel6", "channel7", "channel8",
+    "ir", "clear", "flicker", "gain", "tint",
+    "ppfd", "dli", "pfdRed", "pfdGreen", "pfdBlue", "pfdIr",
+)
+_WIDTH = len(SCALAR_FIELDS)
+
+
+class LightReadingCache:
+    """Замеры одного прибора: createdAt (epoch) → `array('d')`, не больше `capacity`."""
+
+    def __init__(self, device_id: str, capacity: int) -> None:
+        self.device_id = device_id
+        self.capacity = capacity
+        self._readings: Dict[float, array] = {}
+        # моменты уже скачанных замеров; после перезапуска — и без массивов
+        self._known: set[float] = set()
+
+    def __len__(self) -> int:
+        return len(self._readings)
+
+    def __contains__(self, moment: float) -> bool:
+        return moment in self._known
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(row) * row.itemsize for row in self._readings.values())
+
+    @property
+    def newest(self) -> float | None:
+        return max(self._readings) if self._readings else None
+
+    def add(self, reading: Mapping[str, Any]) -> bool:
+        """Кладёт `ProLightReadingDto`; уже известный или без createdAt — False."""
+        created = parse_created_at(reading.get("createdAt"))
+        if created is None:
+            return False
+        moment = created.timestamp()
+        if moment in self._known:
+            return False
+        row = array("d", (_as_float(reading.get(name)) for name in SCALAR_FIELDS))
+        row.extend(_as_float(value) for value in reading.get("spectrum") or ())
+        self._readings[moment] = row
+        self._known.add(moment)
+        if len(self._readings) > self.capacity:
+            del self._readings[min(self._readings)]
+        if len(self._known) > self.capacity:
+            self._known.discard(min(self._known))
+        return True
+
+    def known_moments(self) -> List[float]:
+        """Моменты скачанных замеров — для `Store`."""
+        return sorted(self._known)
+
+    def load_known(self, moments: Iterable[float]) -> None:
+        """Моменты, скачанные до перезапуска: их страницы повторно не запрашиваются."""
+        self._known.update(float(moment) for moment in moments)
+        for moment in sorted(self._known)[:-self.capacity]:
+            self._known.discard(moment)
+
+    def get(self, moment: float) -> Dict[str, Any] | None:
+        """Замер в виде dict (скаляры и `spectrum`) — только для чтения наружу."""
+        row = self._readings.get(moment)
+        if row is None:
+            return None
+        reading: Dict[str, Any] = {
+            name: (None if math.isnan(value) else value) for name, value in zip(SCALAR_FIELDS, row)
+        }
+        reading["spectrum"] = row[_WIDTH:]
+        return reading
+
+    def spectrum(self, moment: float) -> array | None:
+        """Спектр замера без копирования (срез `array`)."""
+        row = self._readings.get(moment)
+        return row[_WIDTH:] if row is not None else None
+
+    def latest(self) -> Tuple[float, Dict[str, Any]] | None:
+        newest = self.newest
+        return (newest, self.get(newest)) if newest is not None else None
+
+    def moments(self) -> List[float]:
+        return sorted(self._readings)
+
+    def items(self) -> Iterator[Tuple[float, array]]:
+        """(момент, строка) от старых к новым."""
+        for moment in self.moments():
+            yield moment, self._readings[moment]
+
+
+def _as_float(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+
+
+async def async_sync(cache: LightReadingCache, pages: AsyncIterator[dict]) -> int:
+    """Докачивает в кэш новые замеры; возвращает их число.
+
+    Страница, где встретился уже известный замер, — последняя: всё, что
+    старше, уже в кэше. Пустой кэш заполняется не дальше `capacity`.
+    """
+    added = 0
+    async with aclosing(pages):
+        async for page in pages:
+            known = False
+            for reading in page.get("lightReadings") or []:
+                if cache.add(reading):
+                    added += 1
+                else:
+                    known = True
+            if known or added >= cache.capacity:
+                break
+    return added
@@ -0,0 +1,34 @@
+"""Описание событий Pulse Labs в журнале."""
+from __future__ import annotations
+
+from typing import Callable
+
+from homeassistant.components.logbook import LOGBOOK_ENTRY_MESSAGE, LOGBOOK_ENTRY_NAME
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .const import DOMAIN
+from .events import EVENT_THRESHOLD_CLEARED, EVENT_THRESHOLD_TRIGGERED, EVENT_TIMELINE
+
+
+@callback
+def async_describe_events(hass: HomeAssistant, async_describe_event: Callable) -> None:
+    @callback
+    def async_describe_timeline_event(event: Event) -> dict[str, str]:
+        data = event.data
+        message = data.get("title") or str(data.get("type"))
+        if data.get("detail"):
+            message = f"{message}: {data['detail']}"
+        return {LOGBOOK_ENTRY_NAME: "Pulse Labs", LOGBOOK_ENTRY_MESSAGE: message}
+
+    @callback
+    def async_describe_threshold_event(event: Event) -> dict[str, str]:
+        data = event.data
+        state = "triggered" if event.event_type == EVENT_THRESHOLD_TRIGGERED else "cleared"
+        message = f"{data.get('type')} threshold {state}"
+        if data.get("triggering_value") is not None and state == "triggered":
+            message = f"{message} at {data['triggering_value']}"
+        return {LOGBOOK_ENTRY_NAME: data.get("device_name") or "Pulse Labs", LOGBOOK_ENTRY_MESSAGE: message}
+
+    async_describe_event(DOMAIN, EVENT_TIMELINE, async_describe_timeline_event)
+    async_describe_event(DOMAIN, EVENT_THRESHOLD_TRIGGERED, async_describe_threshold_event)
+    async_describe_event(DOMAIN, EVENT_THRESHOLD_CLEARED, async_describe_threshold_event)
@@ -0,0 +1,99 @@
+"""
+custom_components.pulselabs.metrics
+-----------------------------------
+Скользящие гистограммы по шаблонам эндпоинтов Pulse API.
+
+Для каждого шаблона пути (`/devices/{deviceId}/data-range`, а не
+конкретного id) хранится окно последних N замеров каждой метрики:
+
+* `network_ms` — запрос целиком, включая повторы транспорта;
+* `bytes`      — размер тела ответа;
+* `decode_ms`  — разбор JSON;
+* `count_ms`   — подсчёт datapoints по swagger‑карте;
+* `wrap_ms`    — нормализация ответа координатором;
+* `datapoints` — списанная стоимость.
+
+Перцентили (p50/p95/p99, nearest rank) считаются по требованию; отсортированное
+окно кэшируется до следующего замера. Память ограничена: окно × метрики ×
+шаблоны, а шаблонов у API единицы.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+import math
+
+from collections import deque
+from typing import Any, Dict, Iterable
+
+from .dp_schema import get_dp_router
+
+# сколько последних замеров помнит каждая гистограмма
+DEFAULT_WINDOW = 256
+
+PERCENTILES = (50, 95, 99)
+
+
+def endpoint_template(path: str) -> str:
+    """Шаблон пути: из swagger‑карты, иначе числовые сегменты → `{id}`."""
+    entry = get_dp_router().resolve(path)
+    if entry is not None:
+        return entry.path
+    return "/".join("{id}" if seg.isdigit() else seg for seg in path.partition("?")[0].split("/"))
+
+
+class RollingHistogram:
+    """Окно последних `size` значений с перцентилями."""
+
+    def __init__(self, size: int = DEFAULT_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._sorted: list[float] | None = None
+        self.count = 0      # всего замеров, не только в окне
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self._sorted = None
+        self.count += 1
+
+    def percentile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        rank = max(math.ceil(q / 100 * len(self._sorted)), 1)
+        return self._sorted[rank - 1]
+
+    def summary(self, percentiles: Iterable[int] = PERCENTILES) -> dict[str, Any]:
+        summary: dict[str, Any] = {f"p{q}": _round(self.percentile(q)) for q in percentiles}
+        summary["count"] = self.count
+        return summary
+
+
+def _round(value: float | None) -> float | None:
+    return round(value, 2) if value is not None else None
+
+
+class EndpointMetrics:
+    """Гистограммы `шаблон → метрика → RollingHistogram`."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._window = window
+        self._endpoints: Dict[str, Dict[str, RollingHistogram]] = {}
+
+    def observe(self, path: str, metric: str, value: float) -> None:
+        metrics = self._endpoints.setdefault(endpoint_template(path), {})
+        histogram = metrics.get(metric)
+        if histogram is None:
+            histogram = metrics[metric] = RollingHistogram(self._window)
+        histogram.add(value)
+
+    def histogram(self, template: str, metric: str) -> RollingHistogram | None:
+        return self._endpoints.get(template, {}).get(metric)
+
+    def stats(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Снимок всех перцентилей: `{шаблон: {метрика: {p50, p95, p99, count}}}`."""
+        return {
+            template: {metric: histogram.summary() for metric, histogram in metrics.items()}
+            for template, metrics in self._endpoints.items()
+        }
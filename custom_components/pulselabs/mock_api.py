@@ -80,7 +80,7 @@ class MockPulseApi(BaseApi):
             "/all-devices": MOCK_ALL_DEVICES,
         }
 
-    async def async_get(self, path: str):
+    async def _async_fetch(self, path: str):
         # Если ответ переопределён в тесте — берём его
         if path in self._responses:
             payload = self._responses[path]
@@ -0,0 +1,211 @@
+"""
+custom_components.pulselabs.resilience
+--------------------------------------
+Устойчивый транспорт для Pulse API: повторы, backoff и circuit breaker.
+
+* Повторяются только «временные» ошибки: разрыв соединения, таймаут,
+  HTTP 5xx и 429. Остальные 4xx (неверный ключ, нет ресурса) отдаются сразу.
+* Пауза между попытками — экспоненциальный backoff с полным jitter;
+  для 429 используется `Retry-After` (секунды или HTTP‑дата).
+* Circuit breaker размыкается после N подряд неудачных вызовов и пропускает
+  один пробный запрос (half‑open) по истечении `reset_timeout`. Если
+  `Retry-After` длиннее допустимой паузы, breaker держится разомкнутым до
+  указанного сервером времени, чтобы не долбить облако во время сбоя.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, TypeVar
+
+import aiohttp
+
+import logging
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(aiohttp.ClientError):
+    """Breaker разомкнут — запрос не отправлялся."""
+
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(f"Pulse API circuit breaker is open, retry in {retry_in:.0f} s")
+        self.retry_in = retry_in
+
+
+@dataclass
+class RetryPolicy:
+    attempts: int = 3          # всего попыток на один вызов
+    base_delay: float = 1.0    # секунд, первая пауза до jitter
+    max_delay: float = 30.0    # потолок паузы (и для Retry-After)
+
+    def backoff(self, attempt: int, rand: Callable[[], float] = random.random) -> float:
+        """Full jitter: случайная пауза в [0, min(max, base·2^attempt)]."""
+        return rand() * min(self.max_delay, self.base_delay * (2 ** attempt))
+
+
+def parse_retry_after(value: str | None, now: datetime | None = None) -> float | None:
+    """`Retry-After` в секундах: число секунд или HTTP‑дата."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - (now or datetime.now(timezone.utc))).total_seconds(), 0.0)
+
+
+class CircuitBreaker:
+    """Классический closed → open → half‑open breaker."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.opened_until = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self) -> bool:
+        """Проверяет, можно ли слать запрос. Возвращает True для пробного
+        (half‑open) запроса; при разомкнутом breaker бросает CircuitOpenError."""
+        now = self._clock()
+        if self.state == STATE_OPEN:
+            if now < self.opened_until:
+                raise CircuitOpenError(self.opened_until - now)
+            self.state = STATE_HALF_OPEN
+        if self.state == STATE_HALF_OPEN:
+            if self._probe_in_flight:
+                raise CircuitOpenError(0)
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def retry_in(self) -> float:
+        """Сколько секунд breaker ещё будет разомкнут."""
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(self.opened_until - self._clock(), 0.0)
+
+    def release_probe(self) -> None:
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == STATE_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.hold(self.reset_timeout)
+
+    def hold(self, seconds: float) -> None:
+        """Размыкает breaker минимум на `seconds`."""
+        if self.state != STATE_OPEN:
+            _LOGGER.warning("Pulse API circuit breaker opened for %.0f s", seconds)
+        self.state = STATE_OPEN
+        self.opened_until = max(self.opened_until, self._clock() + seconds)
+
+
+def _classify(err: BaseException) -> tuple[bool, float | None]:
+    """(повторять ли, Retry-After) для исключения одной попытки."""
+    if isinstance(err, aiohttp.ClientResponseError):
+        if err.status == 429:
+            headers = err.headers or {}
+            return True, parse_retry_after(headers.get("Retry-After"))
+        return err.status >= 500, None
+    if isinstance(err, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)):
+        return True, None
+    return False, None
+
+
+class ResilientTransport:
+    """Оборачивает одну попытку запроса повторами и circuit breaker."""
+
+    def __init__(
+        self,
+        policy: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+
+        self.retries = 0          # всего повторов с момента запуска
+        self.last_retry_after: float | None = None
+
+    async def call(self, attempt_fn: Callable[[], Awaitable[T]]) -> T:
+        probe = self.breaker.before_call()
+        try:
+            return await self._call_with_retries(attempt_fn)
+        finally:
+            if probe:
+                self.breaker.release_probe()
+
+    async def _call_with_retries(self, attempt_fn: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            try:
+                result = await attempt_fn()
+            except Exception as err:  # pylint: disable=broad-except
+                retryable, retry_after = _classify(err)
+                if not retryable:
+                    if isinstance(err, aiohttp.ClientResponseError):
+                        # сервер ответил осмысленной ошибкой (401/404/…) — он жив
+                        self.breaker.record_success()
+                    raise
+                if retry_after is not None:
+                    self.last_retry_after = retry_after
+
+                attempt += 1
+                if attempt >= self.policy.attempts or (retry_after or 0) > self.policy.max_delay:
+                    if retry_after is not None:
+                        self.breaker.hold(retry_after)
+                    self.breaker.record_failure()
+                    raise
+
+                delay = retry_after if retry_after is not None else self.policy.backoff(attempt - 1)
+                self.retries += 1
+                _LOGGER.debug("Pulse API attempt %d failed (%s), retry in %.2f s", attempt, err, delay)
+                await self._sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+    def as_dict(self) -> dict[str, Any]:
+        """Состояние для диагностики (атрибуты ApiStatusSensor)."""
+        breaker = self.breaker
+        return {
+            "breaker_state": breaker.state,
+            "consecutive_failures": breaker.consecutive_failures,
+            "breaker_retry_in": round(breaker.retry_in()),
+            "retries": self.retries,
+            "last_retry_after": self.last_retry_after,
+        }
@@ -0,0 +1,60 @@
+"""
+custom_components.pulselabs.scheduler
+-------------------------------------
+Адаптивный интервал опроса `/all-devices` с учётом суточной квоты datapoints.
+
+После каждого опроса интервал пересчитывается так, чтобы оставшийся бюджет
+равномерно растянулся до сброса квоты:
+
+    interval = время_до_сброса × стоимость_опроса / остаток_бюджета
+
+Результат ограничивается снизу настраиваемым минимальным интервалом. Если
+бюджета не хватает даже на один опрос — следующий опрос планируется сразу
+после сброса квоты.
+
+Модуль намеренно не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+# небольшой запас после полуночи, чтобы опрос гарантированно попал в новые сутки
+_RESET_MARGIN = timedelta(seconds=5)
+
+
+@dataclass
+class QuotaPollScheduler:
+    """Планировщик интервала опроса по остатку суточной квоты."""
+
+    limit: int
+    min_interval: timedelta
+
+    # последние входные данные и результат — для диагностического сенсора
+    last_cost: int = 0
+    remaining: int = 0
+    reset_at: datetime | None = None
+    planned_interval: timedelta | None = None
+
+    def next_interval(self, cost: int, used: int, now: datetime, reset_at: datetime) -> timedelta:
+        """Интервал до следующего опроса.
+
+        `cost` — datapoints, списанные последним опросом; `used` — расход
+        за текущие сутки; `reset_at` — момент сброса квоты.
+        """
+        cost = max(cost, 1)
+        remaining = max(self.limit - used, 0)
+        until_reset = max(reset_at - now, timedelta(0))
+
+        if remaining < cost:
+            # до сброса не хватит даже на один опрос
+            interval = until_reset + _RESET_MARGIN
+        else:
+            interval = max(until_reset * cost / remaining, self.min_interval)
+
+        self.last_cost = cost
+        self.remaining = remaining
+        self.reset_at = reset_at
+        self.planned_interval = interval
+        return interval
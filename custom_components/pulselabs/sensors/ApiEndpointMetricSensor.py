@@ -0,0 +1,58 @@
+from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
+from homeassistant.const import UnitOfInformation, UnitOfTime
+
+from .ApiSensor import ApiSensor
+
+# эндпоинт живого опроса, по которому считается состояние сенсора
+POLL_TEMPLATE = "/all-devices"
+
+
+class ApiEndpointMetricSensor(ApiSensor, SensorEntity):
+    """p95 метрики опроса /all-devices; p50/p99 и все эндпоинты — в атрибутах."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    # полный снимок по эндпоинтам меняется каждый опрос — в recorder не пишем
+    _unrecorded_attributes = frozenset({"endpoints"})
+
+    def __init__(self, coordinator, entry, key: str, metric: str, unit: str, device_class, icon: str):
+        super().__init__(coordinator, entry)
+        self._metric = metric
+        self._attr_translation_key = key
+        self._attr_unique_id = f"{entry.entry_id}_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+        self._attr_icon = icon
+
+    @property
+    def native_value(self):
+        histogram = self.coordinator.api.metrics.histogram(POLL_TEMPLATE, self._metric)
+        value = histogram.percentile(95) if histogram else None
+        return round(value, 2) if value is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        histogram = self.coordinator.api.metrics.histogram(POLL_TEMPLATE, self._metric)
+        attrs = histogram.summary() if histogram else {}
+        attrs["endpoints"] = self.coordinator.api.endpoint_stats()
+        return attrs
+
+
+def build_endpoint_metric_sensors(coordinator, entry) -> list[ApiEndpointMetricSensor]:
+    return [
+        ApiEndpointMetricSensor(
+            coordinator, entry, "api_latency", "network_ms",
+            UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION, "mdi:timer-outline",
+        ),
+        ApiEndpointMetricSensor(
+            coordinator, entry, "api_payload_size", "bytes",
+            UnitOfInformation.BYTES, SensorDeviceClass.DATA_SIZE, "mdi:download-network-outline",
+        ),
+        ApiEndpointMetricSensor(
+            coordinator, entry, "api_decode_time", "decode_ms",
+            UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION, "mdi:code-json",
+        ),
+        ApiEndpointMetricSensor(
+            coordinator, entry, "api_wrap_time", "wrap_ms",
+            UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION, "mdi:cog-transfer-outline",
+        ),
+    ]
@@ -0,0 +1,31 @@
+from homeassistant.components.sensor import SensorEntity, SensorDeviceClass
+from homeassistant.const import UnitOfTime
+
+from .ApiSensor import ApiSensor
+
+class ApiPollIntervalSensor(ApiSensor, SensorEntity):
+    """Запланированный интервал опроса /all-devices (адаптивный по квоте)."""
+
+    _attr_translation_key = "api_poll_interval"
+    _attr_icon = "mdi:timer-sync-outline"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+
+    def __init__(self, coordinator, entry):
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_api_poll_interval"
+
+    @property
+    def native_value(self):
+        interval = self.coordinator.update_interval
+        return round(interval.total_seconds()) if interval else None
+
+    @property
+    def extra_state_attributes(self):
+        scheduler = self.coordinator.scheduler
+        return {
+            "last_poll_cost": scheduler.last_cost,
+            "budget_remaining": scheduler.remaining,
+            "quota_reset_at": scheduler.reset_at.isoformat() if scheduler.reset_at else None,
+            "min_interval": round(scheduler.min_interval.total_seconds()),
+        }
@@ -24,4 +24,6 @@ class ApiRemainingSensor(ApiSensor, SensorEntity):
         return {
             "limit": self._limit,
             "plan": self._plan,
+            # потолок, резерв живого опроса и отказы pre-flight проверки
+            **self.coordinator.api.budget_diagnostics(),
         }
\ No newline at end of file
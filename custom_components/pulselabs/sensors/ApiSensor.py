@@ -1,11 +1,22 @@
 from abc import ABC
 
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import EntityCategory
 
 from ..const import DOMAIN, MANUFACTURER
 
+def api_device_info(entry):
+    """Служебное устройство «Pulse API» записи."""
+    return {
+        "identifiers":{(DOMAIN, f"{entry.entry_id}_api")},
+        "name":"Pulse API",
+        "model": "Cloud API",
+        "manufacturer":MANUFACTURER,
+        "entry_type":DeviceEntryType.SERVICE
+    }
+
 class ApiSensor(CoordinatorEntity, ABC):
     _attr_has_entity_name = True
     _attr_entity_category = EntityCategory.DIAGNOSTIC
@@ -13,10 +24,11 @@ class ApiSensor(CoordinatorEntity, ABC):
     def __init__(self, coordinator, entry):
         super().__init__(coordinator)
 
-        self._attr_device_info = {
-            "identifiers":{(DOMAIN, f"{entry.entry_id}_api")},
-            "name":"Pulse API",
-            "model": "Cloud API",
-            "manufacturer":MANUFACTURER,
-            "entry_type":DeviceEntryType.SERVICE
-        }
\ No newline at end of file
+        self._attr_device_info = api_device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # сигнал приходит на каждом опросе, даже когда данные устройств не менялись
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, self.coordinator.api_signal, self.async_write_ha_state)
+        )
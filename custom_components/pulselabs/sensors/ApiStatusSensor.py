@@ -21,3 +21,13 @@ class ApiStatusSensor(ApiSensor, BinarySensorEntity):
     @property
     def available(self) -> bool:
         return True
+
+    @property
+    def extra_state_attributes(self):
+        # circuit breaker, повторы и (с выделенной сессией) счётчики соединений
+        attrs = self.coordinator.api.transport_diagnostics()
+        if self.coordinator.backfill is not None:
+            attrs = {**attrs, **self.coordinator.backfill.as_dict()}
+        if self.coordinator.events is not None:
+            attrs = {**attrs, **self.coordinator.events.as_dict()}
+        return {**attrs, **self.coordinator.series.as_dict(), **self.coordinator.diagnostics()}
@@ -0,0 +1,64 @@
+from homeassistant.components.binary_sensor import (
+    BinarySensorEntity,
+    BinarySensorDeviceClass,
+)
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .ApiSensor import api_device_info
+from ..events import thresholds_signal
+
+
+class ApiThresholdsSensor(BinarySensorEntity):
+    """Есть ли сработавшие пороги Pulse (/api/triggered-thresholds).
+
+    Не `CoordinatorEntity`: пороги опрашиваются по своему расписанию
+    (PulseEvents), и опросы /all-devices состояние не переписывают.
+    """
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_translation_key = "thresholds_triggered"
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+
+    def __init__(self, coordinator, entry):
+        self.coordinator = coordinator
+        self._attr_unique_id = f"{entry.entry_id}_api_thresholds"
+        self._attr_device_info = api_device_info(entry)
+        self._signal = thresholds_signal(entry.entry_id)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # состояние пишется только когда набор активных порогов изменился
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, self._signal, self.async_write_ha_state)
+        )
+
+    @property
+    def _events(self):
+        return self.coordinator.events
+
+    @property
+    def available(self) -> bool:
+        return self._events is not None and self._events.thresholds_polled
+
+    @property
+    def is_on(self) -> bool | None:
+        if not self.available:
+            return None
+        return bool(self._events.thresholds.ongoing)
+
+    @property
+    def extra_state_attributes(self):
+        if not self.available:
+            return None
+        return {
+            "ongoing": [
+                {
+                    "device": threshold.get("deviceName"),
+                    "type": self._events.threshold_type(threshold),
+                    "value": threshold.get("triggeringValue"),
+                    "since": threshold.get("createdAt"),
+                }
+                for threshold in self._events.thresholds.ongoing
+            ]
+        }
@@ -0,0 +1,30 @@
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.const import PERCENTAGE
+
+from .ApiSensor import ApiSensor
+
+class ApiUnchangedRateSensor(ApiSensor, SensorEntity):
+    """Доля ответов API, совпавших байт‑в‑байт с предыдущим (разбор пропущен)."""
+
+    _attr_translation_key = "api_unchanged_rate"
+    _attr_icon = "mdi:content-duplicate"
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 1
+
+    def __init__(self, coordinator, entry):
+        super().__init__(coordinator, entry)
+        self._attr_unique_id = f"{entry.entry_id}_api_unchanged_rate"
+
+    @property
+    def native_value(self):
+        rate = self.coordinator.api.fingerprint_hit_rate
+        return round(rate * 100, 1) if rate is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        api = self.coordinator.api
+        return {
+            "responses": api.fingerprint_checks,
+            "unchanged": api.fingerprint_hits,
+        }
@@ -5,10 +5,17 @@ from .PulseSensor import PulseSensor
 class PulseBinarySensor(PulseSensor, BinarySensorEntity):
     """Бинарный сенсор Pulse (например, Plugged In)."""
 
+    _unrecorded_attributes = frozenset({"stale"})
+
     def __init__(self, coordinator, entry, description):
         super().__init__(coordinator, entry, description)
 
     @property
     def is_on(self):
         device_data = self.coordinator.data.get(self._section, {}).get(self._device_id, {})
-        return bool(device_data.get(self._data_key))
\ No newline at end of file
+        return bool(device_data.get(self._data_key))
+
+    @property
+    def extra_state_attributes(self):
+        # значение из снимка прошлого запуска, живой опрос ещё не прошёл
+        return {"stale": True} if self.coordinator.stale else None
@@ -2,10 +2,17 @@ from homeassistant.components.sensor import SensorEntity
 
 from .PulseSensor import PulseSensor
 
+from ..const import SERIES_SPARKLINE_POINTS
+
 
 class PulseDataSensor(PulseSensor, SensorEntity):
     """Обычный сенсор данных Pulse (температура, влажность, CO₂ и т.д.)."""
 
+    # скользящие агрегаты меняются каждый опрос — в историю recorder не пишем
+    _unrecorded_attributes = frozenset(
+        {"min", "max", "mean", "rate_per_hour", "samples", "span_minutes", "sparkline", "stale"}
+    )
+
     def __init__(self, coordinator, entry, description):
        super().__init__(coordinator, entry, description)
     
@@ -14,3 +21,16 @@ class PulseDataSensor(PulseSensor, SensorEntity):
         device_data = self.coordinator.data.get(self._section, {}).get(self._device_id, {})
         val = device_data.get(self._data_key)
         return round(val, 2) if isinstance(val, float) else val
+
+    def _series(self):
+        """Кольцевой буфер недавних значений этого сенсора (см. series.py)."""
+        return self.coordinator.series.get(self._section, self._device_id, self._data_key)
+
+    @property
+    def extra_state_attributes(self):
+        series = self._series()
+        attrs = series.summary(SERIES_SPARKLINE_POINTS) if series is not None else {}
+        if self.coordinator.stale:
+            # значение из снимка прошлого запуска, живой опрос ещё не прошёл
+            attrs["stale"] = True
+        return attrs or None
@@ -39,12 +39,19 @@ class PulseHubConnectedSensor(PulseDataSensor):
         val = device_data.get("value")
         return round(val, 2) if isinstance(val, float) else val
 
+    def _series(self):
+        return self.coordinator.series.get(self._section, self._data_key, "value")
+
+    def _change_key(self) -> tuple[str, str, str]:
+        return (self._section, self._data_key, "value")
+
     @property
     def extra_state_attributes(self):
         return {
             "name": self._sensor_name,
             "type": self._sensor_type_name,
-            "property": self._sensor_value_name
+            "property": self._sensor_value_name,
+            **(super().extra_state_attributes or {}),
         }
 
     
\ No newline at end of file
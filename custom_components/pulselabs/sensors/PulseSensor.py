@@ -1,4 +1,5 @@
 from abc import ABC
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.components.sensor import SensorEntityDescription
@@ -47,6 +48,16 @@ class PulseSensor(CoordinatorEntity, ABC):
         if description.state_class is not None:
             self._attr_state_class = description.state_class
 
+    def _change_key(self) -> tuple[str, str, str]:
+        """(раздел, id, ключ) значения сенсора в данных координатора (см. changes.py)."""
+        return (self._section, self._device_id, self._data_key)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # значение не изменилось — состояние не переписываем
+        if self.coordinator.entity_changed(self._change_key()):
+            super()._handle_coordinator_update()
+
     def _get_unique_id(self, entry: ConfigEntry) -> str:
         """Возвращает уникальный ID сенсора. Переопределяется в наследниках."""
         raise NotImplementedError
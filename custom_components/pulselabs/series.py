@@ -0,0 +1,219 @@
+"""
+custom_components.pulselabs.series
+----------------------------------
+Недавние значения каждой метрики в кольцевых буферах фиксированного размера.
+
+Координатор на каждом опросе заменяет снимок `data` целиком, и min/max,
+среднее или скорость изменения за последние часы пришлось бы брать из БД
+recorder или дополнительными вызовами API. `SeriesStore` хранит для каждой
+пары (раздел, ключ сущности) `RingBuffer` — два `array('d')` (время и
+значение) ёмкостью `capacity`, выделенных один раз. Память одной серии —
+`16 × capacity` байт независимо от числа опросов, так что сотни серий
+занимают предсказуемые единицы мегабайт.
+
+`RingBuffer.summary()` отдаёт скользящие агрегаты и `sparkline` — ряд,
+прореженный до нескольких десятков точек, вместо `lastHourData`, который
+`/all-devices` часто не присылает.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Set, Tuple
+
+from .history import parse_created_at
+
+
+def _is_number(value: Any) -> bool:
+    # bool — подкласс int, но это не измерение
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class RingBuffer:
+    """Последние `capacity` пар (время, значение) в двух `array('d')`."""
+
+    __slots__ = ("capacity", "_times", "_values", "_head", "_size")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._head = 0          # куда пишется следующая точка
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return (len(self._times) + len(self._values)) * self._times.itemsize
+
+    @property
+    def last_time(self) -> float | None:
+        return self._times[self._head - 1] if self._size else None
+
+    def push(self, moment: float, value: float) -> bool:
+        """Добавляет точку; повтор того же или более раннего момента пропускается."""
+        last = self.last_time
+        if last is not None and moment <= last:
+            return False
+        self._times[self._head] = moment
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return True
+
+    def merge(self, points: Iterable[Tuple[float, float]]) -> int:
+        """Вставляет более ранние точки (догрузка после простоя).
+
+        `push` принимает только новые моменты, а пропущенные точки приходят,
+        когда живые уже записаны. Буфер пересобирается по времени один раз —
+        O(capacity); при совпадении момента остаётся уже записанное значение.
+        Возвращает число новых моментов.
+        """
+        existing = dict(self.items())
+        added = {moment: value for moment, value in points if moment not in existing}
+        if not added:
+            return 0
+        self._head = self._size = 0
+        for moment, value in sorted({**existing, **added}.items())[-self.capacity:]:
+            self.push(moment, value)
+        return len(added)
+
+    def _order(self) -> Iterator[int]:
+        start = (self._head - self._size) % self.capacity
+        return ((start + i) % self.capacity for i in range(self._size))
+
+    def items(self) -> List[Tuple[float, float]]:
+        """Точки от старой к новой."""
+        return [(self._times[i], self._values[i]) for i in self._order()]
+
+    def values(self) -> List[float]:
+        return [self._values[i] for i in self._order()]
+
+    def rate_per_hour(self) -> float | None:
+        """Наклон МНК‑прямой, единиц в час (устойчивее разности крайних точек)."""
+        if self._size < 2:
+            return None
+        points = self.items()
+        t0 = points[0][0]
+        n = len(points)
+        mean_t = sum(t - t0 for t, _ in points) / n
+        mean_v = sum(v for _, v in points) / n
+        var = sum((t - t0 - mean_t) ** 2 for t, _ in points)
+        if var == 0:
+            return None
+        cov = sum((t - t0 - mean_t) * (v - mean_v) for t, v in points)
+        return cov / var * 3600
+
+    def sparkline(self, points: int) -> List[float]:
+        """Ряд, прореженный до `points` средних по равным отрезкам буфера."""
+        values = self.values()
+        if len(values) <= points:
+            return values
+        step = len(values) / points
+        line = []
+        for i in range(points):
+            chunk = values[int(i * step):int((i + 1) * step)]
+            line.append(sum(chunk) / len(chunk))
+        return line
+
+    def summary(self, sparkline_points: int, precision: int = 2) -> Dict[str, Any]:
+        """Скользящие агрегаты по всему буферу; пустой буфер — пустой dict."""
+        if not self._size:
+            return {}
+        values = self.values()
+        rate = self.rate_per_hour()
+        return {
+            "min": round(min(values), precision),
+            "max": round(max(values), precision),
+            "mean": round(sum(values) / len(values), precision),
+            "rate_per_hour": round(rate, precision) if rate is not None else None,
+            "samples": len(values),
+            "span_minutes": round((self.last_time - self._times[(self._head - self._size) % self.capacity]) / 60),
+            "sparkline": [round(v, precision) for v in self.sparkline(sparkline_points)],
+        }
+
+
+class SeriesStore:
+    """`RingBuffer` на каждую метрику снимка координатора.
+
+    `keys` — какие поля раздела снимка (`devices` / `hubs` / `sensors`)
+    считаются измерениями; остальное (id, смещения, флаги) не хранится.
+    `merged_only` — поля, история которых приходит своими моментами только
+    через `merge` (полосы спектра по замерам Pro): в снимке опроса их значение
+    повторяется с моментом опроса, и `observe` его не пишет.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        keys: Mapping[str, Iterable[str]],
+        merged_only: Mapping[str, Iterable[str]] | None = None,
+    ) -> None:
+        self.capacity = capacity
+        self._keys = {section: frozenset(section_keys) for section, section_keys in keys.items()}
+        self._observed = {
+            section: section_keys - frozenset((merged_only or {}).get(section, ()))
+            for section, section_keys in self._keys.items()
+        }
+        self._series: Dict[Tuple[str, str, str], RingBuffer] = {}
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self._series.values())
+
+    def get(self, section: str, item_id: str, key: str) -> RingBuffer | None:
+        return self._series.get((section, item_id, key))
+
+    def merge(self, section: str, item_id: str, points: Iterable[Tuple[float, Mapping[str, Any]]]) -> int:
+        """Досыпает в серии одного элемента пропущенные точки (моменты и снимки)."""
+        keys = self._keys.get(section, frozenset())
+        per_key: Dict[str, List[Tuple[float, float]]] = {}
+        for moment, item in points:
+            for key in keys & item.keys():
+                if _is_number(item[key]):
+                    per_key.setdefault(key, []).append((moment, item[key]))
+        added = 0
+        for key, series_points in per_key.items():
+            buffer = self._series.get((section, item_id, key))
+            if buffer is None:
+                buffer = self._series[(section, item_id, key)] = RingBuffer(self.capacity)
+            added += buffer.merge(series_points)
+        return added
+
+    def observe(self, data: Mapping[str, Mapping[str, dict]], now: float) -> Set[Tuple[str, str, str]]:
+        """Кладёт в буферы измерения снимка `_async_poll_all_devices`.
+
+        Время точки — `createdAt` измерения, а без него `now`; повтор того же
+        измерения (данные не обновились между опросами) не добавляется.
+        Возвращает (раздел, id, ключ) серий, получивших точку: их агрегаты
+        в атрибутах сущностей сменились, даже если само значение то же.
+        """
+        pushed: Set[Tuple[str, str, str]] = set()
+        for section, keys in self._observed.items():
+            for item_id, item in data.get(section, {}).items():
+                created = parse_created_at(item.get("createdAt"))
+                moment = created.timestamp() if created is not None else now
+                for key in keys & item.keys():
+                    value = item[key]
+                    if not _is_number(value):
+                        continue
+                    buffer = self._series.get((section, item_id, key))
+                    if buffer is None:
+                        buffer = self._series[(section, item_id, key)] = RingBuffer(self.capacity)
+                    if buffer.push(moment, value):
+                        pushed.add((section, item_id, key))
+        return pushed
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "series_count": len(self),
+            "series_capacity": self.capacity,
+            "series_memory_bytes": self.nbytes,
+        }
@@ -0,0 +1,74 @@
+"""Сервисы Pulse Labs."""
+from __future__ import annotations
+
+import math
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+SERVICE_ESTIMATE_COST = "estimate_cost"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_PATH = "path"
+ATTR_START = "start"
+ATTR_END = "end"
+
+ESTIMATE_COST_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Required(ATTR_PATH): vol.All(cv.string, vol.Match(r"^/")),
+    vol.Optional(ATTR_START): cv.datetime,
+    vol.Optional(ATTR_END): cv.datetime,
+})
+
+
+def _get_coordinator(hass: HomeAssistant, call: ServiceCall):
+    """Координатор записи из вызова; если запись одна — её можно не указывать."""
+    coordinators = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is None and len(coordinators) == 1:
+        return next(iter(coordinators.values()))
+    if entry_id not in coordinators:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="entry_not_found",
+        )
+    return coordinators[entry_id]
+
+
+async def _async_estimate_cost(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    coordinator = _get_coordinator(hass, call)
+
+    params = {}
+    if ATTR_START in call.data:
+        start = dt_util.as_local(call.data[ATTR_START])
+        end = dt_util.as_local(call.data.get(ATTR_END) or dt_util.now())
+        params = {"start": start, "end": end}
+
+    estimate = coordinator.api.explain_cost(call.data[ATTR_PATH], params)
+
+    # сколько суток квоты займёт такой запрос при текущем потолке бюджета
+    limit = coordinator.scheduler.limit
+    estimate["daily_limit"] = limit
+    estimate["days_of_quota"] = math.ceil(estimate["datapoints"] / limit) if limit else None
+    return estimate
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Регистрирует сервисы интеграции (один раз, не на каждую запись)."""
+
+    async def estimate_cost(call: ServiceCall) -> ServiceResponse:
+        return await _async_estimate_cost(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ESTIMATE_COST,
+        estimate_cost,
+        schema=ESTIMATE_COST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
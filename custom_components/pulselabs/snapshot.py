@@ -0,0 +1,52 @@
+"""
+custom_components.pulselabs.snapshot
+------------------------------------
+Снимок последнего нормализованного результата координатора.
+
+Без снимка `async_setup_entry` ждёт живой `/all-devices`: загрузка HA
+медленнее на сетевой цикл, каждый перезапуск тратит datapoints, а при
+недоступном облаке запись не поднимается вовсе. Координатор сохраняет
+результат опроса в `Store` записи (`pack`), а при старте сущности строятся
+из снимка сразу (`unpack`) и помечаются устаревшими до первого живого
+опроса, который идёт в фоне.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Mapping, Tuple
+
+from .history import parse_created_at
+
+# разделы результата `_async_poll_all_devices`
+SECTIONS = ("devices", "hubs", "sensors")
+
+
+def pack(data: Mapping[str, Mapping[str, dict]], saved_at: datetime) -> Dict[str, Any]:
+    """Снимок для `Store`: разделы результата как есть.
+
+    None не отбрасываются: сущности хабов создаются по наличию ключа
+    (`key in hub`), так что без них снимок поднял бы меньше сущностей, чем
+    живой опрос.
+    """
+    return {
+        "saved_at": saved_at.isoformat(),
+        "data": {section: dict(data.get(section, {})) for section in SECTIONS},
+    }
+
+
+def unpack(
+    payload: Mapping[str, Any] | None, now: datetime, max_age: timedelta
+) -> Tuple[Dict[str, Dict[str, dict]], datetime] | None:
+    """(data, saved_at) из сохранённого снимка; нет, битый или слишком старый — None."""
+    if not payload:
+        return None
+    saved_at = parse_created_at(payload.get("saved_at"))
+    data = payload.get("data")
+    if saved_at is None or not isinstance(data, dict) or now - saved_at > max_age:
+        return None
+    if not any(data.get(section) for section in SECTIONS):
+        return None
+    return {section: dict(data.get(section) or {}) for section in SECTIONS}, saved_at
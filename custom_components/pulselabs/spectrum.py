@@ -0,0 +1,142 @@
+"""
+custom_components.pulselabs.spectrum
+------------------------------------
+Интегралы PPFD по спектральным полосам из замеров Pulse Pro.
+
+Из `spectrum` замера (`ProLightReadingDto`) считаются доли полос синего
+(400–500 нм), зелёного (500–600), красного (600–700) и дальнего красного
+(700–750) света, отношение R:FR и PPFD, взвешенный кривой относительной
+квантовой эффективности McCree (YPF). Абсолютная шкала спектра прибора не
+документирована, поэтому доли нормируются на PAR (400–700 нм) того же
+спектра и умножаются на `ppfd` замера — результат в µmol/m²/s.
+
+Спектр считается равномерной сеткой `SPECTRUM_NM` (первая и последняя
+точки — границы диапазона). Для длины спектра один раз строятся векторы
+весов полос (`band_weights`), и интеграл полосы — скалярное произведение
+спектра на вектор весов.
+
+`band_integrals_batch()` считает весь пакет замеров одним матричным
+произведением в NumPy (обычно стоит вместе с Home Assistant); без NumPy — тем же
+алгоритмом в циклах Python (`band_integrals`).
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - без NumPy считаем в циклах
+    np = None
+
+# диапазон сетки спектра прибора, нм
+SPECTRUM_NM = (380.0, 780.0)
+
+PAR_BAND = (400.0, 700.0)
+BANDS = {
+    "ppfd_blue": (400.0, 500.0),
+    "ppfd_green": (500.0, 600.0),
+    "ppfd_red": (600.0, 700.0),
+    "ppfd_far_red": (700.0, 750.0),
+}
+
+# относительная квантовая эффективность фотосинтеза (McCree, 1972;
+# усреднённая кривая, узлы через 20–25 нм, между ними — линейно)
+_RQE = (
+    (360.0, 0.35), (380.0, 0.50), (400.0, 0.62), (425.0, 0.69), (450.0, 0.71),
+    (475.0, 0.67), (500.0, 0.66), (525.0, 0.72), (550.0, 0.79), (575.0, 0.86),
+    (600.0, 0.95), (625.0, 1.00), (650.0, 0.97), (675.0, 0.95), (700.0, 0.55),
+    (725.0, 0.15), (750.0, 0.03), (760.0, 0.0),
+)
+
+# ключи результата — они же ключи сенсоров в DEVICE_SENSOR_MAP
+KEYS = (*BANDS, "r_fr_ratio", "ypf_ppfd")
+
+
+def _rqe(nm: float) -> float:
+    if nm <= _RQE[0][0] or nm >= _RQE[-1][0]:
+        return 0.0
+    for (x0, y0), (x1, y1) in zip(_RQE, _RQE[1:]):
+        if x0 <= nm <= x1:
+            return y0 + (y1 - y0) * (nm - x0) / (x1 - x0)
+    return 0.0
+
+
+def wavelengths(length: int) -> List[float]:
+    start, end = SPECTRUM_NM
+    step = (end - start) / (length - 1)
+    return [start + i * step for i in range(length)]
+
+
+@lru_cache(maxsize=8)
+def band_weights(length: int) -> Tuple[Tuple[str, Tuple[float, ...]], ...]:
+    """Веса полос, PAR и YPF на сетке из `length` точек.
+
+    Вес точки — часть её ячейки [x − шаг/2, x + шаг/2] внутри полосы:
+    соседние полосы делят граничную точку, а не считают её дважды.
+    """
+    nm = wavelengths(length)
+    step = nm[1] - nm[0]
+    start, end = SPECTRUM_NM
+
+    def mask(low: float, high: float) -> Tuple[float, ...]:
+        return tuple(
+            max(0.0, min(x + step / 2, end, high) - max(x - step / 2, start, low)) for x in nm
+        )
+
+    weights = [(key, mask(*band)) for key, band in BANDS.items()]
+    weights.append(("par", mask(*PAR_BAND)))
+    weights.append(("ypf", tuple(w * _rqe(x) for x, w in zip(nm, mask(start, end)))))
+    return tuple(weights)
+
+
+def _finish(ppfd: float, integrals: Dict[str, float]) -> Dict[str, float | None]:
+    """Интегралы спектра → µmol/m²/s через ppfd замера и отношение R:FR."""
+    par = integrals.pop("par")
+    if not par or ppfd != ppfd:   # нет PAR в спектре или ppfd — NaN
+        return {key: None for key in KEYS}
+    scale = ppfd / par
+    result: Dict[str, float | None] = {key: round(value * scale, 2) for key, value in integrals.items()}
+    result["ypf_ppfd"] = result.pop("ypf")
+    far_red = integrals["ppfd_far_red"]
+    result["r_fr_ratio"] = round(integrals["ppfd_red"] / far_red, 3) if far_red else None
+    return result
+
+
+def band_integrals(ppfd: float, spectrum: Sequence[float]) -> Dict[str, float | None]:
+    """Полосы одного замера, циклами Python."""
+    if len(spectrum) < 2:
+        return {key: None for key in KEYS}
+    integrals = {
+        key: sum(value * weight for value, weight in zip(spectrum, weights))
+        for key, weights in band_weights(len(spectrum))
+    }
+    return _finish(ppfd, integrals)
+
+
+def band_integrals_batch(readings: Sequence[Tuple[float, Sequence[float]]]) -> List[Dict[str, Any]]:
+    """Полосы пакета замеров (ppfd, spectrum) одним проходом.
+
+    С NumPy замеры одной длины спектра складываются в матрицу N×L и
+    умножаются на матрицу весов L×B; без NumPy — `band_integrals` по очереди.
+    """
+    if np is None:
+        return [band_integrals(ppfd, spectrum) for ppfd, spectrum in readings]
+
+    results: List[Dict[str, Any]] = [{key: None for key in KEYS} for _ in readings]
+    by_length: Dict[int, List[int]] = {}
+    for index, (_, spectrum) in enumerate(readings):
+        if len(spectrum) >= 2:
+            by_length.setdefault(len(spectrum), []).append(index)
+
+    for length, indexes in by_length.items():
+        names = [key for key, _ in band_weights(length)]
+        weights = np.array([w for _, w in band_weights(length)]).T          # L × B
+        spectra = np.array([readings[i][1] for i in indexes], dtype=float)   # N × L
+        integrals = spectra @ weights                                         # N × B
+        for row, index in zip(integrals.tolist(), indexes):
+            results[index] = _finish(readings[index][0], dict(zip(names, row)))
+    return results
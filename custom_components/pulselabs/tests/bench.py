@@ -0,0 +1,119 @@
+# tests/bench.py
+"""Замеры времени для ручного запуска; pytest этот файл не собирает.
+
+    python custom_components/pulselabs/tests/bench.py [имя ...]
+
+Без аргументов выполняются все замеры. Проверок здесь нет: время зависит от
+машины, а корректность быстрых путей проверяют обычные тесты.
+"""
+
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# tests/ → pulselabs/ → custom_components/ → config/  (3 уровня вверх)
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from custom_components.pulselabs import spectrum  # noqa: E402
+from custom_components.pulselabs.dp_schema import (  # noqa: E402
+    _count_by_pointers,
+    get_dp_schema_map,
+    load_dp_schema_map,
+)
+from custom_components.pulselabs.fastjson import DECODER_NAME, json_loads  # noqa: E402
+from custom_components.pulselabs.tests.test_fastjson import (  # noqa: E402
+    _aiohttp_default,
+    _all_devices_body,
+    _devices_range_body,
+)
+
+
+def _best_ms(func, *args, repeat=5) -> float:
+    """Лучшее из `repeat` время вызова, мс."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def bench_spectrum() -> None:
+    """Полосы спектра 1000 замеров Pro: NumPy против цикла Python."""
+    length = 401
+    rnd = random.Random(7)
+    readings = [(rnd.uniform(100, 1200), [rnd.random() for _ in range(length)]) for _ in range(1000)]
+    spectrum.band_integrals_batch(readings[:2])            # веса для длины — в кэш
+
+    vectorized = _best_ms(spectrum.band_integrals_batch, readings) if spectrum.np is not None else None
+    numpy, spectrum.np = spectrum.np, None
+    try:
+        python_loop = _best_ms(spectrum.band_integrals_batch, readings)
+    finally:
+        spectrum.np = numpy
+    shown = f"{vectorized:.1f} ms" if vectorized is not None else "нет numpy"
+    print(f"spectrum: 1000 readings × {length} points: numpy {shown}, python {python_loop:.1f} ms")
+
+
+def bench_dp_counter() -> None:
+    """100k точек /devices/range: сгенерированный счётчик против интерпретатора."""
+    entry = next(e for e in get_dp_schema_map() if e.path == "/devices/range")
+    payload = [{"deviceId": i % 7, "temperatureF": 70.0 + i % 10} for i in range(100_000)]
+
+    compiled = _best_ms(entry.count, payload)
+    interpreted = _best_ms(_count_by_pointers, payload, entry.pointers)
+    print(
+        f"dp_counter: 100k points: compiled {compiled * 10:.1f} µs/1k, "
+        f"interpreted {interpreted * 10:.1f} µs/1k"
+    )
+
+
+def bench_dp_schema() -> None:
+    """Карта счётчиков: обход swagger при холодном старте против чтения артефакта."""
+    with tempfile.TemporaryDirectory() as tmp:
+        missing = Path(tmp) / "dp_schema_map.json"
+
+        def cold() -> None:
+            missing.unlink(missing_ok=True)
+            load_dp_schema_map(cache_file=missing)
+
+        print(
+            f"dp_schema: swagger build {_best_ms(cold):.1f} ms, "
+            f"cache load {_best_ms(load_dp_schema_map):.1f} ms"
+        )
+
+
+def _peak_kib(func, *args) -> float:
+    """Пик памяти, выделенной Python за вызов, КиБ."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def bench_fastjson() -> None:
+    """Разбор тел /all-devices и /devices/range: быстрый декодер против `resp.json()`."""
+    for name, body in (("all-devices", _all_devices_body()), ("devices-range", _devices_range_body())):
+        print(
+            f"fastjson: {name} {len(body) / 1024:.0f} KiB: "
+            f"{DECODER_NAME} {_best_ms(json_loads, body):.1f} ms / {_peak_kib(json_loads, body):.0f} KiB, "
+            f"resp.json() {_best_ms(_aiohttp_default, body):.1f} ms / {_peak_kib(_aiohttp_default, body):.0f} KiB"
+        )
+
+
+BENCHES = {
+    "spectrum": bench_spectrum,
+    "dp_counter": bench_dp_counter,
+    "dp_schema": bench_dp_schema,
+    "fastjson": bench_fastjson,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHES:
+        BENCHES[name]()
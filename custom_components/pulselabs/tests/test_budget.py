@@ -0,0 +1,157 @@
+# tests/test_budget.py
+"""Предварительная оценка стоимости и бюджетный gate перед вызовами API."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.pulselabs.api import _range_query
+from custom_components.pulselabs.budget import BudgetExceededError, BudgetGate, CostEstimator, parse_range
+from custom_components.pulselabs.mock_api import MockPulseApi
+
+START = datetime(2025, 7, 18, 0, 0)
+
+
+def _all_devices(devices=3, hour_points=4):
+    return {
+        "deviceViewDtos": [
+            {"mostRecentDataPoint": {}, "lastHourData": [{}] * hour_points} for _ in range(devices)
+        ],
+        "universalSensorViews": [{}, {}],
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+def test_estimate_range_scales_with_span_and_devices():
+    est = CostEstimator(sample_interval=60)
+    est.observe("/all-devices", _all_devices(devices=3), 17)
+
+    hour = _range_query(START, START + timedelta(hours=1))
+    assert est.estimate(f"/devices/range{hour}") == 60 * 3
+    assert est.estimate(f"/devices/42/data-range{hour}") == 60
+    # датапоинты хаба не countable → вызов стоит 1
+    assert est.estimate(f"/sensors/7/data-range{hour}") == 1
+
+
+def test_estimate_uses_observed_cost_per_template():
+    est = CostEstimator()
+    assert est.estimate("/all-devices") == 1          # пока ничего не знаем
+    est.observe("/all-devices", _all_devices(), 15)
+    assert est.estimate("/all-devices") == 15
+    assert est.estimate("/devices/9/recent-data") == 1
+    assert est.estimate("/no/such/path") == 1
+
+
+def test_gate_keeps_reserve_for_priority_calls():
+    gate = BudgetGate(ceiling=100, reserve=20)
+    assert gate.available(used=50) == 30
+    assert gate.available(used=50, priority=True) == 50
+
+    with pytest.raises(BudgetExceededError) as err:
+        gate.acquire("/x", 40, used=50)
+    assert err.value.available == 30
+    assert gate.refused == 1
+
+    assert gate.acquire("/x", 40, used=50, priority=True) == 40
+    assert gate.available(used=50, priority=True) == 10   # токены в резерве до списания
+    gate.release(40)
+    assert gate.pending == 0
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+@pytest.mark.asyncio
+async def test_expensive_call_refused_before_sending():
+    api = MockPulseApi()
+    api.set_budget_gate(BudgetGate(ceiling=1000, reserve=100))
+    api._responses["/all-devices"] = _all_devices(devices=5)   # pylint: disable=protected-access
+    await api.async_get_all_devices()
+    used = api.datapoints_today
+
+    # неделя по 5 устройствам ≈ 50k datapoints — не отправляем
+    week = _range_query(START, START + timedelta(days=7))
+    with pytest.raises(BudgetExceededError):
+        async for _ in api.async_iter_devices_range(START, START + timedelta(days=7)):
+            pass
+    with pytest.raises(BudgetExceededError):
+        await api.async_get(f"/devices/range{week}")
+    assert api.datapoints_today == used
+    assert api.budget.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_live_poll_may_use_reserve():
+    api = MockPulseApi()
+    api.set_budget_gate(BudgetGate(ceiling=100, reserve=50))
+    api._responses["/all-devices"] = _all_devices(devices=2, hour_points=0)   # pylint: disable=protected-access
+    api.datapoints_today = 60
+
+    with pytest.raises(BudgetExceededError):
+        await api.async_get("/users")             # разовый вызов в резерв не лезет
+    await api.async_get_all_devices()             # живой опрос — можно
+    assert api.datapoints_today == 62
+    assert api.budget_diagnostics()["budget_refused"] == 1
+
+
+@pytest.mark.asyncio
+async def test_all_devices_cost_survives_other_calls():
+    """Интервал опроса считается по стоимости /all-devices, а не последнего вызова."""
+    api = MockPulseApi()
+    api._responses["/all-devices"] = _all_devices(devices=2, hour_points=6)   # pylint: disable=protected-access
+    await api.async_get_all_devices()
+    poll_cost = api.last_call_cost
+
+    api._responses["/users"] = {}   # pylint: disable=protected-access
+    await api.async_get("/users")
+    assert api.last_call_cost == 1
+    assert api.estimator.estimate("/all-devices") == poll_cost > 1
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+def _device(dev_id, step_minutes, points=6):
+    return {
+        "id": dev_id,
+        "mostRecentDataPoint": {},
+        "lastHourData": [
+            {"createdAt": f"2025-07-18T10:{m * step_minutes:02d}:00"} for m in range(points)
+        ],
+    }
+
+
+def test_estimate_uses_observed_sampling_interval_per_device():
+    est = CostEstimator()
+    est.observe("/all-devices", {"deviceViewDtos": [_device(1, 1), _device(2, 10)]}, 14)
+    assert est.sample_intervals == {"1": 60.0, "2": 600.0}
+
+    day = _range_query(START, START + timedelta(days=1))
+    assert est.estimate(f"/devices/1/data-range{day}") == 1440
+    assert est.estimate(f"/devices/2/data-range{day}") == 144
+    # неизвестное устройство — по медиане аккаунта
+    assert est.estimate(f"/devices/3/data-range{day}") == 262
+    assert est.estimate(f"/devices/range{day}") == 1440 + 144
+
+
+def test_api_estimate_cost_with_params():
+    api = MockPulseApi()
+    api.set_budget_gate(BudgetGate(ceiling=4800, reserve=480))
+    api.estimator.observe("/all-devices", {"deviceViewDtos": [_device(1, 5)]}, 7)
+    params = {"start": START, "end": START + timedelta(hours=2)}
+
+    assert api.estimate_cost("/devices/1/data-range", params) == 24
+    details = api.explain_cost("/devices/range", params)
+    assert details["template"] == "/devices/range"
+    assert details["datapoints"] == 24
+    assert details["sample_interval"] == 300.0
+    assert details["fits_today"] is True
+    assert api.datapoints_today == 0            # оценка ничего не списывает
+
+
+def test_parse_range_normalizes_bounds_to_utc():
+    aware = START.replace(tzinfo=timezone.utc)
+    # «+» смещения в сырой query, смесь aware и naive границ
+    path = "/devices/range?start=2025-07-18T00:00:00+00:00&end=2025-07-18T02:00:00"
+    assert parse_range(path) == (aware, aware + timedelta(hours=2))
+    assert parse_range("/devices/range?start=2025-07-18T00:00:00%2B02:00&end=x") is None
+
+    est = CostEstimator(sample_interval=60)
+    est.observe("/all-devices", _all_devices(devices=1), 5)
+    assert est.estimate(path) == 120
@@ -0,0 +1,132 @@
+# tests/test_changes.py
+"""Набор изменений между снимками и пропуск записей неизменных сущностей."""
+
+import copy
+
+import pytest
+
+from custom_components.pulselabs.changes import WriteStats, changed_keys
+from custom_components.pulselabs.series import SeriesStore
+
+DEVICE_KEYS = ("temperatureF", "humidityRh", "vpd", "co2", "signalStrength")
+
+
+def _account(devices=100):
+    """Аккаунт на 500 сущностей: 100 приборов × 5 метрик."""
+    return {
+        "devices": {
+            str(i): {"id": i, "name": f"Tent {i}", "createdAt": "2025-07-18T10:00:00",
+                     **{key: 20.0 + n for n, key in enumerate(DEVICE_KEYS)}}
+            for i in range(devices)
+        },
+        "hubs": {},
+        "sensors": {},
+    }
+
+
+def test_unchanged_snapshot_has_no_changes():
+    assert changed_keys(_account(), _account()) == set()
+
+
+def test_changed_added_and_removed_keys():
+    old, new = _account(2), _account(2)
+    new["devices"]["0"]["vpd"] = 1.5
+    new["devices"]["0"]["dli_calculated"] = 3.0
+    del new["devices"]["1"]
+    new["sensors"]["7_ph"] = {"value": 6.1}
+
+    changes = changed_keys(old, new)
+    assert ("devices", "0", "vpd") in changes
+    assert ("devices", "0", "dli_calculated") in changes
+    assert {("devices", "1", key) for key in DEVICE_KEYS} <= changes
+    assert ("sensors", "7_ph", "value") in changes
+    assert ("devices", "0", "co2") not in changes
+
+
+class _Entry:
+    entry_id = "entry"
+
+
+def _coordinator(previous, current, success=True):
+    """Координатор без hass: для решения о записи нужны только набор изменений и статус опроса.
+
+    Набор изменений собирается как в `_async_poll_all_devices`: изменившиеся
+    значения плюс серии, получившие точку (их атрибуты-агрегаты сменились).
+    """
+    from custom_components.pulselabs.coordinator import PulseDeviceCoordinator
+
+    coordinator = object.__new__(PulseDeviceCoordinator)
+    coordinator.series = SeriesStore(60, {"devices": DEVICE_KEYS})
+    coordinator.series.observe(previous, 0.0)
+    pushed = coordinator.series.observe(current, 60.0)
+    coordinator._changes = changed_keys(previous, current) | pushed   # pylint: disable=protected-access
+    coordinator.last_update_success = success
+    coordinator.write_stats = WriteStats()
+    coordinator.data = current
+    return coordinator
+
+
+def _entities(coordinator):
+    from custom_components.pulselabs.const import DEVICE_SENSOR_MAP
+    from custom_components.pulselabs.sensors.PulseDeviceSensor import PulseDeviceSensor
+
+    entities = [
+        PulseDeviceSensor(coordinator, _Entry(), device, DEVICE_SENSOR_MAP[key])
+        for device in coordinator.data["devices"].values()
+        for key in DEVICE_KEYS
+    ]
+    writes = []
+    for entity in entities:
+        entity.async_write_ha_state = lambda entity=entity: writes.append(entity)
+    return entities, writes
+
+
+def test_500_entities_write_only_changed_values():
+    pytest.importorskip("homeassistant.helpers.update_coordinator")
+    old = _account()
+    new = copy.deepcopy(old)
+    # новое измерение пришло у 10 приборов, у остальных снимок тот же
+    for i in range(10):
+        new["devices"][str(i)]["createdAt"] = "2025-07-18T10:05:00"
+        new["devices"][str(i)]["temperatureF"] += 0.5
+
+    coordinator = _coordinator(old, new)
+    entities, writes = _entities(coordinator)
+    assert len(entities) == 500
+    for entity in entities:
+        entity._handle_coordinator_update()   # pylint: disable=protected-access
+
+    # у нового измерения меняются агрегаты всех метрик прибора, не только температура
+    assert sorted(entity.unique_id for entity in writes) == sorted(
+        f"entry_device_{i}_{key}" for i in range(10) for key in DEVICE_KEYS
+    )
+    assert coordinator.write_stats.as_dict() == {
+        "entity_writes": 50, "entity_writes_skipped": 450, "entity_skipped_write_ratio": 0.9,
+    }
+
+
+def test_new_measurement_with_same_values_rewrites_attributes():
+    pytest.importorskip("homeassistant.helpers.update_coordinator")
+    old = _account()
+    new = copy.deepcopy(old)
+    for device in new["devices"].values():
+        device["createdAt"] = "2025-07-18T10:05:00"
+
+    coordinator = _coordinator(old, new)
+    entities, writes = _entities(coordinator)
+    for entity in entities:
+        entity._handle_coordinator_update()   # pylint: disable=protected-access
+    assert len(writes) == 500
+
+
+def test_failed_refresh_writes_every_entity():
+    pytest.importorskip("homeassistant.helpers.update_coordinator")
+    coordinator = _coordinator(_account(), _account(), success=False)
+    entities, writes = _entities(coordinator)
+    for entity in entities:
+        entity._handle_coordinator_update()   # pylint: disable=protected-access
+    assert len(writes) == 500
+
+
+def test_ratio_empty():
+    assert WriteStats().skipped_ratio is None
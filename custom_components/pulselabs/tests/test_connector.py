@@ -0,0 +1,59 @@
+# tests/test_connector.py
+"""Выделенная сессия: переиспользование соединений и счётчики трафика."""
+
+import gzip
+import json
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.pulselabs.api import PulseApi
+from custom_components.pulselabs.connector import create_session
+
+BODY = json.dumps([{"deviceId": 1, "temperatureF": 70.0 + i / 10} for i in range(2000)]).encode()
+
+
+@pytest_asyncio.fixture
+async def cloud():
+    seen = {}
+
+    async def handler(request):
+        seen["accept_encoding"] = request.headers.get("Accept-Encoding", "")
+        return web.Response(
+            body=gzip.compress(BODY),
+            headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+        )
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    server = TestServer(app)
+    await server.start_server()
+    seen["url"] = str(server.make_url("")).rstrip("/")
+    yield seen
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_dedicated_session_reuses_connection_and_counts_wire_bytes(cloud):
+    session, stats = create_session()
+    try:
+        api = PulseApi(session, "key", base_url=cloud["url"], connection_stats=stats)
+        first = await api.async_get("/devices/1/data-range?a=1")
+        await api.async_get("/devices/1/data-range?a=2")
+    finally:
+        await session.close()
+
+    assert len(first) == 2000
+    assert "gzip" in cloud["accept_encoding"]
+    assert stats.new_connections == 1
+    assert stats.reused_connections == 1
+    assert stats.tls_handshakes == 0                  # http без TLS
+    assert stats.bytes_sent > 0
+    # считаются сжатые байты «по проводу», а не распакованное тело
+    assert 0 < stats.bytes_received < len(BODY)
+
+    diagnostics = api.transport_diagnostics()
+    assert diagnostics["connection_reuse_rate"] == 0.5
+    assert diagnostics["breaker_state"] == "closed"
@@ -81,3 +81,61 @@ async def test_unknown_endpoint_fallback(api):
 
     await api.async_get("/users")
     assert api.datapoints_today == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_gets_are_coalesced(api):
+    """Три одновременных GET /all-devices → один запрос и одно списание."""
+    calls = []
+    fetch = api._async_fetch   # pylint: disable=protected-access
+
+    async def slow_fetch(path):
+        calls.append(path)
+        await asyncio.sleep(0.01)
+        return await fetch(path)
+
+    api._async_fetch = slow_fetch   # pylint: disable=protected-access
+    results = await asyncio.gather(*(api.async_get("/all-devices") for _ in range(3)))
+
+    assert len(calls) == 1
+    assert results[0] is results[1] is results[2]
+    assert api.datapoints_today == 3      # 3 устройства × mostRecentDataPoint
+    assert api.coalesced_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_ttl_cache_absorbs_burst():
+    """С TTL‑кэшем повторный GET в пределах окна не тратит квоту."""
+    api = MockPulseApi()
+    api._response_ttl = 60   # pylint: disable=protected-access
+
+    await api.async_get("/all-devices")
+    await api.async_get("/all-devices")
+    assert api.datapoints_today == 3
+    assert api.cache_hits == 1
+
+
+def test_unchanged_body_short_circuit(api):
+    """Повторное тело: тот же объект без разбора, квота списана снова."""
+    body = b'{"deviceViewDtos": [{"mostRecentDataPoint": {"t": 1}, "lastHourData": [{}, {}]}]}'
+
+    first = api._decode_body("/all-devices", body)    # pylint: disable=protected-access
+    second = api._decode_body("/all-devices", body)   # pylint: disable=protected-access
+    changed = api._decode_body("/all-devices", body.replace(b'"t": 1', b'"t": 2'))   # pylint: disable=protected-access
+
+    assert second is first
+    assert changed is not first
+    assert api.datapoints_today == 9      # 3 × (1 MRD + 2 lastHourData)
+    assert api.fingerprint_hits == 1
+    assert api.fingerprint_hit_rate == pytest.approx(1 / 3)
+
+
+def test_only_all_devices_keeps_payload(api):
+    """Страницы и диапазоны разбираются каждый раз и в памяти не остаются."""
+    body = b'[{"t": 1}]'
+    first = api._decode_body("/api/light-readings/1?page=0", body)    # pylint: disable=protected-access
+    second = api._decode_body("/api/light-readings/1?page=0", body)   # pylint: disable=protected-access
+
+    assert second == first and second is not first
+    assert api._fingerprints == {}   # pylint: disable=protected-access
+    assert api.fingerprint_checks == 0
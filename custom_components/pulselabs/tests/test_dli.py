@@ -0,0 +1,80 @@
+# tests/test_dli.py
+"""Накопленный DLI из PPFD между опросами."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.pulselabs.dli import DliTracker
+
+T0 = datetime(2025, 7, 18, 6, 0, tzinfo=timezone.utc)
+
+
+def _feed(tracker, samples, device="1"):
+    value = None
+    for minutes, ppfd in samples:
+        value = tracker.add(device, T0 + timedelta(minutes=minutes), ppfd)
+    return value
+
+
+def test_constant_ppfd_over_an_hour():
+    tracker = DliTracker(timezone.utc)
+    # 1000 µmol/m²/s × 3600 с = 3.6 mol/m²
+    value = _feed(tracker, [(m, 1000.0) for m in range(0, 61, 5)])
+    assert value == pytest.approx(3.6)
+
+
+def test_ramp_uses_trapezoids_and_ignores_repeats():
+    tracker = DliTracker(timezone.utc)
+    value = _feed(tracker, [(0, 0.0), (10, 600.0), (10, 600.0)])
+    assert value == pytest.approx(300 * 600 * 1e-6)
+
+
+def test_gap_is_not_integrated():
+    tracker = DliTracker(timezone.utc, max_gap=timedelta(minutes=30))
+    value = _feed(tracker, [(0, 1000.0), (10, 1000.0), (130, 1000.0), (140, 1000.0)])
+    assert value == pytest.approx(2 * 600 * 1000 * 1e-6)
+    assert tracker.gaps == 1
+
+
+def test_reset_at_photoperiod_start_splits_interval():
+    # «сутки» начинаются в 08:00 UTC (включение света)
+    tracker = DliTracker(timezone.utc, day_start_hour=8)
+    before = _feed(tracker, [(100, 500.0), (115, 500.0)])           # 07:40 → 07:55
+    assert before == pytest.approx(900 * 500 * 1e-6)
+    after = _feed(tracker, [(125, 500.0)])                           # 08:05: 5 минут новых суток
+    assert after == pytest.approx(300 * 500 * 1e-6)
+    # новых измерений нет, а сутки сменились — сумма нулевая
+    assert tracker.value("1", T0 + timedelta(days=1, hours=3)) == 0.0
+
+
+def test_state_survives_restart():
+    tracker = DliTracker(timezone.utc)
+    _feed(tracker, [(0, 1000.0), (10, 1000.0)])
+    restored = DliTracker(timezone.utc)
+    restored.load(tracker.as_dict())
+    assert _feed(restored, [(20, 1000.0)]) == pytest.approx(1.2)
+
+
+def test_silent_device_drops_to_zero_after_reset():
+    tracker = DliTracker(timezone.utc)
+    _feed(tracker, [(m, 1000.0) for m in range(0, 61, 5)])
+    last = T0 + timedelta(minutes=60)
+    # прибор замолчал: опрос отдаёт то же измерение, но сутки уже сменились
+    assert tracker.add("1", last, 1000.0, last + timedelta(hours=2)) == pytest.approx(3.6)
+    assert tracker.add("1", last, 1000.0, last + timedelta(days=1)) == 0.0
+
+
+def test_unchanged_response_is_renormalized_after_reset():
+    coordinator_module = pytest.importorskip("custom_components.pulselabs.coordinator")
+    coordinator = object.__new__(coordinator_module.PulseDeviceCoordinator)
+    tracker = DliTracker(timezone.utc)
+    raw = {"deviceViewDtos": []}
+    coordinator._last_raw = raw   # pylint: disable=protected-access
+    coordinator._last_successful_data = {"devices": {}}   # pylint: disable=protected-access
+    coordinator._last_raw_period = tracker.period_start(T0)   # pylint: disable=protected-access
+
+    assert coordinator._can_reuse(raw, tracker.period_start(T0 + timedelta(hours=2)))   # pylint: disable=protected-access
+    # сутки сменились: _add_dli должен пройти и обнулить DLI замолчавших приборов
+    assert not coordinator._can_reuse(raw, tracker.period_start(T0 + timedelta(days=1)))   # pylint: disable=protected-access
+    assert not coordinator._can_reuse(dict(raw), tracker.period_start(T0))   # pylint: disable=protected-access
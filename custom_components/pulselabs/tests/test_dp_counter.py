@@ -0,0 +1,74 @@
+# tests/test_dp_counter.py
+"""Сверяем сгенерированные счётчики с эталонным интерпретатором."""
+
+import random
+
+import pytest
+
+from custom_components.pulselabs.dp_schema import (
+    _compile_counter,
+    _count_by_pointers,
+    get_dp_schema_map,
+)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+_KEYS = ("a", "b", "deviceViewDtos", "mostRecentDataPoint", "lastHourData")
+
+
+def _random_node(rng: random.Random, depth: int):
+    """Случайный JSON‑подобный узел: dict / list / None / скаляр."""
+    roll = rng.random()
+    if depth <= 0 or roll < 0.15:
+        return rng.choice([None, 1, "x", 2.5, {}, []])
+    if roll < 0.6:
+        return {k: _random_node(rng, depth - 1) for k in rng.sample(_KEYS, rng.randint(0, 3))}
+    return [_random_node(rng, depth - 1) for _ in range(rng.randint(0, 4))]
+
+
+def _random_pointers(rng: random.Random):
+    return [
+        [rng.choice(_KEYS + ("*", "*")) for _ in range(rng.randint(0, 4))]
+        for _ in range(rng.randint(1, 4))
+    ]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+def test_differential_random():
+    """Случайные пойнтеры × случайные payload: результаты совпадают."""
+    rng = random.Random(20250801)
+    for _ in range(300):
+        pointers = _random_pointers(rng)
+        counter = _compile_counter(pointers)
+        for _ in range(20):
+            payload = _random_node(rng, 5)
+            assert counter(payload) == _count_by_pointers(payload, pointers), (pointers, payload)
+
+
+@pytest.mark.parametrize("entry", get_dp_schema_map(), ids=lambda e: e.path)
+def test_differential_swagger(entry):
+    """Пойнтеры из swagger на «живых» формах ответов."""
+    rng = random.Random(entry.path)
+    dp = {"temperatureF": 75.0}
+    payloads = [
+        None, {}, [], dp, [dp, None, [dp, dp]],
+        {
+            "deviceViewDtos": [
+                {"mostRecentDataPoint": dp, "lastHourData": [dp] * rng.randint(0, 5)},
+                {"mostRecentDataPoint": None, "lastHourData": None},
+            ],
+            "hubViewDtos": [{"mostRecentDataPoint": dp}],
+            "universalSensorViews": [{"mostRecentDataPoint": [dp, dp]}],
+            "dataPointDto": dp,
+        },
+    ]
+    for payload in payloads:
+        assert entry.count(payload) == _count_by_pointers(payload, entry.pointers)
+
+
+def test_range_counter_counts_100k_points():
+    """100k точек /devices/range; время — в tests/bench.py."""
+    entry = next(e for e in get_dp_schema_map() if e.path == "/devices/range")
+    payload = [{"deviceId": i % 7, "temperatureF": 70.0 + i % 10} for i in range(100_000)]
+
+    assert entry.count(payload) == _count_by_pointers(payload, entry.pointers) == 100_000
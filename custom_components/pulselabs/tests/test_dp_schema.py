@@ -0,0 +1,177 @@
+# tests/test_dp_schema.py
+"""Проверяем кэш карты datapoints и построение карты по swagger."""
+
+import shutil
+
+import pytest
+
+from custom_components.pulselabs import dp_schema
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+@pytest.fixture
+def swagger_copy(tmp_path):
+    """Копия swagger.json во временном каталоге + путь к кэшу рядом."""
+    swagger = tmp_path / "swagger.json"
+    shutil.copy(dp_schema._SWAGGER_FILE, swagger)   # pylint: disable=protected-access
+    return swagger, tmp_path / "dp_schema_map.json"
+
+
+def _as_dict(entries):
+    return {e.path: e.pointers for e in entries}
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+def test_cache_roundtrip(swagger_copy):
+    """Карта из кэша совпадает с картой, построенной по swagger."""
+    swagger, cache = swagger_copy
+
+    built = dp_schema.load_dp_schema_map(swagger, cache)
+    assert cache.exists()
+    cached = dp_schema.load_dp_schema_map(swagger, cache)
+
+    assert _as_dict(built) == _as_dict(cached)
+    assert ["deviceViewDtos", "*", "mostRecentDataPoint"] in _as_dict(cached)["/all-devices"]
+
+
+def test_cache_rebuilt_when_swagger_changes(swagger_copy):
+    """Изменился swagger → ключ не совпал → карта перестроена."""
+    swagger, cache = swagger_copy
+    dp_schema.load_dp_schema_map(swagger, cache)
+
+    swagger.write_bytes(swagger.read_bytes().replace(b'"/devices/range"', b'"/devices/range-v2"'))
+    rebuilt = _as_dict(dp_schema.load_dp_schema_map(swagger, cache))
+
+    assert "/devices/range-v2" in rebuilt
+    assert "/devices/range" not in rebuilt
+
+
+def test_shipped_cache_is_current():
+    """Артефакт в resources/ должен соответствовать текущему swagger."""
+    key = dp_schema._cache_key(dp_schema._SWAGGER_FILE.read_bytes())   # pylint: disable=protected-access
+    assert dp_schema._read_cache(dp_schema._CACHE_FILE, key) is not None   # pylint: disable=protected-access
+
+
+def test_warm_start_reads_cache_without_swagger_walk(swagger_copy, monkeypatch):
+    """Второй старт берёт карту из артефакта: swagger не обходится."""
+    swagger, cache = swagger_copy
+    built = dp_schema.load_dp_schema_map(swagger, cache)
+
+    def walk(_swagger):
+        raise AssertionError("swagger walked on warm start")
+
+    monkeypatch.setattr(dp_schema, "_build_dp_schema_map", walk)
+    assert _as_dict(dp_schema.load_dp_schema_map(swagger, cache)) == _as_dict(built)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+def _ref(name):
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def _diamond_swagger(depth: int) -> dict:
+    """Синтетический swagger: цепочка «ромбов» L0 → (a, b) → L1 → … → L{depth}.
+
+    Число путей до дна — 2**depth, число схем — depth (+ обратные рёбра на L0).
+    Countable‑DTO есть только в `Root.points`, так что пойнтер ровно один,
+    а все пути по «ромбам» ничего не находят.
+    """
+    schemas = {
+        f"L{i}": {
+            "type": "object",
+            "properties": {"a": _ref(f"L{i + 1}"), "b": _ref(f"L{i + 1}"), "self": _ref("L0")},
+        }
+        for i in range(depth)
+    }
+    schemas[f"L{depth}"] = {"type": "object", "properties": {"n": {"type": "integer"}}}
+    schemas["DataPointDto"] = {"type": "object", "properties": {"v": {"type": "number"}}}
+    schemas["Root"] = {
+        "type": "object",
+        "properties": {"tree": _ref("L0"), "points": {"type": "array", "items": _ref("DataPointDto")}},
+    }
+    return {
+        "components": {"schemas": schemas},
+        "paths": {"/synthetic": {"get": {"responses": {"200": {"content": {
+            "application/json": {"schema": _ref("Root")}}}}}}},
+    }
+
+
+def _cyclic_swagger(paths):
+    return {
+        "components": {"schemas": {
+            "A": {"type": "object", "properties": {"b": _ref("B"), "dp": _ref("DataPointDto")}},
+            "B": {"type": "object", "properties": {"a": _ref("A")}},
+            "DataPointDto": {"type": "object", "properties": {}},
+        }},
+        "paths": {path: {"get": {"responses": {"200": {"content": {
+            "application/json": {"schema": _ref(name)}}}}}} for path, name in paths},
+    }
+
+
+@pytest.mark.parametrize(
+    "paths", [[("/a", "A"), ("/b", "B")], [("/b", "B"), ("/a", "A")]], ids=["a-first", "b-first"]
+)
+def test_cyclic_schema_terminates(paths):
+    """A → B → A с countable‑DTO внутри: обход конечен, пойнтеры не зависят от порядка путей."""
+    result = dp_schema._build_dp_schema_map(_cyclic_swagger(paths))   # pylint: disable=protected-access
+    assert result == {"/a": [["dp"]], "/b": [["a", "dp"]]}
+
+
+class _CountingSchemas(dict):
+    """components.schemas, считающий раскрытия схем (`get` по имени)."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.expanded = 0
+
+    def get(self, key, default=None):
+        self.expanded += 1
+        return super().get(key, default)
+
+
+@pytest.mark.parametrize("depth", [50, 200])
+def test_deep_schema_expands_each_schema_once(depth):
+    """2**depth путей по «ромбам», но каждая схема раскрывается один раз."""
+    swagger = _diamond_swagger(depth)
+    schemas = swagger["components"]["schemas"] = _CountingSchemas(swagger["components"]["schemas"])
+    result = dp_schema._build_dp_schema_map(swagger)   # pylint: disable=protected-access
+    assert result["/synthetic"] == [["points", "*"]]
+    assert schemas.expanded <= len(schemas)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+@pytest.fixture
+def router():
+    entries = [
+        dp_schema._PathPointers(path=p, pointers=[["x"]])   # pylint: disable=protected-access
+        for p in ("/hubs/ids", "/hubs/{hubId}", "/devices/range",
+                  "/devices/{deviceId}/data-range", "/devices/{deviceId}/recent-data")
+    ]
+    return dp_schema.DpRouter(entries)
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("/hubs/ids", "/hubs/ids"),                             # литерал важнее wildcard
+        ("/hubs/42", "/hubs/{hubId}"),
+        ("/devices/range?start=1&end=2", "/devices/range"),
+        ("/devices/7/data-range?start=1", "/devices/{deviceId}/data-range"),
+        ("/devices/7/recent-data", "/devices/{deviceId}/recent-data"),
+        ("/devices/7", None),
+        ("/devices//recent-data", None),                        # пустой сегмент ≠ {param}
+        ("/users", None),
+    ],
+)
+def test_router_resolve(router, path, expected):
+    entry = router.resolve(path)
+    assert (entry.path if entry else None) == expected
+
+
+def test_router_covers_swagger_map():
+    """Каждый swagger‑путь с подставленными параметрами находит сам себя."""
+    entries = dp_schema.get_dp_schema_map()
+    router = dp_schema.DpRouter(entries)
+    for entry in entries:
+        concrete = "/".join("123" if s.startswith("{") else s for s in entry.path.split("/"))
+        assert router.resolve(concrete) is entry
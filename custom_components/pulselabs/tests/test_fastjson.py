@@ -0,0 +1,80 @@
+# tests/test_fastjson.py
+"""Разбор тела ответа из bytes быстрым декодером против `resp.json()`."""
+
+import json
+import random
+
+import pytest
+
+from custom_components.pulselabs.api import BaseApi
+from custom_components.pulselabs.fastjson import json_loads
+
+
+def _datapoint(rnd, device_id, minute):
+    return {
+        "deviceId": device_id,
+        "deviceType": 1,
+        "temperatureF": round(rnd.uniform(65, 85), 2),
+        "humidityRh": round(rnd.uniform(40, 70), 2),
+        "vpd": round(rnd.uniform(0.6, 1.6), 3),
+        "lightLux": round(rnd.uniform(0, 100), 1),
+        "airPressure": round(rnd.uniform(98000, 102000), 1),
+        "co2": rnd.randint(400, 1500),
+        "par": rnd.randint(0, 1200),
+        "voc": round(rnd.uniform(0, 1), 3),
+        "pluggedIn": True,
+        "signalStrength": rnd.randint(-80, -40),
+        "createdAt": f"2025-07-18T{minute // 60:02d}:{minute % 60:02d}:00",
+    }
+
+
+def _all_devices_body(devices=20):
+    rnd = random.Random(1)
+    return json.dumps({
+        "deviceViewDtos": [
+            {
+                "id": d,
+                "name": f"Tent {d}",
+                "deviceType": 1,
+                "mostRecentDataPoint": _datapoint(rnd, d, 59),
+                "lastHourData": [_datapoint(rnd, d, m) for m in range(60)],
+            }
+            for d in range(devices)
+        ],
+        "universalSensorViews": [],
+    }).encode()
+
+
+def _devices_range_body(points=20_000):
+    rnd = random.Random(2)
+    return json.dumps([_datapoint(rnd, i % 20, i % 1440) for i in range(points)]).encode()
+
+
+def _aiohttp_default(body: bytes):
+    """Что делает `resp.json()`: bytes → str → json.loads."""
+    return json.loads(body.decode("utf-8"))
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+@pytest.mark.parametrize("make_body", [_all_devices_body, _devices_range_body], ids=["all-devices", "devices-range"])
+def test_fast_decoder_matches_resp_json(make_body):
+    """Время и память декодеров — в tests/bench.py."""
+    body = make_body()
+    assert json_loads(body) == _aiohttp_default(body)
+
+
+def test_decoder_is_pluggable_and_sees_raw_bytes():
+    seen = []
+
+    def spy(body):
+        seen.append(body)
+        return json.loads(body)
+
+    api = BaseApi(json_loads=spy)
+    body = b'[{"a": 1}]'
+    assert api._decode_body("/all-devices", body) == [{"a": 1}]   # pylint: disable=protected-access
+    assert seen == [body]
+
+    # совпавшее тело /all-devices не декодируется повторно
+    api._decode_body("/all-devices", body)   # pylint: disable=protected-access
+    assert len(seen) == 1
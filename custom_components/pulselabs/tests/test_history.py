@@ -0,0 +1,44 @@
+# tests/test_history.py
+"""Свёртка исторических точек в часовые mean/min/max."""
+
+from datetime import datetime, timedelta, timezone
+
+from custom_components.pulselabs.history import HourlyAggregator, floor_hour, missed_points, parse_created_at
+
+
+def test_parse_created_at():
+    assert parse_created_at("2025-07-18T06:55:50") == datetime(2025, 7, 18, 6, 55, 50, tzinfo=timezone.utc)
+    assert parse_created_at("2025-07-18T06:55:50+02:00").utcoffset().total_seconds() == 7200
+    assert parse_created_at("garbage") is None
+    assert parse_created_at(None) is None
+
+
+def test_hourly_buckets():
+    agg = HourlyAggregator(["temperatureF", "dpF_calculated", "pluggedIn"])
+    for minute, temp in [(0, 70.0), (30, 74.0), (59, 72.0), (60, 80.0)]:
+        moment = datetime(2025, 7, 18, 10, tzinfo=timezone.utc) + timedelta(minutes=minute)
+        agg.add(moment, {"temperatureF": temp, "pluggedIn": True, "name": "Tent"})
+
+    assert agg.points == 4
+    assert agg.keys() == ["temperatureF"]          # bool и строки не измерения
+    rows = agg.rows("temperatureF")
+    assert [r["start"].hour for r in rows] == [10, 11]
+    assert rows[0]["mean"] == 72.0
+    assert (rows[0]["min"], rows[0]["max"]) == (70.0, 74.0)
+    assert rows[1] == {"start": floor_hour(rows[1]["start"]), "mean": 80.0, "min": 80.0, "max": 80.0}
+
+
+def test_missed_points_dedupes_against_last_seen():
+    last_seen = {"1": datetime(2025, 7, 18, 10, 0, tzinfo=timezone.utc)}
+    points = [
+        {"deviceId": 1, "createdAt": "2025-07-18T10:00:00", "temperatureF": 70},   # уже видели вживую
+        {"deviceId": 1, "createdAt": "2025-07-18T10:10:00", "temperatureF": 72},
+        {"deviceId": 1, "createdAt": "2025-07-18T10:05:00", "temperatureF": 71},
+        {"deviceId": 1, "createdAt": "2025-07-18T10:05:00", "temperatureF": 71},   # повтор
+        {"deviceId": 2, "createdAt": "2025-07-18T09:00:00", "temperatureF": 60},   # новое устройство
+        {"deviceId": 3, "createdAt": None},
+    ]
+    missed = missed_points(points, last_seen)
+    assert [p["temperatureF"] for _, p in missed["1"]] == [71, 72]
+    assert len(missed["2"]) == 1
+    assert "3" not in missed
@@ -0,0 +1,92 @@
+# tests/test_hub_history.py
+"""Параллельная догрузка истории сенсоров хаба."""
+
+import asyncio
+import time
+
+import pytest
+
+from custom_components.pulselabs.hub_history import async_iter_sensor_histories, iter_array_points
+
+RTT = 0.05
+
+
+def _dto(sensor_id):
+    return {
+        "dataPointValuesCreatedAt": ["2025-07-18T10:00:00", "2025-07-18T10:05:00"],
+        "dataPointValues": [
+            {"paramName": "VWC", "measuringUnit": "%", "paramValues": [40.0 + sensor_id, 41.0]},
+            {"paramName": "EC", "measuringUnit": "mS/cm", "paramValues": [1.2, 1.3]},
+        ],
+    }
+
+
+def _normalize(sensor_id, dp_value):
+    return {"id": sensor_id, "valueName": dp_value["ParamName"], "value": dp_value["ParamValue"]}
+
+
+class _Fetcher:
+    """Поддельный data-range: один «сетевой цикл» на сенсор, считает параллельность."""
+
+    def __init__(self, fail=()):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = []
+        self.fail = set(fail)
+
+    async def __call__(self, sensor_id):
+        self.started.append(sensor_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(RTT)
+            if sensor_id in self.fail:
+                raise RuntimeError("boom")
+            yield _dto(sensor_id)
+        finally:
+            self.in_flight -= 1
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+def test_columnar_dto_expands_to_points():
+    points = list(iter_array_points(_dto(1)))
+    assert len(points) == 4
+    assert points[0] == ("2025-07-18T10:00:00", {"ParamName": "VWC", "MeasuringUnit": "%", "ParamValue": 41.0})
+    assert points[-1][1]["ParamName"] == "EC"
+    # PascalCase, как в /all-devices
+    assert len(list(iter_array_points({"DataPointValuesCreatedAt": ["x"], "DataPointValues": [
+        {"ParamName": "PH", "MeasuringUnit": "", "ParamValues": [6.1]}]}))) == 1
+
+
+@pytest.mark.asyncio
+async def test_requests_run_concurrently_under_bound():
+    fetch = _Fetcher()
+    started = time.perf_counter()
+    histories = [h async for h in async_iter_sensor_histories(fetch, range(8), _normalize, concurrency=4)]
+    elapsed = time.perf_counter() - started
+
+    assert fetch.max_in_flight == 4
+    assert sorted(h.sensor_id for h in histories) == list(range(8))
+    assert all(len(h.points) == 4 and h.error is None for h in histories)
+    # 8 сенсоров по 4 в ряд ≈ 2 сетевых цикла, а не 8
+    assert elapsed < RTT * 5
+
+
+@pytest.mark.asyncio
+async def test_failed_sensor_does_not_stop_others():
+    fetch = _Fetcher(fail={2})
+    histories = {h.sensor_id: h async for h in async_iter_sensor_histories(fetch, [1, 2, 3], _normalize)}
+    assert isinstance(histories[2].error, RuntimeError)
+    assert histories[1].error is None and histories[3].points
+
+
+@pytest.mark.asyncio
+async def test_abandoned_iteration_cancels_pending_requests():
+    fetch = _Fetcher()
+    histories = async_iter_sensor_histories(fetch, range(6), _normalize, concurrency=2)
+    async for _ in histories:
+        break
+    await histories.aclose()
+    await asyncio.sleep(RTT * 2)
+    assert fetch.in_flight == 0
+    assert len(fetch.started) < 6
@@ -0,0 +1,99 @@
+# tests/test_json_stream.py
+"""Проверяем потоковый разбор JSON‑массива."""
+
+import asyncio
+import json
+
+import pytest
+
+from custom_components.pulselabs.json_stream import JsonArrayStreamParser, iter_json_array
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+def _parse_in_chunks(body: bytes, size: int):
+    parser = JsonArrayStreamParser()
+    items = []
+    for i in range(0, len(body), size):
+        items += parser.feed(body[i:i + size])
+    return items + parser.close()
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10_000])
+def test_any_chunking_matches_json_loads(size):
+    """Любая нарезка (включая середину UTF‑8 символа и числа) даёт json.loads."""
+    payload = [
+        {"deviceId": 1, "temperatureF": 75.25, "createdAt": "2025‑07‑18T06:55:50"},
+        {"name": "Теплица 🌱", "nested": {"a": [1, 2, {"b": None}]}},
+        12345, -0.5e-3, "str", True, None, [], {},
+    ]
+    body = json.dumps(payload, ensure_ascii=False, indent=1).encode()
+    assert _parse_in_chunks(body, size) == payload
+
+
+@pytest.mark.parametrize("body", [b"[]", b"  [ ]  ", b"\n[\n]\n"])
+def test_empty_array(body):
+    assert _parse_in_chunks(body, 1) == []
+
+
+@pytest.mark.parametrize("body", [b'{"error": 1}', b"[1, 2", b"[1 2]", b"[1,]", b"[1] 2"])
+def test_malformed(body):
+    with pytest.raises(ValueError):
+        _parse_in_chunks(body, 4)
+
+
+def test_buffer_stays_flat():
+    """Буфер не растёт с длиной массива — держится только хвост чанка."""
+    item = {"deviceId": 7, "temperatureF": 71.5, "humidityRh": 55.0, "createdAt": "2025-07-18T06:55:50"}
+    body = json.dumps([item] * 50_000).encode()
+    parser = JsonArrayStreamParser()
+    peak = count = 0
+    for i in range(0, len(body), 4096):
+        count += len(parser.feed(body[i:i + 4096]))
+        peak = max(peak, parser.buffered)
+    count += len(parser.close())
+    assert count == 50_000
+    assert peak < 4096 + len(json.dumps(item)) * 2
+
+
+def test_large_element_is_not_reparsed_per_chunk():
+    """Один большой элемент разбирается O(log n) раз, а не на каждом чанке."""
+    element = {"values": list(range(200_000)), "createdAt": ["2025-07-18T06:55:50"] * 20_000}
+    body = json.dumps([element, {"i": 1}]).encode()
+
+    parser = JsonArrayStreamParser()
+    calls = []
+    raw_decode = parser._decoder.raw_decode   # pylint: disable=protected-access
+
+    def counting(buf, pos):
+        calls.append(len(buf) - pos)
+        return raw_decode(buf, pos)
+
+    parser._decoder.raw_decode = counting   # pylint: disable=protected-access
+    items = []
+    for i in range(0, len(body), 4096):
+        items += parser.feed(body[i:i + 4096])
+    items += parser.close()
+
+    assert items == [element, {"i": 1}]
+    assert len(body) // 4096 > 400
+    assert len(calls) < 20
+
+
+@pytest.mark.asyncio
+async def test_first_item_before_download_finishes():
+    """Первый элемент приходит вызывающему коду раньше последнего чанка."""
+    body = json.dumps([{"i": i} for i in range(100)]).encode()
+    sent = []
+
+    async def chunks():
+        for i in range(0, len(body), 16):
+            sent.append(i)
+            yield body[i:i + 16]
+            await asyncio.sleep(0)
+
+    stream = iter_json_array(chunks())
+    first = await stream.__anext__()
+    assert first == {"i": 0}
+    assert len(sent) < len(body) // 16
+    rest = [item async for item in stream]
+    assert len(rest) == 99
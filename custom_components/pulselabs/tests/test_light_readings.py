@@ -0,0 +1,151 @@
+# tests/test_light_readings.py
+"""Постраничная докачка спектральных замеров Pro в компактный кэш."""
+
+import math
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+from custom_components.pulselabs.light_readings import SCALAR_FIELDS, LightReadingCache, async_sync
+from custom_components.pulselabs.mock_api import MockPulseApi
+
+START = datetime(2025, 7, 18, 0, 0)
+PAGE = 10
+SPECTRUM = 288
+
+
+def _reading(i):
+    reading = {name: float(i) for name in SCALAR_FIELDS}
+    reading.update(id=i, deviceId=5, note=None, dli=None, createdAt=(START + timedelta(minutes=i)).isoformat())
+    reading["spectrum"] = [i / 1000 + k for k in range(SPECTRUM)]
+    return reading
+
+
+def _serve(api, count):
+    """Страницы от новых к старым, как у /api/light-readings."""
+    readings = [_reading(i) for i in reversed(range(count))]
+    pages = math.ceil(count / PAGE)
+    api._responses = {   # pylint: disable=protected-access
+        f"/api/light-readings/5?page={p}": {
+            "currentPage": p,
+            "numPages": pages,
+            "numReadings": count,
+            "lightReadings": readings[p * PAGE:(p + 1) * PAGE],
+        }
+        for p in range(pages)
+    }
+
+
+class _CountingApi(MockPulseApi):
+    def __init__(self):
+        super().__init__()
+        self.requested = []
+
+    async def _async_fetch(self, path):
+        self.requested.append(path)
+        return await super()._async_fetch(path)
+
+
+def test_reading_stored_as_one_float_array():
+    cache = LightReadingCache("5", capacity=10)
+    assert cache.add(_reading(3))
+    assert not cache.add(_reading(3))
+
+    moment, reading = cache.latest()
+    assert reading["ppfd"] == 3.0 and reading["dli"] is None
+    assert list(cache.spectrum(moment))[:2] == [0.003, 1.003]
+    assert cache.nbytes == (len(SCALAR_FIELDS) + SPECTRUM) * 8
+    # тот же замер dict'ом со списком Python‑float заметно тяжелее
+    as_dict = _reading(3)
+    dict_bytes = sys.getsizeof(as_dict) + sys.getsizeof(as_dict["spectrum"]) + 24 * (SPECTRUM + len(SCALAR_FIELDS))
+    assert cache.nbytes * 3 < dict_bytes
+
+
+def test_capacity_evicts_oldest():
+    cache = LightReadingCache("5", capacity=3)
+    for i in range(5):
+        cache.add(_reading(i))
+    assert len(cache) == 3
+    assert cache.moments()[0] == (START + timedelta(minutes=2)).timestamp()
+
+
+@pytest.mark.asyncio
+async def test_sync_never_refetches_known_pages():
+    api = _CountingApi()
+    cache = LightReadingCache("5", capacity=1000)
+
+    _serve(api, 35)
+    assert await async_sync(cache, api.async_iter_light_reading_pages(5)) == 35
+    assert len(api.requested) == 4
+
+    # появились 3 новых замера — хватает первой страницы
+    api.requested.clear()
+    _serve(api, 38)
+    assert await async_sync(cache, api.async_iter_light_reading_pages(5)) == 3
+    assert api.requested == ["/api/light-readings/5?page=0"]
+    assert len(cache) == 38
+
+
+@pytest.mark.asyncio
+async def test_known_moments_survive_restart():
+    api = _CountingApi()
+    cache = LightReadingCache("5", capacity=1000)
+    _serve(api, 35)
+    await async_sync(cache, api.async_iter_light_reading_pages(5))
+
+    # перезапуск: массивов нет, моменты из Store
+    restored = LightReadingCache("5", capacity=1000)
+    restored.load_known(cache.known_moments())
+    api.requested.clear()
+    _serve(api, 36)
+    assert await async_sync(restored, api.async_iter_light_reading_pages(5)) == 1
+    assert api.requested == ["/api/light-readings/5?page=0"]
+    assert len(restored) == 1 and len(restored.known_moments()) == 36
+
+
+class _MemoryStore:
+    def __init__(self):
+        self.saved = None
+
+    async def async_load(self):
+        return self.saved
+
+
+def _bare_coordinator(store):
+    """Координатор без hass: для сохранения замеров нужны только кэши и Store."""
+    coordinator_module = pytest.importorskip("custom_components.pulselabs.coordinator")
+    coordinator = object.__new__(coordinator_module.PulseDeviceCoordinator)
+    coordinator.light_readings = {}
+    coordinator._light_bands = {}   # pylint: disable=protected-access
+    coordinator._light_store = store   # pylint: disable=protected-access
+    return coordinator
+
+
+@pytest.mark.asyncio
+async def test_latest_bands_survive_restart():
+    api = _CountingApi()
+    store = _MemoryStore()
+    before = _bare_coordinator(store)
+    cache = before.light_readings["5"] = LightReadingCache("5", capacity=1000)
+    _serve(api, 5)
+    await async_sync(cache, api.async_iter_light_reading_pages(5))
+    before._light_bands["5"] = {"ppfd_blue": 120.0, "r_fr_ratio": 3.2}   # pylint: disable=protected-access
+    store.saved = before._light_state()   # pylint: disable=protected-access
+
+    # после перезапуска новый замер в превью не появился — синхронизации нет,
+    # а полосы последнего замера уже есть
+    after = _bare_coordinator(store)
+    await after.async_load_light_readings()
+    assert after._light_bands == {"5": {"ppfd_blue": 120.0, "r_fr_ratio": 3.2}}   # pylint: disable=protected-access
+    assert after.light_readings["5"].known_moments() == cache.known_moments()
+
+
+@pytest.mark.asyncio
+async def test_initial_fill_stops_at_capacity():
+    api = _CountingApi()
+    cache = LightReadingCache("5", capacity=15)
+    _serve(api, 100)
+    await async_sync(cache, api.async_iter_light_reading_pages(5))
+    assert len(api.requested) == 2
+    assert len(cache) == 15
@@ -0,0 +1,58 @@
+# tests/test_metrics.py
+"""Скользящие гистограммы по эндпоинтам и их заполнение из BaseApi."""
+
+import pytest
+
+from custom_components.pulselabs.api import BaseApi
+from custom_components.pulselabs.metrics import EndpointMetrics, RollingHistogram, endpoint_template
+from custom_components.pulselabs.mock_api import MockPulseApi
+
+
+def test_percentiles_nearest_rank():
+    hist = RollingHistogram(size=1000)
+    for v in range(1, 101):
+        hist.add(v)
+    assert hist.percentile(50) == 50
+    assert hist.percentile(95) == 95
+    assert hist.percentile(99) == 99
+    assert hist.summary() == {"p50": 50, "p95": 95, "p99": 99, "count": 100}
+
+
+def test_window_is_bounded():
+    hist = RollingHistogram(size=10)
+    for v in range(1000):
+        hist.add(v)
+    assert hist.count == 1000
+    assert hist.percentile(50) == 994        # только последние 10 значений
+    assert RollingHistogram().percentile(50) is None
+
+
+def test_templates_collapse_ids():
+    assert endpoint_template("/devices/42/data-range?start=x") == "/devices/{deviceId}/data-range"
+    assert endpoint_template("/hubs/7/details") == "/hubs/{id}/details"
+    assert endpoint_template("/users") == "/users"
+
+    metrics = EndpointMetrics()
+    for dev in range(50):
+        metrics.observe(f"/devices/{dev}/recent-data", "network_ms", dev)
+    assert list(metrics.stats()) == ["/devices/{deviceId}/recent-data"]
+
+
+def test_decode_records_bytes_decode_and_count():
+    api = BaseApi()
+    body = b'[{"a": 1}, {"a": 2}]'
+    api._decode_body("/devices/1/data-range", body)   # pylint: disable=protected-access
+    api._decode_body("/devices/2/data-range", body)   # pylint: disable=protected-access
+
+    stats = api.endpoint_stats()["/devices/{deviceId}/data-range"]
+    assert stats["bytes"]["p50"] == len(body)
+    assert stats["decode_ms"]["count"] == 2
+    assert stats["count_ms"]["count"] == 2
+    assert stats["datapoints"]["p99"] == 2
+
+
+@pytest.mark.asyncio
+async def test_mock_api_counts_per_template():
+    api = MockPulseApi()
+    await api.async_get_all_devices()
+    assert api.endpoint_stats()["/all-devices"]["datapoints"]["count"] == 1
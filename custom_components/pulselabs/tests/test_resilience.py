@@ -0,0 +1,163 @@
+# tests/test_resilience.py
+"""Повторы, 429/Retry-After и circuit breaker против локального фейкового сервера."""
+
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.pulselabs.api import PulseApi
+from custom_components.pulselabs.resilience import (
+    STATE_CLOSED,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientTransport,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+class FakeCloud:
+    """Отдаёт заранее заданную очередь ответов (status, headers, body)."""
+
+    def __init__(self):
+        self.script = []
+        self.hits = 0
+
+    async def handler(self, request):
+        self.hits += 1
+        status, headers, body = self.script.pop(0) if self.script else (200, {}, "[]")
+        return web.Response(status=status, headers=headers, text=body, content_type="application/json")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest_asyncio.fixture
+async def cloud():
+    fake = FakeCloud()
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", fake.handler)
+    server = TestServer(app)
+    await server.start_server()
+    fake.url = str(server.make_url("")).rstrip("/")
+    yield fake
+    await server.close()
+
+
+@pytest_asyncio.fixture
+async def session():
+    async with aiohttp.ClientSession() as sess:
+        yield sess
+
+
+def _api(session, cloud, clock=None, threshold=2):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    transport = ResilientTransport(
+        policy=RetryPolicy(attempts=3, base_delay=0.5, max_delay=10),
+        breaker=CircuitBreaker(failure_threshold=threshold, reset_timeout=30, clock=clock or FakeClock()),
+        sleep=fake_sleep,
+    )
+    api = PulseApi(session, "key", transport=transport, base_url=cloud.url)
+    api.sleeps = sleeps
+    return api
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+@pytest.mark.asyncio
+async def test_retries_5xx_then_succeeds(cloud, session):
+    cloud.script = [(503, {}, ""), (502, {}, ""), (200, {}, '[{"a": 1}, {"a": 2}]')]
+    api = _api(session, cloud)
+
+    data = await api.async_get("/devices/1/data-range")
+
+    assert data == [{"a": 1}, {"a": 2}]
+    assert cloud.hits == 3
+    assert api.transport.retries == 2
+    assert all(0 <= d <= 10 for d in api.sleeps)
+    assert api.datapoints_today == 2          # списание одно, за успешный ответ
+    assert api.last_call_success
+
+
+@pytest.mark.asyncio
+async def test_429_honours_retry_after(cloud, session):
+    cloud.script = [(429, {"Retry-After": "7"}, ""), (200, {}, "[]")]
+    api = _api(session, cloud)
+
+    await api.async_get("/users")
+
+    assert api.sleeps == [7.0]
+    assert api.transport_diagnostics()["last_retry_after"] == 7.0
+
+
+@pytest.mark.asyncio
+async def test_long_retry_after_opens_breaker(cloud, session):
+    """Retry-After больше допустимой паузы — не спим, держим breaker открытым."""
+    clock = FakeClock()
+    cloud.script = [(429, {"Retry-After": "120"}, "")]
+    api = _api(session, cloud, clock)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await api.async_get("/users")
+    assert api.sleeps == []
+    assert api.transport.breaker.state == STATE_OPEN
+
+    with pytest.raises(CircuitOpenError):
+        await api.async_get("/users")
+    assert cloud.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_client_error_not_retried(cloud, session):
+    cloud.script = [(401, {}, "")]
+    api = _api(session, cloud)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await api.async_get("/users")
+    assert cloud.hits == 1
+    assert api.transport.breaker.state == STATE_CLOSED
+    assert not api.last_call_success
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_and_probes_half_open(cloud, session):
+    clock = FakeClock()
+    api = _api(session, cloud, clock, threshold=2)
+    cloud.script = [(500, {}, "")] * 6
+
+    for _ in range(2):
+        with pytest.raises(aiohttp.ClientResponseError):
+            await api.async_get("/users")
+    assert api.transport.breaker.state == STATE_OPEN
+    hits = cloud.hits
+
+    # пока открыт — облако не трогаем
+    with pytest.raises(CircuitOpenError):
+        await api.async_get("/users")
+    assert cloud.hits == hits
+
+    # после reset_timeout — один пробный запрос; успех замыкает breaker
+    clock.now += 31
+    cloud.script = [(200, {}, "[]")]
+    await api.async_get("/users")
+    assert api.transport.breaker.state == STATE_CLOSED
+    assert api.transport_diagnostics()["consecutive_failures"] == 0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0   # дата в прошлом
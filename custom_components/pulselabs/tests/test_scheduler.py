@@ -0,0 +1,35 @@
+# tests/test_scheduler.py
+"""Проверяем адаптивный интервал опроса по остатку квоты."""
+
+from datetime import datetime, timedelta
+
+from custom_components.pulselabs.scheduler import QuotaPollScheduler
+
+NOW = datetime(2025, 8, 1, 12, 0, 0)
+MIDNIGHT = datetime(2025, 8, 2, 0, 0, 0)
+
+
+def _scheduler(limit=4800, min_interval=60):
+    return QuotaPollScheduler(limit=limit, min_interval=timedelta(seconds=min_interval))
+
+
+def test_budget_spread_evenly():
+    """12 ч до сброса, остаток 2400, опрос стоит 20 → 120 опросов → каждые 6 мин."""
+    interval = _scheduler().next_interval(cost=20, used=2400, now=NOW, reset_at=MIDNIGHT)
+    assert interval == timedelta(minutes=6)
+
+
+def test_min_interval_respected():
+    """Дешёвый опрос и большой остаток не опускают интервал ниже минимума."""
+    interval = _scheduler(limit=120000).next_interval(cost=3, used=0, now=NOW, reset_at=MIDNIGHT)
+    assert interval == timedelta(seconds=60)
+
+
+def test_exhausted_budget_waits_for_reset():
+    """Бюджета не хватает на опрос — ждём полуночи (с небольшим запасом)."""
+    scheduler = _scheduler()
+    interval = scheduler.next_interval(cost=20, used=4790, now=NOW, reset_at=MIDNIGHT)
+    assert NOW + interval > MIDNIGHT
+    assert interval < timedelta(hours=12, minutes=1)
+    assert scheduler.remaining == 10
+    assert scheduler.planned_interval == interval
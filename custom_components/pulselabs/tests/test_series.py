@@ -0,0 +1,83 @@
+# tests/test_series.py
+"""Кольцевые буферы недавних значений и скользящие агрегаты."""
+
+from custom_components.pulselabs.series import RingBuffer, SeriesStore
+
+
+def test_ring_buffer_keeps_last_points_in_order():
+    buffer = RingBuffer(4)
+    for i in range(6):
+        assert buffer.push(i * 60.0, float(i))
+    assert len(buffer) == 4
+    assert buffer.values() == [2.0, 3.0, 4.0, 5.0]
+    # то же измерение повторно (данные не обновились) не добавляется
+    assert not buffer.push(300.0, 99.0)
+    assert buffer.values()[-1] == 5.0
+
+
+def test_summary_and_sparkline():
+    buffer = RingBuffer(120)
+    for minute in range(120):
+        buffer.push(minute * 60.0, 20.0 + minute / 60)     # +1 в час
+    summary = buffer.summary(sparkline_points=12)
+    assert (summary["min"], summary["max"]) == (20.0, 21.98)
+    assert summary["rate_per_hour"] == 1.0
+    assert summary["samples"] == 120
+    assert summary["span_minutes"] == 119
+    assert len(summary["sparkline"]) == 12
+    assert summary["sparkline"] == sorted(summary["sparkline"])
+    assert RingBuffer(3).summary(12) == {}
+
+
+def test_store_tracks_only_measurements():
+    store = SeriesStore(10, {"devices": ("temperatureF",), "sensors": ("value",)})
+    data = {
+        "devices": {"1": {"id": 1, "temperatureF": 70.0, "vpdLeafTempOffsetInF": -2, "createdAt": "2025-07-18T10:00:00"}},
+        "sensors": {"7_vwc": {"id": 7, "value": 41.5}},
+    }
+    assert store.observe(data, now=1000.0) == {("devices", "1", "temperatureF"), ("sensors", "7_vwc", "value")}
+    # устройство: тот же createdAt — повтор, точку получил только сенсор без createdAt
+    assert store.observe(data, now=1060.0) == {("sensors", "7_vwc", "value")}
+
+    assert len(store) == 2
+    assert len(store.get("devices", "1", "temperatureF")) == 1
+    assert len(store.get("sensors", "7_vwc", "value")) == 2
+    assert store.get("devices", "1", "vpdLeafTempOffsetInF") is None
+
+
+def test_memory_is_fixed_per_series():
+    store = SeriesStore(360, {"devices": [f"k{i}" for i in range(5)]})
+    snapshot = {"devices": {str(d): {f"k{i}": float(i) for i in range(5)} for d in range(100)}}
+    store.observe(snapshot, now=0.0)
+    before = store.nbytes
+    for t in range(1, 1000):
+        store.observe(snapshot, now=float(t))
+
+    assert len(store) == 500
+    assert store.nbytes == before == 500 * 360 * 16
+
+
+def test_merge_inserts_missed_points_before_live_ones():
+    buffer = RingBuffer(5)
+    buffer.push(0.0, 1.0)
+    buffer.push(600.0, 9.0)                  # первый опрос после простоя
+    assert buffer.merge([(120.0, 2.0), (240.0, 3.0), (600.0, 99.0)]) == 2
+    assert buffer.items() == [(0.0, 1.0), (120.0, 2.0), (240.0, 3.0), (600.0, 9.0)]
+
+    assert buffer.merge([(float(t), 0.0) for t in range(1, 100)]) == 99
+    assert len(buffer) == 5 and buffer.last_time == 600.0
+
+
+def test_store_merge_by_item():
+    store = SeriesStore(10, {"devices": ("temperatureF", "humidityRh")})
+    added = store.merge("devices", "1", [(60.0, {"temperatureF": 70.0, "humidityRh": 50.0, "name": "x"})])
+    assert added == 2
+    assert store.get("devices", "1", "humidityRh").values() == [50.0]
+
+
+def test_merged_only_keys_are_not_observed():
+    store = SeriesStore(10, {"devices": ("ppfd", "ppfd_red")}, merged_only={"devices": ("ppfd_red",)})
+    store.merge("devices", "1", [(60.0, {"ppfd_red": 300.0})])
+    store.observe({"devices": {"1": {"ppfd": 500.0, "ppfd_red": 300.0}}}, 600.0)
+    assert store.get("devices", "1", "ppfd").items() == [(600.0, 500.0)]
+    assert store.get("devices", "1", "ppfd_red").items() == [(60.0, 300.0)]
@@ -0,0 +1,40 @@
+# tests/test_snapshot.py
+"""Снимок результата координатора: быстрый старт без живого /all-devices."""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.pulselabs.snapshot import pack, unpack
+
+NOW = datetime(2025, 7, 18, 12, 0, tzinfo=timezone.utc)
+MAX_AGE = timedelta(days=7)
+
+
+def _result(devices=100, sensors=400):
+    return {
+        "devices": {
+            str(i): {"id": i, "name": f"Tent {i}", "temperatureF": 75.2, "humidityRh": 55.0, "co2": None}
+            for i in range(devices)
+        },
+        "hubs": {"1": {"id": 1, "name": "Hub", "co2": None, "measuringUnit": None}},
+        "sensors": {f"{i}_vwc": {"id": i, "hubId": 1, "value": 41.5} for i in range(sensors)},
+    }
+
+
+def test_pack_unpack_roundtrip_through_json():
+    # None сохраняются: сущности хабов создаются по наличию ключа
+    payload = json.loads(json.dumps(pack(_result(), NOW - timedelta(minutes=5))))
+    data, saved_at = unpack(payload, NOW, MAX_AGE)
+    assert saved_at == NOW - timedelta(minutes=5)
+    assert data == _result()
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [None, {}, {"saved_at": "garbage", "data": {}}, pack({}, NOW), pack(_result(), NOW - timedelta(days=8))],
+    ids=["missing", "empty", "broken", "no-items", "too-old"],
+)
+def test_unusable_snapshot_falls_back_to_live(payload):
+    assert unpack(payload, NOW, MAX_AGE) is None
@@ -0,0 +1,57 @@
+# tests/test_spectrum.py
+"""Интегралы PPFD по полосам спектра: пакетный расчёт против цикла Python."""
+
+import random
+
+import pytest
+
+from custom_components.pulselabs import spectrum
+from custom_components.pulselabs.spectrum import KEYS, band_integrals, band_integrals_batch
+
+LENGTH = 401          # 380…780 нм с шагом 1 нм
+
+
+def test_flat_spectrum_splits_ppfd_by_band_width():
+    result = band_integrals(600.0, [1.0] * LENGTH)
+    assert result["ppfd_blue"] == pytest.approx(200.0, abs=0.01)
+    assert result["ppfd_green"] == pytest.approx(200.0, abs=0.01)
+    assert result["ppfd_red"] == pytest.approx(200.0, abs=0.01)
+    assert result["ppfd_far_red"] == pytest.approx(100.0, abs=0.01)
+    assert result["r_fr_ratio"] == pytest.approx(2.0, abs=0.01)
+    # кривая McCree < 1 почти везде в PAR
+    assert 0.6 * 600 < result["ypf_ppfd"] < 600
+
+
+def test_unusable_reading_gives_empty_bands():
+    assert band_integrals(500.0, []) == {key: None for key in KEYS}
+    assert band_integrals(float("nan"), [1.0] * LENGTH)["ppfd_red"] is None
+    assert band_integrals(500.0, [0.0] * LENGTH)["ppfd_red"] is None
+
+
+def _batch(count=1000, seed=7):
+    rnd = random.Random(seed)
+    return [(rnd.uniform(100, 1200), [rnd.random() for _ in range(LENGTH)]) for _ in range(count)]
+
+
+def test_batch_matches_single_readings():
+    pytest.importorskip("numpy")
+    readings = _batch(50) + [(300.0, [])]
+    batch = band_integrals_batch(readings)
+    for (ppfd, values), result in zip(readings, batch):
+        expected = band_integrals(ppfd, values)
+        for key in KEYS:
+            assert result[key] == pytest.approx(expected[key], abs=0.011)
+
+
+def test_numpy_and_python_loop_agree_on_1000_readings(monkeypatch):
+    pytest.importorskip("numpy")
+    readings = _batch()
+    vectorized = band_integrals_batch(readings)
+
+    monkeypatch.setattr(spectrum, "np", None)
+    python_loop = band_integrals_batch(readings)
+
+    assert len(vectorized) == len(python_loop) == 1000
+    for fast, slow in zip(vectorized, python_loop):
+        for key in KEYS:
+            assert fast[key] == pytest.approx(slow[key], abs=0.011)
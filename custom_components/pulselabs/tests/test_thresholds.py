@@ -0,0 +1,47 @@
+# tests/test_thresholds.py
+"""Переходы сработавших порогов по множествам id."""
+
+from custom_components.pulselabs.thresholds import ThresholdTracker
+
+
+def _threshold(i, resolved=False):
+    return {"id": i, "deviceId": 10, "deviceName": "Tent", "thresholdType": 2, "resolved": resolved,
+            "resolvedAt": "2025-07-18T11:00:00" if resolved else None, "triggeringValue": "91.2"}
+
+
+def _payload(ongoing=(), resolved=()):
+    return [{"growId": 1, "ongoing": [_threshold(i) for i in ongoing],
+             "resolved": [_threshold(i, resolved=True) for i in resolved]}]
+
+
+def test_only_transitions_are_reported():
+    tracker = ThresholdTracker()
+    triggered, cleared = tracker.update(_payload(ongoing=[1, 2]))
+    assert [t["id"] for t in triggered] == [1, 2] and cleared == []
+
+    assert tracker.update(_payload(ongoing=[1, 2])) == ([], [])
+
+    triggered, cleared = tracker.update(_payload(ongoing=[2, 3], resolved=[1]))
+    assert [t["id"] for t in triggered] == [3]
+    assert [t["id"] for t in cleared] == [1]
+    assert cleared[0]["resolvedAt"] == "2025-07-18T11:00:00"     # деталь из resolved
+
+
+def test_known_ids_survive_restart():
+    tracker = ThresholdTracker()
+    tracker.update(_payload(ongoing=[1, 2]))
+    restored = ThresholdTracker()
+    restored.load(tracker.as_dict())
+
+    triggered, cleared = restored.update(_payload(ongoing=[2]))
+    assert triggered == []
+    assert [t["id"] for t in cleared] == [1]
+    assert [t["id"] for t in restored.ongoing] == [2]
+
+
+def test_diff_of_large_sets():
+    tracker = ThresholdTracker()
+    tracker.update(_payload(ongoing=range(20000)))
+    triggered, cleared = tracker.update(_payload(ongoing=range(1, 20001)))
+    assert [t["id"] for t in triggered] == [20000]
+    assert [t["id"] for t in cleared] == [0]
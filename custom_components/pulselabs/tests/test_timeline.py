@@ -0,0 +1,119 @@
+# tests/test_timeline.py
+"""Инкрементальное чтение /api/timeline по курсору."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.pulselabs.mock_api import MockPulseApi
+from custom_components.pulselabs.timeline import TimelineCursor, async_fetch_new
+
+T0 = datetime(2025, 7, 18, 10, 0, tzinfo=timezone.utc)
+PAGE = 5
+
+
+def _event(i, minutes=None):
+    moment = T0 + timedelta(minutes=i if minutes is None else minutes)
+    return {"id": i, "createdAt": moment.isoformat(), "timelineEventType": 1, "title": f"note {i}"}
+
+
+def _at(event):
+    return datetime.fromisoformat(event["createdAt"])
+
+
+class _Timeline:
+    """Лента от новых к старым, с фильтром startDate."""
+
+    def __init__(self, events):
+        self.events = events
+        self.requests = []
+
+    async def __call__(self, start, end, count, page):
+        self.requests.append(page)
+        matching = sorted(
+            (e for e in self.events if start <= _at(e) and (end is None or _at(e) <= end)),
+            key=lambda e: e["createdAt"],
+            reverse=True,
+        )
+        return matching[page * count:(page + 1) * count]
+
+
+@pytest.mark.asyncio
+async def test_idle_poll_costs_one_page():
+    feed = _Timeline([_event(1), _event(2)])
+    cursor = TimelineCursor(high_water=T0 + timedelta(minutes=2), seen=[2])
+    assert await async_fetch_new(feed, cursor, PAGE, 10) == []
+    assert feed.requests == [0]
+
+
+@pytest.mark.asyncio
+async def test_pages_until_caught_up_and_cursor_advances():
+    feed = _Timeline([_event(i) for i in range(1, 4)])
+    cursor = TimelineCursor(high_water=T0 + timedelta(minutes=3), seen=[3])
+
+    feed.events += [_event(i) for i in range(4, 16)]           # 12 новых
+    new = await async_fetch_new(feed, cursor, PAGE, 10)
+    assert [e["id"] for e in new] == list(range(4, 16))         # от старых к новым
+    assert feed.requests == [0, 1, 2]
+
+    cursor.advance(new)
+    feed.requests.clear()
+    assert await async_fetch_new(feed, cursor, PAGE, 10) == []
+    assert feed.requests == [0]
+
+
+@pytest.mark.asyncio
+async def test_same_moment_events_are_not_repeated():
+    feed = _Timeline([_event(1, minutes=5), _event(2, minutes=5)])
+    cursor = TimelineCursor(high_water=T0 + timedelta(minutes=5), seen=[1])
+    new = await async_fetch_new(feed, cursor, PAGE, 10)
+    assert [e["id"] for e in new] == [2]
+    cursor.advance(new)
+    assert cursor.seen == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_burst_larger_than_page_cap_is_not_lost():
+    feed = _Timeline([_event(0)])
+    cursor = TimelineCursor(high_water=T0, seen=[0])
+    feed.events += [_event(i) for i in range(1, 24)]           # 23 новых при лимите 2 × 5
+
+    fired = []
+    for _ in range(20):
+        new = await async_fetch_new(feed, cursor, PAGE, 2)
+        fired += [e["id"] for e in new]
+        cursor.advance(new)
+        if cursor.window_end is None and not new:
+            break
+    assert fired == list(range(1, 24))                          # все, по порядку, без повторов
+    assert cursor.high_water == T0 + timedelta(minutes=23)
+
+
+@pytest.mark.asyncio
+async def test_event_arriving_while_paging_is_not_repeated():
+    feed = _Timeline([_event(i) for i in range(0, 9)])
+    cursor = TimelineCursor(high_water=T0, seen=[0])
+
+    async def shifting(start, end, count, page):
+        events = await feed(start, end, count, page)
+        if page == 0:
+            feed.events.append(_event(9))                       # страницы сдвигаются на одно
+        return events
+
+    new = await async_fetch_new(shifting, cursor, PAGE, 10)
+    assert [e["id"] for e in new] == list(range(1, 9))
+
+
+def test_cursor_survives_restart():
+    cursor = TimelineCursor(high_water=T0, seen=[7], window_end=T0 + timedelta(hours=1))
+    restored = TimelineCursor.from_dict(cursor.as_dict())
+    assert restored == cursor
+    assert TimelineCursor.from_dict(None).high_water is None
+
+
+@pytest.mark.asyncio
+async def test_api_timeline_query():
+    api = MockPulseApi()
+    path = "/api/timeline?startDate=2025-07-18T10%3A00%3A00%2B00%3A00&count=5&page=0"
+    api._responses[path] = [_event(1)]     # pylint: disable=protected-access
+    assert await api.async_get_timeline(T0, count=5) == [_event(1)]
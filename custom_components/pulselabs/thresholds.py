@@ -0,0 +1,76 @@
+"""
+custom_components.pulselabs.thresholds
+--------------------------------------
+Изменения в сработавших порогах `/api/triggered-thresholds`.
+
+Ответ — массив `SortedTriggeredThresholdsDto` (по гроу) со списками
+`ongoing` и `resolved`. Интересны только переходы: порог, которого не было
+среди активных, сработал; активный порог пропал — снят. `ThresholdTracker`
+помнит id активных порогов и на каждом ответе сравнивает множества —
+O(n) по числу порогов, без пересборки сущностей.
+
+Множество активных id сохраняется между перезапусками (`as_dict`), чтобы
+уже известные пороги после старта не рассылались повторно.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+# ThresholdType из swagger
+THRESHOLD_TYPES = {
+    1: "light",
+    2: "temperature",
+    3: "humidity",
+    4: "power",
+    5: "connectivity",
+    6: "battery_v",
+    7: "co2",
+    8: "voc",
+    11: "vpd",
+    12: "dew_point",
+}
+
+
+def _by_id(items: Iterable[Mapping[str, Any]] | None) -> Dict[Any, Mapping[str, Any]]:
+    return {item["id"]: item for item in items or () if item.get("id") is not None}
+
+
+class ThresholdTracker:
+    """Активные пороги и разница с предыдущим ответом."""
+
+    def __init__(self) -> None:
+        self._ongoing: Dict[Any, Mapping[str, Any]] = {}
+        # id из сохранённого состояния: их детали придут с первым ответом
+        self._known: set = set()
+
+    @property
+    def ongoing(self) -> List[Mapping[str, Any]]:
+        return list(self._ongoing.values())
+
+    def update(self, payload: Iterable[Mapping[str, Any]]) -> Tuple[List[Mapping[str, Any]], List[Mapping[str, Any]]]:
+        """Новый ответ → (сработавшие, снятые) с прошлого раза."""
+        ongoing: Dict[Any, Mapping[str, Any]] = {}
+        resolved: Dict[Any, Mapping[str, Any]] = {}
+        for grow in payload or ():
+            ongoing.update(_by_id(grow.get("ongoing")))
+            resolved.update(_by_id(grow.get("resolved")))
+
+        previous = self._known | self._ongoing.keys()
+        triggered = [item for threshold_id, item in ongoing.items() if threshold_id not in previous]
+        cleared = [
+            # снятый порог обычно уже в resolved — там есть resolvedAt
+            resolved.get(threshold_id) or self._ongoing.get(threshold_id) or {"id": threshold_id}
+            for threshold_id in previous
+            if threshold_id not in ongoing
+        ]
+        self._ongoing, self._known = ongoing, set()
+        return triggered, cleared
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"ongoing": list(self._known | self._ongoing.keys())}
+
+    def load(self, saved: Mapping[str, Any] | None) -> None:
+        self._known = set((saved or {}).get("ongoing") or ())
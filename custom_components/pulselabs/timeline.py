@@ -0,0 +1,133 @@
+"""
+custom_components.pulselabs.timeline
+------------------------------------
+Инкрементальное чтение `/api/timeline` по сохранённому курсору.
+
+Курсор (`TimelineCursor`) — high‑water mark: `createdAt` самого нового уже
+обработанного события и id событий с ровно этим моментом (на границе
+`startDate` они приходят повторно). `async_fetch_new()` запрашивает
+события с `startDate` = курсор постранично, страница за страницей, пока не
+встретит уже известное событие или короткую страницу. Страницы идут от
+новых к старым, так что без новых событий опрос стоит одну маленькую
+страницу.
+
+Если всплеск не помещается в `max_pages` страниц, самые старые события
+ещё не прочитаны, и рассылать прочитанные нельзя — курсор ушёл бы за
+непрочитанные. Тогда ничего не рассылается, а курсор запоминает
+`window_end` — самый старый прочитанный момент: следующие опросы читают
+окно `startDate`..`endDate` = `window_end`, сужая его, пока окно не
+прочитается целиком. Его события рассылаются от старых к новым, окно
+сбрасывается, и опрос продолжает с нового курсора. Страницы сдвигаются,
+если событие пришло во время чтения, поэтому прочитанное сводится по id.
+
+Пустой курсор при первом запуске ставится на «сейчас»: историю за прошлые
+30 дней (умолчание API) не качаем и событиями не рассылаем.
+
+Модуль не зависит от Home Assistant.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Mapping
+
+from .history import parse_created_at
+
+# TimelineEventType из swagger
+EVENT_TYPES = {
+    1: "note",
+    2: "notification",
+    3: "environment",
+    4: "device_added",
+    5: "feeding",
+    6: "pests",
+    7: "maintenance_and_cleaning",
+    8: "sensor_calibrated",
+    9: "batch_started",
+    10: "batch_zone_changed",
+}
+
+# fetch_page(start, end, count, page) → события страницы
+FetchPage = Callable[[datetime, "datetime | None", int, int], Awaitable[List[dict]]]
+
+
+@dataclass
+class TimelineCursor:
+    """High‑water mark ленты событий."""
+
+    high_water: datetime | None = None
+    # id событий ровно в момент high_water — уже разосланы
+    seen: List[int] = field(default_factory=list)
+    # верхняя граница окна, пока догоняем всплеск больше лимита страниц
+    window_end: datetime | None = None
+
+    def is_new(self, event: Mapping[str, Any]) -> bool:
+        moment = parse_created_at(event.get("createdAt"))
+        if moment is None or self.high_water is None:
+            return False
+        return moment > self.high_water or (moment == self.high_water and event.get("id") not in self.seen)
+
+    def advance(self, events: List[Mapping[str, Any]]) -> None:
+        for event in events:
+            moment = parse_created_at(event.get("createdAt"))
+            if moment is None:
+                continue
+            if self.high_water is None or moment > self.high_water:
+                self.high_water, self.seen = moment, []
+            if moment == self.high_water and event.get("id") not in self.seen:
+                self.seen.append(event.get("id"))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "high_water": self.high_water.isoformat() if self.high_water else None,
+            "seen": self.seen,
+            "window_end": self.window_end.isoformat() if self.window_end else None,
+        }
+
+    @classmethod
+    def from_dict(cls, saved: Mapping[str, Any] | None) -> "TimelineCursor":
+        if not saved:
+            return cls()
+        return cls(
+            parse_created_at(saved.get("high_water")),
+            list(saved.get("seen") or []),
+            parse_created_at(saved.get("window_end")),
+        )
+
+
+def _sort_key(event: Mapping[str, Any]):
+    return parse_created_at(event.get("createdAt")), event.get("id") or 0
+
+
+async def async_fetch_new(
+    fetch_page: FetchPage, cursor: TimelineCursor, page_size: int, max_pages: int
+) -> List[dict]:
+    """Новые события после курсора, от старых к новым; high‑water не сдвигает.
+
+    Всплеск больше `max_pages` страниц возвращает [] и сужает
+    `cursor.window_end` до самого старого прочитанного момента.
+    """
+    if cursor.high_water is None:
+        return []
+    found: Dict[Any, dict] = {}
+    complete = False
+    for page in range(max_pages):
+        events = await fetch_page(cursor.high_water, cursor.window_end, page_size, page)
+        new = [event for event in events if cursor.is_new(event)]
+        for event in new:
+            found.setdefault(event.get("id"), event)
+        # короткая страница — конец ленты; известное событие — дальше всё старое
+        if len(events) < page_size or len(new) < len(events):
+            complete = True
+            break
+
+    events = sorted(found.values(), key=_sort_key)
+    if not complete and events:
+        oldest = parse_created_at(events[0].get("createdAt"))
+        # окно не сузилось (весь лимит страниц — один момент) — рассылаем что есть
+        if oldest != cursor.window_end:
+            cursor.window_end = oldest
+            return []
+    cursor.window_end = None
+    return events